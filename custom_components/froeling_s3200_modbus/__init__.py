@@ -2,16 +2,36 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from datetime import timedelta
+
 import pymodbus
+from pymodbus import FramerType
 from pymodbus.client import ModbusTcpClient
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.const import Platform
+from homeassistant.exceptions import ConfigEntryNotReady
 import voluptuous as vol
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers import device_registry as dr, entity_registry as er
 
+from .burst import BurstCapture, DEFAULT_MINUTES as BURST_MINUTES, TRIGGER_STATES as BURST_STATES
+from .derived import DerivedCounters
+from .discovery import absent_groups, skip_absent
+from .entities import INCREMENTAL_OPTIONS, EntryEntities, async_remove_devices_if_empty, changed_options
+from .exporter import LineProtocolExporter
+from .highrate import CHANNELS as HIGHRATE_CHANNELS, DEFAULT_INTERVAL as HIGHRATE_INTERVAL, HighRateSampler
+from .history import StateHistory
+from .poller import FroelingPoller
+from .keepalive import OverrideKeepalive
+from .profiles import ParameterProfiles
+from .services import async_register_services
+from .templates import TEMPLATE_GROUPS
+from .tracer import FrameTracer
+from .transport import FroelingTransport
+from .writebudget import DEFAULT_LIMIT_DAY, DEFAULT_LIMIT_HOUR, WriteBudget
+
 for name in ("pymodbus", "pymodbus.client", "pymodbus.transaction", "pymodbus.framer", "pymodbus.logging"):
     logging.getLogger(name).setLevel(logging.WARNING)
 
@@ -27,6 +47,7 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Required("host"): cv.string,
                 vol.Required("port", default=502): cv.port,
                 vol.Optional("unit_id", default=2): cv.positive_int,
+                vol.Optional("framer", default="socket"): vol.In(["socket", "rtu"]),
                 vol.Required("update_interval", default=60): cv.positive_int,
                 vol.Optional("kessel", default=True): cv.boolean,
                 vol.Optional("boiler01", default=True): cv.boolean,
@@ -35,12 +56,27 @@ CONFIG_SCHEMA = vol.Schema(
                 vol.Optional("austragung", default=True): cv.boolean,
                 vol.Optional("puffer01", default=True): cv.boolean,
                 vol.Optional("zirkulationspumpe", default=True): cv.boolean,
+                vol.Optional("extra_groups", default=[]): vol.All(cv.ensure_list, [vol.In(TEMPLATE_GROUPS)]),
+                vol.Optional("diagnostics", default=False): cv.boolean,
+                vol.Optional("highrate_channels", default=[]): vol.All(cv.ensure_list, [vol.In(HIGHRATE_CHANNELS)]),
+                vol.Optional("highrate_interval", default=HIGHRATE_INTERVAL): vol.All(int, vol.Range(min=1, max=60)),
+                vol.Optional("burst_states", default=[]): vol.All(cv.ensure_list, [vol.In(BURST_STATES)]),
+                vol.Optional("burst_minutes", default=BURST_MINUTES): vol.All(int, vol.Range(min=1, max=30)),
+                vol.Optional("export_target", default=""): cv.string,
+                vol.Optional("write_limit_hour", default=DEFAULT_LIMIT_HOUR): cv.positive_int,
+                vol.Optional("write_limit_day", default=DEFAULT_LIMIT_DAY): cv.positive_int,
+                vol.Optional("override_keepalive", default=False): cv.boolean,
             }
         )
     },
     extra=vol.ALLOW_EXTRA,
 )
 
+# Vorgaben der Options: fehlende Schlüssel alter Einträge gelten als Vorgabewert
+_OPTION_DEFAULTS = {
+    str(key): key.default() for key in CONFIG_SCHEMA.schema[DOMAIN].schema if key.default is not vol.UNDEFINED
+}
+
 PLATFORMS = [
     Platform.SENSOR,
     Platform.NUMBER,
@@ -51,9 +87,28 @@ PLATFORMS = [
 ]
 
 async def async_setup(hass: HomeAssistant, config: dict):
+    await async_register_services(hass)
     return True
 
 
+@callback
+def _async_remove_groups(hass: HomeAssistant, entry_id: str, name: str, groups) -> None:
+    """Entities dieser Entry in den Geräten der Gruppen entfernen, leere Geräte ebenso."""
+    dev_reg = dr.async_get(hass)
+    ent_reg = er.async_get(hass)
+    devices = []
+    for g in groups:
+        device = dev_reg.async_get_device({(DOMAIN, f"{name}:{g}")})
+        if not device:
+            continue
+        # Geräte-Index der Registry statt Scan über alle Entities
+        for ent in er.async_entries_for_device(ent_reg, device.id, include_disabled_entities=True):
+            if ent.config_entry_id == entry_id:
+                ent_reg.async_remove(ent.entity_id)
+        devices.append(device.id)
+    async_remove_devices_if_empty(hass, devices)
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Set up the integration from a config entry."""
     # entry.data ist immutable → kopieren und Optionen überlagern
@@ -65,42 +120,158 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN][entry.entry_id] = data
 
-    # Gemeinsamer Modbus-Client + Lock für diese Entry-ID (einmalig verbinden)
+    # Gruppen ohne Vorlage mehr (Puffer 02–04, Boiler 02–08: Adressen nicht belegt) abräumen
+    stale = [g for g in data.get("extra_groups") or () if g not in TEMPLATE_GROUPS]
+    if stale:
+        data["extra_groups"] = [g for g in data["extra_groups"] if g in TEMPLATE_GROUPS]
+        # gespeicherte Auswahl bereinigen (Update-Listener ist noch nicht angemeldet)
+        hass.config_entries.async_update_entry(entry, **{
+            key: {**stored, "extra_groups": data["extra_groups"]}
+            for key, stored in (("data", entry.data), ("options", entry.options)) if "extra_groups" in stored
+        })
+        _async_remove_groups(hass, entry.entry_id, data.get("name", "Froeling"), stale)
+        _LOGGER.warning("Gruppen ohne dokumentierte Register entfernt: %s", ", ".join(stale))
+
+    # Capability-Map der Modul-Erkennung: gewählte, aber nicht gefundene Module werden
+    # nicht angelegt und nicht abgefragt (Optionen: „Module erneut erkennen“ hebt das auf)
+    absent = absent_groups(data)
+    if absent:
+        data = hass.data[DOMAIN][entry.entry_id] = skip_absent(data)
+        _async_remove_groups(hass, entry.entry_id, data.get("name", "Froeling"), absent)
+        _LOGGER.info("Bei der Erkennung nicht gefundene Module werden nicht abgefragt: %s", ", ".join(absent))
+
+    # Gemeinsamer Modbus-Transport (Client + Lock) für diese Entry-ID
+    # Frame-Tracer ist aus, bis er per Service eingeschaltet wird
+    # "rtu": RTU-Frames über TCP (RS485-Ethernet-Wandler ohne Modbus-TCP-Gateway)
+    framer = data.get("framer", "socket")
+    tracer = FrameTracer(hass.config.path(DOMAIN, f"trace_{entry.entry_id}.jsonl"), framer=framer)
     client = ModbusTcpClient(
         data["host"],
         port=data.get("port", 502),
+        framer=FramerType.RTU if framer == "rtu" else FramerType.SOCKET,
         timeout=3,
-        retries=2,
+        retries=0,  # Wiederholungen übernimmt der Transport (Reads/Writes unterschiedlich)
+        trace_packet=tracer.trace_packet,
     )
+
+    transport = FroelingTransport(hass, client, tracer, framer)
+    # Erstverbindung im Executor, parallel zum Laden der gespeicherten Zustände;
+    # der Event-Loop blockiert nicht, andere Integrationen starten derweil weiter
+    connect_task = hass.async_create_task(transport.async_connect(), f"{DOMAIN} connect {data['host']}")
+
+    async def _async_abort_setup() -> None:
+        """Verbindungsaufbau abwarten (läuft im Executor weiter), Client schließen, hass.data aufräumen."""
+        await asyncio.wait([connect_task])
+        await transport.async_close()
+        for key in [k for k in hass.data[DOMAIN] if k.startswith(entry.entry_id)]:
+            hass.data[DOMAIN].pop(key)
+
     try:
-        client.connect()
-    except Exception:
-        pass
+        # Schreib-Budget je Register und Entry (persistent), prüft jeden Holding-Write
+        budget = WriteBudget(
+            hass, entry.entry_id,
+            data.get("write_limit_hour", DEFAULT_LIMIT_HOUR), data.get("write_limit_day", DEFAULT_LIMIT_DAY),
+        )
+        await budget.async_load()
+        transport.write_budget = budget
+        poller = FroelingPoller(
+            hass, transport, timedelta(seconds=data.get("update_interval", 60)), data["unit_id"]
+        )
+        hass.data[DOMAIN][f"{entry.entry_id}_transport"] = transport
+        hass.data[DOMAIN][f"{entry.entry_id}_poller"] = poller
+
+        # Abgeleitete Kennzahlen (Starts/Tag, h/Start, kg/kWh) aus den ohnehin gelesenen Zählern
+        derived = DerivedCounters(hass, entry.entry_id)
+        await derived.async_load()
+        derived.attach(transport, poller)
+        hass.data[DOMAIN][f"{entry.entry_id}_derived"] = derived
+
+        # Zustandswechsel 34001/34002 als Events, Störungshistorie je Code
+        history = StateHistory(hass, entry.entry_id)
+        await history.async_load()
+        history.attach(transport)
+        hass.data[DOMAIN][f"{entry.entry_id}_history"] = history
+
+        # Parameter-Profile (Services save/apply/delete_parameter_profile)
+        profiles = ParameterProfiles(hass, entry.entry_id, transport, poller, data["unit_id"])
+        await profiles.async_load()
+        hass.data[DOMAIN][f"{entry.entry_id}_profiles"] = profiles
+    except BaseException:
+        # auch bei Abbruch des Setups: Verbindung nicht offen lassen
+        await _async_abort_setup()
+        raise
+
+    # Steuerung beim Start nicht erreichbar → HA versucht die Entry mit Backoff erneut
+    if not await connect_task:
+        await _async_abort_setup()
+        raise ConfigEntryNotReady(
+            f"Froeling-Steuerung {data['host']}:{data.get('port', 502)} nicht erreichbar"
+        )
 
-    lock = asyncio.Lock()
-    hass.data[DOMAIN][f"{entry.entry_id}_client"] = client
-    hass.data[DOMAIN][f"{entry.entry_id}_lock"] = lock
+    # Modbus-Sollwerte (480xx) vor Ablauf in der Steuerung erneut senden
+    if data.get("override_keepalive", False):
+        hass.data[DOMAIN][f"{entry.entry_id}_keepalive"] = OverrideKeepalive(hass, transport, data["unit_id"])
+
+    # Burst-Mitschnitt bei Zünd-/Störungszuständen (Trigger aus dem normalen Poll von 34002)
+    if data.get("burst_states"):
+        burst = BurstCapture(
+            hass, transport, entry.entry_id, data["name"], data["unit_id"],
+            data["burst_states"], data.get("burst_minutes", BURST_MINUTES),
+        )
+        burst.attach()
+        hass.data[DOMAIN][f"{entry.entry_id}_burst"] = burst
 
     _LOGGER.warning(
-        "Froeling Modbus initialisiert (pymodbus=%s, host=%s, port=%s, unit_id=%s)",
+        "Froeling Modbus initialisiert (pymodbus=%s, host=%s, port=%s, unit_id=%s, framer=%s)",
         pymodbus.__version__,
         data["host"],
         data.get("port", 502),
         data["unit_id"],
+        framer,
     )
 
+    # Entities je Plattform (build/add), damit Options-Änderungen ohne Reload möglich sind
+    hass.data[DOMAIN][f"{entry.entry_id}_entities"] = EntryEntities(hass, poller)
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # ---- Options-Update: deaktivierte Gruppen aufräumen und reloaden ----
-    async def _cleanup_disabled_groups_and_reload(
-        hass: HomeAssistant, updated_entry: ConfigEntry
-    ):
+    # Ein Timer für alle Entities dieser Entry
+    poller.async_start()
+    entry.async_on_unload(poller.async_stop)
+
+    # Schnellabtastung gewählter Kanäle → Rohwerte als JSONL + stündliche Langzeitstatistik (ohne Zustände)
+    if data.get("highrate_channels"):
+        sampler = HighRateSampler(
+            hass, transport, entry.entry_id, data["name"], data["unit_id"],
+            data["highrate_channels"], data.get("highrate_interval", HIGHRATE_INTERVAL),
+        )
+        await sampler.async_load()
+        sampler.async_start()
+        entry.async_on_unload(sampler.async_stop)
+        hass.data[DOMAIN][f"{entry.entry_id}_highrate"] = sampler
+
+    # Line-Protocol-Export je Zyklus (Datei, UNIX-Socket oder TCP), entkoppelt vom Poll
+    if data.get("export_target"):
+        try:
+            exporter = LineProtocolExporter(hass, poller, data["name"], data["export_target"])
+        except ValueError as err:
+            _LOGGER.error("%s", err)
+        else:
+            exporter.async_start()
+            hass.data[DOMAIN][f"{entry.entry_id}_exporter"] = exporter
+
+    # ---- Options-Update: Gruppen/Diagnose/Intervall direkt übernehmen, sonst aufräumen und reloaden ----
+    async def _async_options_updated(hass: HomeAssistant, updated_entry: ConfigEntry):
         old_cfg = hass.data[DOMAIN].get(updated_entry.entry_id, {})
-        new_cfg = {**updated_entry.data, **updated_entry.options}
+        new_cfg = skip_absent({**updated_entry.data, **updated_entry.options})
+        new_cfg.setdefault("unit_id", 2)
+        changed = changed_options({**_OPTION_DEFAULTS, **old_cfg}, {**_OPTION_DEFAULTS, **new_cfg})
+        if not changed:
+            return
+        if changed <= INCREMENTAL_OPTIONS:
+            await _async_apply_options(hass, updated_entry, new_cfg, changed)
+            return
 
         name = new_cfg.get("name", old_cfg.get("name", "Froeling"))
-        ent_reg = er.async_get(hass)
-        dev_reg = dr.async_get(hass)
 
         groups = [
             "kessel",
@@ -113,25 +284,37 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         ]
 
         to_remove = [g for g in groups if old_cfg.get(g, False) and not new_cfg.get(g, False)]
+        # aus Vorlagen erzeugte Gruppen stehen als Liste in "extra_groups"
+        old_extra = set(old_cfg.get("extra_groups") or ())
+        new_extra = set(new_cfg.get("extra_groups") or ())
+        to_remove.extend(g for g in TEMPLATE_GROUPS if g in old_extra and g not in new_extra)
 
-        for g in to_remove:
-            ident = (DOMAIN, f"{name}:{g}")
-            device = dev_reg.async_get_device({ident})
-            if not device:
-                continue
-
-            for ent in list(ent_reg.entities.values()):
-                if ent.config_entry_id == updated_entry.entry_id and ent.device_id == device.id:
-                    ent_reg.async_remove(ent.entity_id)
-
-            try:
-                dev_reg.async_remove_device(device.id)
-            except Exception:
-                _LOGGER.debug("Device %s konnte nicht entfernt werden", device.id)
+        _async_remove_groups(hass, updated_entry.entry_id, name, to_remove)
 
         await hass.config_entries.async_reload(updated_entry.entry_id)
 
-    entry.async_on_unload(entry.add_update_listener(_cleanup_disabled_groups_and_reload))
+    async def _async_apply_options(hass: HomeAssistant, updated_entry: ConfigEntry, new_cfg: dict, changed: set):
+        """Options ohne Reload übernehmen: Verbindung, Cache und übrige Entities bleiben."""
+        # in place, damit alle Halter des dicts (Plattformen, Services) die neuen Werte sehen
+        cfg = hass.data[DOMAIN][updated_entry.entry_id]
+        cfg.clear()
+        cfg.update(new_cfg)
+        if "update_interval" in changed:
+            poller.async_set_interval(timedelta(seconds=cfg.get("update_interval", 60)))
+        if changed & {"write_limit_hour", "write_limit_day"}:
+            budget.limit_hour = cfg.get("write_limit_hour", DEFAULT_LIMIT_HOUR)
+            budget.limit_day = cfg.get("write_limit_day", DEFAULT_LIMIT_DAY)
+        added, removed = hass.data[DOMAIN][f"{updated_entry.entry_id}_entities"].async_apply(cfg)
+        _LOGGER.info(
+            "Optionen ohne Reload übernommen (%s): %d Entities hinzugefügt, %d entfernt",
+            ", ".join(sorted(changed)), added, removed,
+        )
+        if added or removed:
+            # ein Zyklus sofort: neue Entities bekommen Werte, der Block-Read-Plan wird
+            # aus den Reads dieses Zyklus neu berechnet
+            await poller.async_refresh()
+
+    entry.async_on_unload(entry.add_update_listener(_async_options_updated))
     # --------------------------------------------------------------------
 
     return True
@@ -141,16 +324,46 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
     """Unload the config entry and close the client."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
-    client: ModbusTcpClient | None = hass.data[DOMAIN].pop(
-        f"{entry.entry_id}_client", None
+    keepalive: OverrideKeepalive | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_keepalive", None)
+    if keepalive:
+        keepalive.async_stop()
+
+    # Timer vor dem Schließen stoppen (entry.async_on_unload greift erst nach dieser
+    # Funktion) – sonst öffnet ein Tick während der folgenden awaits die Verbindung neu
+    poller: FroelingPoller | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_poller", None)
+    if poller:
+        poller.async_stop()
+    sampler: HighRateSampler | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_highrate", None)
+    if sampler:
+        await sampler.async_shutdown()
+    burst: BurstCapture | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_burst", None)
+    if burst:
+        await burst.async_finish()
+
+    transport: FroelingTransport | None = hass.data[DOMAIN].pop(
+        f"{entry.entry_id}_transport", None
     )
-    if client:
-        try:
-            client.close()
-        except Exception:
-            pass
+    if transport:
+        await transport.async_close()
+        if transport.tracer.has_pending:
+            await hass.async_add_executor_job(transport.tracer.flush)
+        if transport.write_budget is not None:
+            await transport.write_budget.async_save()
+
+    derived: DerivedCounters | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_derived", None)
+    if derived:
+        await derived.async_save()
+
+    exporter: LineProtocolExporter | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_exporter", None)
+    if exporter:
+        await exporter.async_stop()
+
+    history: StateHistory | None = hass.data[DOMAIN].pop(f"{entry.entry_id}_history", None)
+    if history:
+        await history.async_save()
 
-    hass.data[DOMAIN].pop(f"{entry.entry_id}_lock", None)
+    hass.data[DOMAIN].pop(f"{entry.entry_id}_profiles", None)
+    hass.data[DOMAIN].pop(f"{entry.entry_id}_entities", None)
     hass.data[DOMAIN].pop(entry.entry_id, None)
 
     return unload_ok
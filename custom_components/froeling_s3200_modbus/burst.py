@@ -0,0 +1,211 @@
+"""Burst-Mitschnitt: Verbrennungswerte im Sekundentakt nach Zünd-/Störungszuständen.
+
+Wechselt der Kesselzustand (34002) in einen der gewählten Zustände (z. B.
+Zünden, Fehlzündung, STÖRUNG), werden die Verbrennungsregister für N Minuten
+jede Sekunde gelesen. Der Zustand kommt über transport.add_value_listener aus
+dem normalen Poll-Zyklus, der Trigger kostet also keine zusätzlichen Reads.
+
+Die Abtastwerte liegen in einem vorab angelegten Ringpuffer (array, Rohwerte);
+ein erneuter Trigger während des Mitschnitts verlängert ihn, ältere Zeilen
+werden dann überschrieben. Am Ende wird der Mitschnitt als CSV unter
+<config>/froeling_s3200_modbus/ geschrieben und ein Event
+froeling_s3200_modbus_burst_capture mit Pfad und Kurzstatistik ausgelöst.
+"""
+from __future__ import annotations
+
+import csv
+import logging
+import os
+from array import array
+from datetime import datetime, timedelta
+from time import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN, KESSELZUSTAND_MAPPING
+from .highrate import CHANNELS, scaled
+from .readplan import INPUT, MAX_GAP, compile_plan
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_BURST_CAPTURE = f"{DOMAIN}_burst_capture"
+
+REG_KESSELZUSTAND = 34002
+SAMPLE_INTERVAL = timedelta(seconds=1)
+DEFAULT_MINUTES = 5
+DEFAULT_STATES = ["0", "9", "18"]  # STÖRUNG, Zünden, Fehlzündung
+
+# Wählbare Trigger: Zündphasen und alle Störungs-/Fehlerzustände
+TRIGGER_STATES = {
+    str(code): text for code, text in KESSELZUSTAND_MAPPING.items()
+    if code in (9, 18, 27, 34, 35) or text.startswith(("STÖRUNG", "FEHLER"))
+}
+
+# Spalten: Kesselzustand + Verbrennungsregister (30002, 30004, 30005, 30007, 30011–30017, 30089)
+BURST_CHANNELS = [c for c in CHANNELS if CHANNELS[c][0] != 30001]
+_MISSING = -1
+
+
+class RingBuffer:
+    """Zeitstempel (double) und Rohwerte (int32, -1 = nicht gelesen) je Zeile, fest allokiert."""
+
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self.width = width
+        self._times = array("d", bytes(8 * capacity))
+        self._values = array("i", [_MISSING]) * (capacity * width)
+        self._next = 0
+        self.count = 0
+
+    def clear(self) -> None:
+        self._next = 0
+        self.count = 0
+
+    def append(self, ts: float, row) -> None:
+        i = self._next
+        self._times[i] = ts
+        base = i * self.width
+        for col, value in enumerate(row):
+            self._values[base + col] = value
+        self._next = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def rows(self):
+        """(Zeitstempel, [Rohwerte]) vom ältesten zum neuesten Eintrag."""
+        start = (self._next - self.count) % self.capacity
+        for k in range(self.count):
+            i = (start + k) % self.capacity
+            yield self._times[i], self._values[i * self.width:(i + 1) * self.width].tolist()
+
+
+class BurstCapture:
+    """Beobachtet 34002 und schneidet nach einem Trigger die Verbrennungswerte mit."""
+
+    def __init__(self, hass: HomeAssistant, transport, entry_id: str, name: str, unit_id: int,
+                 states, minutes: int = DEFAULT_MINUTES):
+        self._hass = hass
+        self._transport = transport
+        self._entry_id = entry_id
+        self._name = slugify(name)
+        self._unit_id = unit_id
+        self._states = {int(s) for s in states}
+        self._duration = max(1, minutes) * 60
+        self._columns = [REG_KESSELZUSTAND] + [CHANNELS[c][0] for c in BURST_CHANNELS]
+        self._col_of = {reg - 30001: i for i, reg in enumerate(self._columns)}
+        self._plan = compile_plan(
+            ((INPUT, a, 1) for a in self._col_of), MAX_GAP.get(transport.framer, MAX_GAP["socket"])
+        )
+        self._buffer = RingBuffer(self._duration, len(self._columns))
+        self._last_state: int | None = None
+        self._trigger: tuple[int, int | None] | None = None
+        self._started = 0.0
+        self._end = 0.0
+        self._unsub = None
+        self._sampling = False
+        self.captures = 0
+        self.last_path: str | None = None
+
+    @property
+    def active(self) -> bool:
+        return self._unsub is not None
+
+    def attach(self) -> None:
+        self._transport.add_value_listener(INPUT, REG_KESSELZUSTAND - 30001, self._on_state)
+
+    def _on_state(self, _addr: int, value: int) -> None:
+        prev, self._last_state = self._last_state, value
+        if prev is None or value == prev or value not in self._states:
+            return
+        self.async_trigger(value, prev)
+
+    @callback
+    def async_trigger(self, state: int, prev: int | None = None) -> None:
+        now = time()
+        self._end = now + self._duration
+        if self.active:
+            _LOGGER.debug("Burst-Mitschnitt verlängert (%s)", KESSELZUSTAND_MAPPING.get(state, state))
+            return
+        _LOGGER.info("Burst-Mitschnitt gestartet: %s → %s",
+                     KESSELZUSTAND_MAPPING.get(prev, prev), KESSELZUSTAND_MAPPING.get(state, state))
+        self._trigger = (state, prev)
+        self._started = now
+        self._buffer.clear()
+        self._unsub = async_track_time_interval(self._hass, self._async_sample, SAMPLE_INTERVAL)
+        self._hass.async_create_task(self._async_sample())
+
+    async def _async_sample(self, _=None) -> None:
+        if self._sampling:
+            return
+        if time() >= self._end:
+            await self.async_finish()
+            return
+        self._sampling = True
+        try:
+            row = [_MISSING] * len(self._columns)
+            for block in self._plan:
+                res, err = await self._transport.async_read_input(self._unit_id, block.addr, block.count)
+                if err is not None:
+                    continue
+                for i, raw in enumerate(res.registers[: block.count]):
+                    col = self._col_of.get(block.addr + i)
+                    if col is not None:
+                        row[col] = raw
+        finally:
+            self._sampling = False
+        self._buffer.append(time(), row)
+
+    async def async_finish(self) -> None:
+        """Mitschnitt beenden, CSV schreiben und Event auslösen (auch beim Entladen)."""
+        if self._unsub is None:
+            return
+        self._unsub()
+        self._unsub = None
+        rows = list(self._buffer.rows())
+        if not rows:
+            return
+        state, prev = self._trigger
+        started = dt_util.utc_from_timestamp(self._started)
+        path = self._hass.config.path(
+            DOMAIN, f"burst_{self._name}_{dt_util.as_local(started):%Y%m%d_%H%M%S}.csv"
+        )
+        await self._hass.async_add_executor_job(self._write_csv, path, rows)
+        self.captures += 1
+        self.last_path = path
+        self._hass.bus.async_fire(EVENT_BURST_CAPTURE, {
+            "config_entry_id": self._entry_id,
+            "trigger": KESSELZUSTAND_MAPPING.get(state, str(state)),
+            "trigger_code": state,
+            "previous": KESSELZUSTAND_MAPPING.get(prev, prev) if prev is not None else None,
+            "start": started.isoformat(),
+            "end": dt_util.utc_from_timestamp(rows[-1][0]).isoformat(),
+            "samples": len(rows),
+            "path": path,
+            "summary": self._summary(rows),
+        })
+        _LOGGER.info("Burst-Mitschnitt gespeichert: %s (%d Zeilen)", path, len(rows))
+
+    def _summary(self, rows) -> dict:
+        """Min/Max/Mittel je Kanal (skaliert) für das Event."""
+        summary = {}
+        for col, channel in enumerate(BURST_CHANNELS, start=1):
+            values = [scaled(channel, r[col]) for _, r in rows if r[col] != _MISSING]
+            if values:
+                summary[channel] = {
+                    "min": min(values), "max": max(values), "mean": round(sum(values) / len(values), 2),
+                }
+        return summary
+
+    def _write_csv(self, path: str, rows) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(["time", "kesselzustand", *BURST_CHANNELS])
+            for ts, raw in rows:
+                state = KESSELZUSTAND_MAPPING.get(raw[0], "") if raw[0] != _MISSING else ""
+                writer.writerow([
+                    datetime.fromtimestamp(ts).isoformat(timespec="seconds"),
+                    state,
+                    *("" if v == _MISSING else scaled(c, v) for c, v in zip(BURST_CHANNELS, raw[1:])),
+                ])
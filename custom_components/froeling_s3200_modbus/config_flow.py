@@ -1,7 +1,83 @@
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
+from pymodbus import FramerType
+from pymodbus.client import ModbusTcpClient
+from .burst import DEFAULT_MINUTES as BURST_MINUTES, DEFAULT_STATES as BURST_DEFAULT_STATES, TRIGGER_STATES
 from .const import DOMAIN
+from .discovery import absent_groups, async_discover, describe, groups_from_capabilities, names, recommend
+from .exporter import parse_target
+from .highrate import CHANNELS as HIGHRATE_CHANNELS, DEFAULT_INTERVAL as HIGHRATE_INTERVAL
+from .templates import DEVICE_NAME as TEMPLATE_DEVICE_NAME
+from .writebudget import DEFAULT_LIMIT_DAY, DEFAULT_LIMIT_HOUR
+from .transport import read_input_sync
+
+# Weitere Heizkreise/Puffer/Boiler (aus Vorlagen erzeugt)
+EXTRA_GROUPS = cv.multi_select(TEMPLATE_DEVICE_NAME)
+
+# Kanäle der Schnellabtastung (Langzeitstatistik)
+HIGHRATE = cv.multi_select({key: ch[3] for key, ch in HIGHRATE_CHANNELS.items()})
+
+# Kesselzustände, die einen Burst-Mitschnitt auslösen
+BURST_STATES = cv.multi_select(TRIGGER_STATES)
+
+# Vorgaben ohne Modul-Erkennung (Gerät bei der Einrichtung nicht erreichbar)
+DEFAULT_GROUPS = {
+    "kessel": True,
+    "boiler01": True,
+    "hk01": True,
+    "hk02": True,
+    "austragung": True,
+    "puffer01": True,
+    "zirkulationspumpe": True,
+    "extra_groups": [],
+}
+
+
+def _groups_schema(defaults: dict) -> dict:
+    return {
+        vol.Optional("kessel", default=defaults["kessel"]): bool,
+        vol.Optional("boiler01", default=defaults["boiler01"]): bool,
+        vol.Optional("hk01", default=defaults["hk01"]): bool,
+        vol.Optional("hk02", default=defaults["hk02"]): bool,
+        vol.Optional("austragung", default=defaults["austragung"]): bool,
+        vol.Optional("puffer01", default=defaults["puffer01"]): bool,
+        vol.Optional("zirkulationspumpe", default=defaults["zirkulationspumpe"]): bool,
+        vol.Optional("extra_groups", default=defaults["extra_groups"]): EXTRA_GROUPS,
+    }
+
+
+async def _async_discover_with_client(hass, cfg: dict, rtts: list | None = None):
+    """Modul-Erkennung über einen kurzlebigen Client (Integration läuft noch nicht)."""
+    framer = cfg.get("framer", "socket")
+    client = ModbusTcpClient(
+        cfg["host"],
+        port=cfg.get("port", 502),
+        framer=FramerType.RTU if framer == "rtu" else FramerType.SOCKET,
+        timeout=3,
+        retries=1,
+    )
+    unit_id = cfg.get("unit_id", 2)
+
+    async def _read(addr, count):
+        return await hass.async_add_executor_job(read_input_sync, client, unit_id, addr, count)
+
+    try:
+        return await async_discover(_read, framer, rtts)
+    finally:
+        await hass.async_add_executor_job(client.close)
+
+
+async def _async_discover_with_transport(transport, cfg: dict):
+    """Modul-Erkennung über den laufenden Transport (Lock, Breaker, Statistik)."""
+    unit_id = cfg.get("unit_id", 2)
+
+    async def _read(addr, count):
+        return await transport.async_read_input(unit_id, addr, count)
+
+    return await async_discover(_read, transport.framer)
+
 
 # Erstanlage (UI-Flow) + Options-Flow (nachträgliche Konfiguration)
 
@@ -9,10 +85,22 @@ from .const import DOMAIN
 class FroelingModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle the initial config flow."""
 
+    def __init__(self):
+        self._data: dict = {}
+        self._capabilities: dict | None = None
+        self._discovery_error: str | None = None
+        self._probe: dict | None = None
+
     async def async_step_user(self, user_input=None):
         if user_input is not None:
-            # Alles als entry.data speichern
-            return self.async_create_entry(title=user_input["name"], data=user_input)
+            self._data = user_input
+            # Module erkennen und dabei die Antwortzeit messen; bei Fehler mit den
+            # bisherigen Vorgaben weiter
+            rtts: list[float] = []
+            self._capabilities, err = await _async_discover_with_client(self.hass, user_input, rtts)
+            self._discovery_error = str(err) if err else None
+            self._probe = recommend(rtts, self._capabilities) if err is None else None
+            return await self.async_step_modules()
 
         return self.async_show_form(
             step_id="user",
@@ -21,17 +109,44 @@ class FroelingModbusConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required("host"): str,
                 vol.Required("port", default=502): int,
                 vol.Optional("unit_id", default=2): int,
-                vol.Required("update_interval", default=60): int,
-                vol.Optional("kessel", default=True): bool,
-                vol.Optional("boiler01", default=True): bool,
-                vol.Optional("hk01", default=True): bool,
-                vol.Optional("hk02", default=True): bool,
-                vol.Optional("austragung", default=True): bool,
-                vol.Optional("puffer01", default=True): bool,
-                vol.Optional("zirkulationspumpe", default=True): bool,
+                vol.Optional("framer", default="socket"): vol.In(["socket", "rtu"]),
+                vol.Optional("diagnostics", default=False): bool,
             })
         )
 
+    async def async_step_modules(self, user_input=None):
+        if user_input is not None:
+            # Alles als entry.data speichern, inkl. Capability-Map der Erkennung
+            data = {**self._data, **user_input}
+            if self._capabilities is not None:
+                data["capabilities"] = self._capabilities
+            if self._probe is not None:
+                data["link_probe"] = self._probe
+            return self.async_create_entry(title=self._data["name"], data=data)
+
+        if self._capabilities is not None:
+            defaults = groups_from_capabilities(self._capabilities)
+        else:
+            defaults = DEFAULT_GROUPS
+        # Intervall-Vorgabe aus der gemessenen Antwortzeit (ohne Messung: 60 s)
+        probe = self._probe or {}
+        return self.async_show_form(
+            step_id="modules",
+            data_schema=vol.Schema({
+                vol.Required("update_interval", default=probe.get("update_interval", 60)):
+                    vol.All(int, vol.Range(min=1)),
+                **_groups_schema(defaults),
+            }),
+            description_placeholders={
+                "found": describe(self._capabilities),
+                "error": self._discovery_error or "–",
+                "rtt": f"{probe['rtt_ms_p50']:g} / {probe['rtt_ms_p90']:g}" if probe else "–",
+                "requests": str(probe.get("requests_per_cycle", "–")),
+                "interval": str(probe.get("update_interval", "–")),
+                "highrate": str(probe.get("highrate_interval", "–")),
+            },
+        )
+
     @staticmethod
     @callback
     def async_get_options_flow(config_entry):
@@ -43,24 +158,69 @@ class FroelingOptionsFlow(config_entries.OptionsFlow):
 
     def __init__(self, config_entry):
         self.config_entry = config_entry
+        self._capabilities: dict | None = None
+        self._discovery_error: str | None = None
 
     async def async_step_init(self, user_input=None):
         # aktuelle Werte: options > data
         cfg = {**self.config_entry.data, **self.config_entry.options}
+        errors = {}
 
         if user_input is not None:
-            # nur als Optionen speichern (entry.options)
-            return self.async_create_entry(title="", data=user_input)
+            if user_input.get("export_target"):
+                try:
+                    parse_target(user_input["export_target"])
+                except ValueError:
+                    errors["export_target"] = "invalid_export_target"
+            if errors:
+                cfg = {**cfg, **user_input}
+            elif user_input.pop("rediscover", False):
+                transport = self.hass.data.get(DOMAIN, {}).get(f"{self.config_entry.entry_id}_transport")
+                if transport is not None:
+                    self._capabilities, err = await _async_discover_with_transport(transport, cfg)
+                    self._discovery_error = str(err) if err else None
+                else:
+                    self._discovery_error = "not_loaded"
+                # Formular mit den neu erkannten Modulen als Vorgabe erneut zeigen
+                cfg = {**cfg, **user_input}
+                if self._capabilities is not None:
+                    cfg.update(groups_from_capabilities(self._capabilities))
+            else:
+                if self._capabilities is not None:
+                    user_input["capabilities"] = self._capabilities
+                # nur als Optionen speichern (entry.options)
+                return self.async_create_entry(title="", data=user_input)
 
+        defaults = {k: cfg.get(k, v) for k, v in DEFAULT_GROUPS.items()}
         schema = vol.Schema({
             vol.Optional("unit_id", default=cfg.get("unit_id", 2)): int,
+            vol.Optional("framer", default=cfg.get("framer", "socket")): vol.In(["socket", "rtu"]),
             vol.Optional("update_interval", default=cfg.get("update_interval", 60)): int,
-            vol.Optional("kessel", default=cfg.get("kessel", True)): bool,
-            vol.Optional("boiler01", default=cfg.get("boiler01", True)): bool,
-            vol.Optional("hk01", default=cfg.get("hk01", True)): bool,
-            vol.Optional("hk02", default=cfg.get("hk02", True)): bool,
-            vol.Optional("austragung", default=cfg.get("austragung", True)): bool,
-            vol.Optional("puffer01", default=cfg.get("puffer01", True)): bool,
-            vol.Optional("zirkulationspumpe", default=cfg.get("zirkulationspumpe", True)): bool,
+            **_groups_schema(defaults),
+            vol.Optional("diagnostics", default=cfg.get("diagnostics", False)): bool,
+            vol.Optional("highrate_channels", default=cfg.get("highrate_channels", [])): HIGHRATE,
+            vol.Optional("highrate_interval", default=cfg.get("highrate_interval", HIGHRATE_INTERVAL)):
+                vol.All(int, vol.Range(min=1, max=60)),
+            vol.Optional("burst_states", default=cfg.get("burst_states", BURST_DEFAULT_STATES)): BURST_STATES,
+            vol.Optional("burst_minutes", default=cfg.get("burst_minutes", BURST_MINUTES)):
+                vol.All(int, vol.Range(min=1, max=30)),
+            vol.Optional("export_target", default=cfg.get("export_target", "")): str,
+            # Schreib-Budget: Writes je Register und Stunde / je Entry und Tag (0 = unbegrenzt)
+            vol.Optional("write_limit_hour", default=cfg.get("write_limit_hour", DEFAULT_LIMIT_HOUR)):
+                vol.All(int, vol.Range(min=0)),
+            vol.Optional("write_limit_day", default=cfg.get("write_limit_day", DEFAULT_LIMIT_DAY)):
+                vol.All(int, vol.Range(min=0)),
+            vol.Optional("override_keepalive", default=cfg.get("override_keepalive", False)): bool,
+            vol.Optional("rediscover", default=False): bool,
         })
-        return self.async_show_form(step_id="init", data_schema=schema)
+        capabilities = self._capabilities if self._capabilities is not None else cfg.get("capabilities")
+        return self.async_show_form(
+            step_id="init",
+            data_schema=schema,
+            description_placeholders={
+                "found": describe(capabilities),
+                "error": self._discovery_error or "–",
+                "skipped": names(absent_groups({**cfg, "capabilities": capabilities})),
+            },
+            errors=errors,
+        )
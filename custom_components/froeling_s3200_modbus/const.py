@@ -1 +1,21 @@
 DOMAIN = "froeling_s3200_modbus"
+
+# Zustandstexte 34001 (Anlage) und 34002 (Kessel); genutzt von Sensoren, Historie und Burst-Mitschnitt
+ANLAGENZUSTAND_MAPPING = {
+    0:"Dauerlast",1:"Brauchwasser",2:"Automatik",3:"Scheitholzbetr",4:"Reinigen",5:"Ausgeschaltet",6:"Extraheizen",7:"Kaminkehrer",8:"Reinigen"
+}
+
+KESSELZUSTAND_MAPPING = {
+    0:"STÖRUNG",1:"Kessel Aus",2:"Anheizen",3:"Heizen",4:"Feuererhaltung",5:"Feuer Aus",6:"Tür offen",7:"Vorbereitung",8:"Vorwärmen",9:"Zünden",
+    10:"Abstellen Warten",11:"Abstellen Warten1",12:"Abstellen Einschub1",13:"Abstellen Warten2",14:"Abstellen Einschub2",15:"Abreinigen",
+    16:"2h warten",17:"Saugen / Heizen",18:"Fehlzündung",19:"Betriebsbereit",20:"Rost schließen",21:"Stoker leeren",22:"Vorheizen",23:"Saugen",
+    24:"RSE schließen",25:"RSE öffnen",26:"Rost kippen",27:"Vorwärmen-Zünden",28:"Resteinschub",29:"Stoker auffüllen",30:"Lambdasonde aufheizen",
+    31:"Gebläsenachlauf I",32:"Gebläsenachlauf II",33:"Abgestellt",34:"Nachzünden",35:"Zünden Warten",36:"FB: RSE schließen",37:"FB: Kessel belüften",
+    38:"FB: Zünden",39:"FB: min. Einschub",40:"RSE schließen",41:"STÖRUNG: STB/NA",42:"STÖRUNG: Kipprost",43:"STÖRUNG: FR-Überdr.",44:"STÖRUNG: Türkont.",
+    45:"STÖRUNG: Saugzug",46:"STÖRUNG: Umfeld",47:"FEHLER: STB/NA",48:"FEHLER: Kipprost",49:"FEHLER: FR-Überdr.",50:"FEHLER: Türkont.",
+    51:"FEHLER: Saugzug",52:"FEHLER: Umfeld",53:"FEHLER: Stoker",54:"STÖRUNG: Stoker",55:"FB: Stoker leeren",56:"Vorbelüften",57:"STÖRUNG: Hackgut",
+    58:"FEHLER: Hackgut",59:"NB: Tür offen",60:"NB: Anheizen",61:"NB: Heizen",62:"FEHLER: STB/NA",63:"FEHLER: Allgemein",64:"NB: Feuer Aus",
+    65:"Selbsttest aktiv",66:"Fehlerbeh. 20min",67:"FEHLER: Fallschacht",68:"STÖRUNG: Fallschacht",69:"Reinigen möglich",70:"Heizen - Reinigen",
+    71:"SH Anheizen",72:"SH Heizen",73:"SH Heiz/Abstell",74:"STÖRUNG sicher",75:"AGR Nachlauf",76:"AGR reinigen",77:"Zündung AUS",78:"Filter reinigen",
+    79:"Anheizassistent",80:"SH Zünden",81:"SH Störung",82:"Sensorcheck"
+}
@@ -0,0 +1,150 @@
+"""Abgeleitete Kennzahlen aus Zählerregistern (Starts/Tag, Stunden/Start, kg/kWh).
+
+Die Zähler werden ohnehin von Entities gelesen; die Werte kommen über
+transport.add_value_listener, also ohne zusätzliche Modbus-Reads. Jeder Zähler
+wird zu einer monoton steigenden Summe aufintegriert (Rücksetzen des Zählers
+erkannt), davon werden in festem Abstand Stützpunkte abgelegt. Die Kennzahlen
+sind Differenzen über ein rollierendes Zeitfenster – keine Abfragen an den
+Recorder. Summen und Stützpunkte werden in .storage gesichert.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from collections import deque
+
+from homeassistant.helpers.storage import Store
+
+from .readplan import INPUT
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 300  # s; zusätzlich beim Entladen
+
+# Zählerregister (Input, Skalierung 1)
+REG_BETRIEBSSTUNDEN = 30021
+REG_BRENNERSTARTS = 30023
+REG_KG_ZAEHLER = 30082      # rücksetzbar
+REG_GESAMTERTRAG = 30086    # kWh
+COUNTERS = {
+    "hours": REG_BETRIEBSSTUNDEN,
+    "starts": REG_BRENNERSTARTS,
+    "kg": REG_KG_ZAEHLER,
+    "kwh": REG_GESAMTERTRAG,
+}
+
+SNAPSHOT_INTERVAL = 900           # ein Stützpunkt je 15 min
+MAX_WINDOW = 7 * 86400            # längstes Fenster → 672 Stützpunkte
+MIN_SPAN = 3600                   # Kennzahlen erst ab 1 h Historie
+
+# Kennzahl → (Fenster in s, Zähler, Nenner-Zähler bzw. None für "pro Tag")
+METRICS = {
+    "brennerstarts_pro_tag": (86400, "starts", None),
+    "betriebsstunden_pro_start": (MAX_WINDOW, "hours", "starts"),
+    "pellets_kg_pro_kwh": (MAX_WINDOW, "kg", "kwh"),
+}
+
+
+class DerivedCounters:
+    """Aufintegrierte Zähler + Stützpunkte; berechnet die Kennzahlen am Zyklusende."""
+
+    def __init__(self, hass, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"froeling_s3200_modbus.{entry_id}_derived")
+        self._last_raw: dict[str, int] = {}
+        self._totals: dict[str, float] = {name: 0.0 for name in COUNTERS}
+        self._seen: set[str] = set()
+        self._snapshots: deque = deque(maxlen=MAX_WINDOW // SNAPSHOT_INTERVAL + 1)
+        self.resets: dict[str, int] = {name: 0 for name in COUNTERS}
+        self.values: dict[str, float | None] = {name: None for name in METRICS}
+        self._listeners: list = []
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._last_raw = dict(stored.get("last_raw", {}))
+        self._totals.update(stored.get("totals", {}))
+        self._seen = set(stored.get("seen", ()))
+        self.resets.update(stored.get("resets", {}))
+        self._snapshots.extend(tuple(s) for s in stored.get("snapshots", ()))
+        self._compute(time.time())
+
+    def _data_to_save(self) -> dict:
+        return {
+            "last_raw": self._last_raw,
+            "totals": self._totals,
+            "seen": sorted(self._seen),
+            "resets": self.resets,
+            "snapshots": list(self._snapshots),
+        }
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._data_to_save())
+
+    def attach(self, transport, poller) -> None:
+        """Als Beobachter der Zählerregister und des Poll-Zyklus anmelden."""
+        for name, reg in COUNTERS.items():
+            transport.add_value_listener(INPUT, reg - 30001, self._make_listener(name))
+        poller.async_add_cycle_listener(self.async_cycle_done)
+
+    def add_listener(self, listener) -> None:
+        """Callback nach jeder Neuberechnung (Sensoren)."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _make_listener(self, name: str):
+        def _on_value(_addr: int, value: int) -> None:
+            self.update(name, value)
+        return _on_value
+
+    def update(self, name: str, raw: int) -> None:
+        last = self._last_raw.get(name)
+        self._last_raw[name] = raw
+        self._seen.add(name)
+        if last is None or raw == last:
+            return
+        if raw > last:
+            self._totals[name] += raw - last
+        else:
+            # Zähler zurückgesetzt (kg-Zähler am Display, Gerätetausch): ab 0 weitergezählt
+            self.resets[name] = self.resets.get(name, 0) + 1
+            self._totals[name] += raw
+            _LOGGER.debug("Zähler %s zurückgesetzt (%s → %s)", name, last, raw)
+
+    def async_cycle_done(self) -> None:
+        now = time.time()
+        if not self._snapshots or now - self._snapshots[-1][0] >= SNAPSHOT_INTERVAL:
+            self._snapshots.append((now, *(self._totals[n] for n in COUNTERS)))
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        self._compute(now)
+        for listener in list(self._listeners):
+            listener()
+
+    def _compute(self, now: float) -> None:
+        names = list(COUNTERS)
+        for metric, (window, num, den) in METRICS.items():
+            if num not in self._seen or (den is not None and den not in self._seen):
+                self.values[metric] = None
+                continue
+            # ältester Stützpunkt im Fenster (Stützpunkte sind zeitlich sortiert)
+            start = next((s for s in self._snapshots if s[0] >= now - window), None)
+            if start is None or now - start[0] < MIN_SPAN:
+                self.values[metric] = None
+                continue
+            d_num = self._totals[num] - start[1 + names.index(num)]
+            if den is None:
+                self.values[metric] = round(d_num * 86400.0 / (now - start[0]), 2)
+                continue
+            d_den = self._totals[den] - start[1 + names.index(den)]
+            self.values[metric] = round(d_num / d_den, 3) if d_den > 0 else None
+
+    def attributes(self, metric: str) -> dict:
+        window, num, den = METRICS[metric]
+        return {
+            "window_h": window // 3600,
+            "counter_resets": {n: self.resets.get(n, 0) for n in (num, den) if n},
+        }
@@ -0,0 +1,38 @@
+"""Geräte-Gruppierung: ein HA-Gerät je Modul, verbunden über die Steuerung."""
+from __future__ import annotations
+
+from . import templates
+
+SW_VERSION = "0.3.1"
+
+DEVICE_NAME = {
+    "controller": "SP Dual Compact",
+    "kessel": "Kessel",
+    "boiler01": "Boiler 01",
+    "hk01": "Heizkreis 01",
+    "hk02": "Heizkreis 02",
+    "puffer01": "Puffer 01",
+    "austragung": "Austragung",
+    "zirkulationspumpe": "Zirkulationspumpe",
+    **templates.DEVICE_NAME,
+}
+
+
+def device_info_for(device_key: str, device_name_from_config: str, domain: str):
+    dev_name = DEVICE_NAME.get(device_key, device_key)
+    if device_key == "controller":
+        return {
+            "identifiers": {(domain, f"{device_name_from_config}:controller")},
+            "name": "SP Dual Compact",
+            "manufacturer": "Fröling",
+            "model": "SP Dual Compact",
+            "sw_version": SW_VERSION,
+        }
+    return {
+        "identifiers": {(domain, f"{device_name_from_config}:{device_key}")},
+        "name": dev_name,
+        "manufacturer": "Fröling",
+        "model": dev_name,
+        "via_device": (domain, f"{device_name_from_config}:controller"),
+        "sw_version": SW_VERSION,
+    }
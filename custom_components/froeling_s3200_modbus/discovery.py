@@ -0,0 +1,184 @@
+"""Modul-Erkennung: welche Heizkreise, Puffer und Boiler sind tatsächlich vorhanden?
+
+Je Modul werden einige Input-Register (Fühler, Pumpenansteuerung) geprüft. Alle
+Prüfregister werden wie im Poll-Zyklus zu wenigen Block-Reads zusammengefasst;
+scheitert ein Block mit einer Modbus-Exception, werden nur seine Prüfregister
+einzeln nachgelesen. Ein Modul gilt als vorhanden, wenn mindestens eines seiner
+Register lesbar und ungleich 0 ist – nicht konfigurierte Module liefern 0 oder
+Illegal Data Address.
+
+Dabei wird die Antwortzeit jeder Anfrage gemessen; recommend() leitet daraus
+das kleinste sinnvolle Abfrageintervall und den Takt der Schnellabtastung ab.
+"""
+from __future__ import annotations
+
+import logging
+import math
+from time import perf_counter
+
+from . import templates
+from .readplan import INPUT, MAX_GAP, compile_plan
+from .transport import ERR_CIRCUIT_OPEN, ERR_CONNECTION, ERR_TIMEOUT, percentile
+
+_LOGGER = logging.getLogger(__name__)
+
+# Prüfregister der fest eingebauten Gruppen (Input, 3xxxx)
+FIXED_PROBES = {
+    "kessel": (30001, 30002),               # Kessel-/Abgastemperatur
+    "austragung": (30020, 30022),           # Stromaufnahme Austragsschnecke, Füllstand
+    "zirkulationspumpe": (30711, 30712),    # Drehzahl Pumpe, Rücklauftemperatur
+    "hk01": (31031, 31032),
+    "hk02": (31061, 31062),
+    "puffer01": (32001, 32002, 32003),
+    "boiler01": (31631, 31633),
+}
+
+_FIXED_NAMES = {
+    "kessel": "Kessel",
+    "austragung": "Austragung",
+    "zirkulationspumpe": "Zirkulationspumpe",
+    "hk01": "Heizkreis 01",
+    "hk02": "Heizkreis 02",
+    "puffer01": "Puffer 01",
+    "boiler01": "Boiler 01",
+}
+
+_UNREACHABLE = (ERR_TIMEOUT, ERR_CONNECTION, ERR_CIRCUIT_OPEN)
+
+
+def probe_registers() -> dict[str, tuple[int, ...]]:
+    """Gruppe → Prüfregister, inkl. aller Vorlagen-Instanzen (hk03…hk18)."""
+    probes = dict(FIXED_PROBES)
+    for template in templates.TEMPLATES:
+        for n in range(template.first, template.last + 1):
+            probes[templates.group_key(template, n)] = tuple(
+                reg for kind, reg in templates.registers(template, n) if kind == "input"
+            )
+    return probes
+
+
+async def async_discover(read_input, framer: str = "socket", rtts: list | None = None):
+    """Alle Module prüfen.
+
+    read_input(addr, count) ist eine Coroutine mit (res, err)-Ergebnis (0-basierte
+    Adresse, FC04). Liefert ({gruppe: vorhanden}, None) oder (None, err), wenn
+    das Gerät nicht erreichbar ist. In rtts (optional) landen die Antwortzeiten
+    erfolgreicher Anfragen in Sekunden.
+    """
+    async def _timed(addr, count):
+        t = perf_counter()
+        res, err = await read_input(addr, count)
+        if err is None and rtts is not None:
+            rtts.append(perf_counter() - t)
+        return res, err
+
+    probes = probe_registers()
+    wanted = sorted({reg - 30001 for regs in probes.values() for reg in regs})
+    values: dict[int, int] = {}
+    requests = 0
+    t0 = perf_counter()
+
+    for block in compile_plan(((INPUT, a, 1) for a in wanted), MAX_GAP.get(framer, MAX_GAP["socket"])):
+        res, err = await _timed(block.addr, block.count)
+        requests += 1
+        if err is None:
+            values.update(zip(range(block.addr, block.addr + block.count), res.registers))
+            continue
+        if getattr(err, "kind", err) in _UNREACHABLE:
+            return None, err
+        # Block enthält nicht vorhandene Adressen → nur die Prüfregister einzeln
+        for addr in (a for a in wanted if block.addr <= a < block.addr + block.count):
+            res, err = await _timed(addr, 1)
+            requests += 1
+            if err is None:
+                values[addr] = res.registers[0]
+            elif getattr(err, "kind", err) in _UNREACHABLE:
+                return None, err
+
+    found = {
+        group: any(values.get(reg - 30001, 0) != 0 for reg in regs) for group, regs in probes.items()
+    }
+    _LOGGER.debug(
+        "Modul-Erkennung: %d Anfragen in %.0f ms, gefunden: %s",
+        requests, (perf_counter() - t0) * 1000.0, ", ".join(g for g, ok in found.items() if ok),
+    )
+    return found, None
+
+
+def groups_from_capabilities(capabilities: dict) -> dict:
+    """Capability-Map → Formular-Vorgaben (feste Gruppen als bool, Vorlagen als extra_groups)."""
+    defaults = {g: bool(capabilities.get(g, False)) for g in FIXED_PROBES}
+    defaults["extra_groups"] = [g for g in templates.TEMPLATE_GROUPS if capabilities.get(g)]
+    return defaults
+
+
+def absent_groups(cfg: dict) -> list[str]:
+    """Gewählte Gruppen, die die gespeicherte Erkennung als nicht vorhanden meldet."""
+    capabilities = cfg.get("capabilities") or {}
+    extra = cfg.get("extra_groups") or ()
+    return [
+        g for g in probe_registers()
+        if capabilities.get(g) is False and (cfg.get(g) is True or g in extra)
+    ]
+
+
+def skip_absent(cfg: dict) -> dict:
+    """Konfiguration ohne die nicht gefundenen Gruppen (werden weder angelegt noch abgefragt)."""
+    absent = absent_groups(cfg)
+    if not absent:
+        return cfg
+    cfg = {**cfg, **{g: False for g in absent if g in FIXED_PROBES}}
+    cfg["extra_groups"] = [g for g in cfg.get("extra_groups") or () if g not in absent]
+    return cfg
+
+
+def describe(capabilities: dict | None) -> str:
+    """Gefundene Module als kurze Liste für die Formular-Beschreibung."""
+    if not capabilities:
+        return "–"
+    return names([g for g in probe_registers() if capabilities.get(g)])
+
+
+def names(groups) -> str:
+    """Gruppen-Keys → Anzeigenamen für Formular-Beschreibungen."""
+    labels = {**templates.DEVICE_NAME, **_FIXED_NAMES}
+    return ", ".join(labels.get(g, g) for g in groups) if groups else "–"
+
+
+# ---------- Intervall-Empfehlung aus der gemessenen Antwortzeit ----------
+# Block-Reads je Poll-Zyklus (gemessen mit tools/s3200_sim.py): Controller-Werte
+# plus etwa zwei Blöcke je festem Modul, einer je weiterer Vorlagen-Instanz
+CYCLE_REQUESTS_BASE = 6
+CYCLE_REQUESTS_FIXED = 2
+CYCLE_REQUESTS_TEMPLATE = 1
+# Anteil der Strecke, den der Poll-Zyklus höchstens belegen soll (Rest: Writes,
+# Schnellabtastung, Burst-Mitschnitt)
+POLL_LINK_SHARE = 0.2
+INTERVAL_STEPS = (10, 15, 20, 30, 45, 60, 90, 120, 180, 300)
+# Schnellabtastung: Kanäle liegen in zwei Blöcken, höchstens halbe Strecke
+HIGHRATE_REQUESTS = 2
+HIGHRATE_LINK_SHARE = 0.5
+
+
+def recommend(rtts: list[float], capabilities: dict | None) -> dict | None:
+    """Antwortzeiten der Erkennung → empfohlenes Abfrageintervall und Schnellabtastung (s)."""
+    if not rtts:
+        return None
+    rtts = sorted(rtts)
+    rtt = percentile(rtts, 90)
+    capabilities = capabilities or {}
+    requests = (
+        CYCLE_REQUESTS_BASE
+        + CYCLE_REQUESTS_FIXED * sum(1 for g in FIXED_PROBES if capabilities.get(g))
+        + CYCLE_REQUESTS_TEMPLATE * sum(1 for g in templates.TEMPLATE_GROUPS if capabilities.get(g))
+    )
+    cycle = requests * rtt
+    interval = next((step for step in INTERVAL_STEPS if cycle <= step * POLL_LINK_SHARE), INTERVAL_STEPS[-1])
+    return {
+        "rtt_ms_p50": round(percentile(rtts, 50) * 1000.0, 1),
+        "rtt_ms_p90": round(rtt * 1000.0, 1),
+        "requests_per_cycle": requests,
+        "cycle_s": round(cycle, 2),
+        "update_interval": interval,
+        "highrate_interval": min(60, max(1, math.ceil(HIGHRATE_REQUESTS * rtt / HIGHRATE_LINK_SHARE))),
+    }
@@ -0,0 +1,94 @@
+"""Entities je Plattform einer Entry: Gruppen, Diagnose und Intervall ohne Reload ändern.
+
+Jede Plattform meldet beim Setup build(data) (alle Entities für eine
+Konfiguration) und add(entities) (an HA übergeben, in den Poll-Zyklus aufnehmen)
+an. Bei einer Options-Änderung wird je Plattform neu gebaut und über die
+unique_id verglichen: nur neue Entities kommen hinzu, nur weggefallene werden aus
+Registry und Poll-Zyklus entfernt. Verbindung, Zyklus-Cache, Übersetzungen und
+alle übrigen Entities bleiben unberührt. Geräte ohne verbliebene Entities werden
+über den Geräte-Index der Registry gefunden und entfernt.
+"""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Options, die ohne Reload übernommen werden (alles andere → Reload der Entry)
+GROUP_OPTIONS = frozenset({
+    "kessel", "boiler01", "hk01", "hk02", "austragung", "puffer01", "zirkulationspumpe", "extra_groups",
+})
+INCREMENTAL_OPTIONS = GROUP_OPTIONS | {"diagnostics", "update_interval", "write_limit_hour", "write_limit_day"}
+# Flags des Options-Flows ohne eigene Wirkung auf die laufende Entry
+IGNORED_OPTIONS = frozenset({"rediscover", "capabilities"})
+
+
+def changed_options(old: dict, new: dict) -> set[str]:
+    return {k for k in set(old) | set(new) if old.get(k) != new.get(k)} - IGNORED_OPTIONS
+
+
+@callback
+def async_remove_devices_if_empty(hass: HomeAssistant, device_ids) -> None:
+    """Geräte ohne (auch deaktivierte) Entities entfernen."""
+    ent_reg = er.async_get(hass)
+    dev_reg = dr.async_get(hass)
+    for device_id in device_ids:
+        if er.async_entries_for_device(ent_reg, device_id, include_disabled_entities=True):
+            continue
+        try:
+            dev_reg.async_remove_device(device_id)
+        except Exception:
+            _LOGGER.debug("Device %s konnte nicht entfernt werden", device_id)
+
+
+class EntryEntities:
+    """build/add je Plattform und die aktuell angelegten Entities (unique_id → Entity)."""
+
+    def __init__(self, hass: HomeAssistant, poller):
+        self._hass = hass
+        self._poller = poller
+        # Plattform → (build, add, remove, {unique_id: Entity})
+        self._platforms: dict[str, tuple] = {}
+
+    @callback
+    def async_register(self, platform: str, data: dict, build, add, remove=None) -> None:
+        """Plattform anmelden und ihre Entities für die aktuelle Konfiguration anlegen."""
+        entities = build(data)
+        self._platforms[platform] = (build, add, remove, {e.unique_id: e for e in entities})
+        add(entities)
+
+    @callback
+    def async_apply(self, data: dict) -> tuple[int, int]:
+        """Neue Konfiguration anwenden; liefert (hinzugefügt, entfernt)."""
+        ent_reg = er.async_get(self._hass)
+        added = removed = 0
+        devices: set[str] = set()
+        for platform, (build, add, remove, current) in self._platforms.items():
+            wanted = {e.unique_id: e for e in build(data)}
+            for unique_id in [u for u in current if u not in wanted]:
+                entity = current.pop(unique_id)
+                self._poller.async_remove(entity)
+                if remove is not None:
+                    remove(entity)
+                entity_id = ent_reg.async_get_entity_id(platform, DOMAIN, unique_id)
+                if entity_id is not None:
+                    device_id = ent_reg.async_get(entity_id).device_id
+                    if device_id:
+                        devices.add(device_id)
+                    # entfernt die Entity auch aus dem Zustandsautomaten
+                    ent_reg.async_remove(entity_id)
+                elif entity.hass is not None:
+                    self._hass.async_create_task(entity.async_remove(force_remove=True))
+                removed += 1
+            fresh = [e for u, e in wanted.items() if u not in current]
+            if fresh:
+                current.update((e.unique_id, e) for e in fresh)
+                add(fresh)
+                added += len(fresh)
+        async_remove_devices_if_empty(self._hass, devices)
+        return added, removed
@@ -0,0 +1,211 @@
+"""Export der dekodierten Werte je Poll-Zyklus im InfluxDB-Line-Protocol.
+
+Nach jedem Zyklus wird ein Payload gebaut: eine Zeile je Gerät (kessel, hk01, …)
+mit allen Entity-Werten als Felder und dem Zeitstempel des Zyklusendes:
+
+    froeling,name=Froeling,device=kessel kessel_kesseltemperatur=65.0,kessel_abgastemperatur=121.0 1718000000000000000
+
+Ziele: Datei ("file:///config/froeling.lp" oder absoluter Pfad, wird angehängt),
+UNIX-Socket ("unix:///run/telegraf.sock") oder TCP ("tcp://host:8094"). Payloads
+liegen in einem begrenzten Puffer; ein eigener Task schreibt sie. Ist das Ziel
+langsam oder weg, läuft der Puffer voll und die ältesten Zyklen werden
+verworfen – der Poll-Zyklus wartet nie auf das Ziel.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from time import monotonic, time_ns
+from urllib.parse import urlsplit
+
+from homeassistant.core import HomeAssistant, callback
+
+_LOGGER = logging.getLogger(__name__)
+
+MEASUREMENT = "froeling"
+BUFFER_CYCLES = 120          # Zyklen im Puffer, danach werden die ältesten verworfen
+WRITE_TIMEOUT = 10.0         # s je Schreibvorgang
+RETRY_MIN = 5.0
+RETRY_MAX = 300.0
+DROP_LOG_INTERVAL = 300.0
+
+_SKIP = (None, "unknown", "unavailable")
+
+
+def parse_target(target: str) -> tuple[str, str | tuple[str, int]]:
+    """"file:///pfad", "/pfad", "unix:///pfad", "tcp://host:port" → (Art, Adresse)."""
+    if target.startswith("/"):
+        return "file", target
+    url = urlsplit(target)
+    if url.scheme in ("file", "unix") and url.path:
+        return url.scheme, url.path
+    if url.scheme == "tcp" and url.hostname and url.port:
+        return "tcp", (url.hostname, url.port)
+    raise ValueError(f"Ungültiges Exportziel: {target}")
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _field(value) -> str | None:
+    """Entity-Zustand → Feldwert (Zahl, bool oder String)."""
+    if value in _SKIP:
+        return None
+    if isinstance(value, bool) or value in ("on", "off"):
+        return "true" if value in (True, "on") else "false"
+    # Zahlen immer als Float: ganzzahlige und gerundete Werte desselben Feldes kollidieren sonst
+    try:
+        return repr(float(value))
+    except (TypeError, ValueError):
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{text}"'
+
+
+def build_payload(name: str, entities, ts_ns: int) -> str:
+    """Eine Zeile je Gerät mit allen Werten dieses Zyklus."""
+    fields: dict[str, list[str]] = {}
+    for entity in entities:
+        value = _field(getattr(entity, "state", None))
+        if value is not None:
+            fields.setdefault(entity._device_key, []).append(f"{entity._entity_id}={value}")
+    name_tag = _escape_tag(name)
+    return "".join(
+        f"{MEASUREMENT},name={name_tag},device={_escape_tag(device)} {','.join(values)} {ts_ns}\n"
+        for device, values in fields.items()
+    )
+
+
+class LineProtocolExporter:
+    """Puffer + Schreib-Task für ein Exportziel."""
+
+    def __init__(self, hass: HomeAssistant, poller, name: str, target: str,
+                 buffer_cycles: int = BUFFER_CYCLES):
+        self._hass = hass
+        self._poller = poller
+        self._name = name
+        self.target = target
+        self._kind, self._address = parse_target(target)
+        self._buffer: deque[str] = deque(maxlen=buffer_cycles)
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._retry = RETRY_MIN
+        self._last_drop_log = 0.0
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @callback
+    def async_start(self) -> None:
+        self._poller.async_add_cycle_listener(self.async_cycle_done)
+        self._task = self._hass.async_create_background_task(
+            self._async_run(), f"froeling_s3200_modbus export {self.target}"
+        )
+
+    async def async_stop(self) -> None:
+        """Schreib-Task beenden; was noch im Puffer liegt, wird einmal versucht."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._buffer:
+            try:
+                await asyncio.wait_for(self._async_write("".join(self._buffer)), WRITE_TIMEOUT)
+                self.exported += len(self._buffer)
+                self._buffer.clear()
+            except (OSError, asyncio.TimeoutError) as err:
+                _LOGGER.debug("Export beim Entladen fehlgeschlagen: %s", err)
+        await self._async_close()
+
+    @callback
+    def async_cycle_done(self) -> None:
+        payload = build_payload(self._name, self._poller.entities, time_ns())
+        if not payload:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+            now = monotonic()
+            if now - self._last_drop_log >= DROP_LOG_INTERVAL:
+                self._last_drop_log = now
+                _LOGGER.warning(
+                    "Export nach %s kommt nicht nach, ältester Zyklus verworfen (%d bisher)", self.target, self.dropped
+                )
+        self._buffer.append(payload)
+        self._wakeup.set()
+
+    async def _async_run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._buffer:
+                # alles Gepufferte in einem Schreibvorgang
+                batch = list(self._buffer)
+                self._buffer.clear()
+                try:
+                    await asyncio.wait_for(self._async_write("".join(batch)), WRITE_TIMEOUT)
+                except asyncio.CancelledError:
+                    self._requeue(batch)  # async_stop versucht es noch einmal
+                    raise
+                except (OSError, asyncio.TimeoutError) as err:
+                    self.errors += 1
+                    self._requeue(batch)
+                    await self._async_close()
+                    _LOGGER.debug("Export nach %s fehlgeschlagen (%s), nächster Versuch in %.0f s",
+                                  self.target, err, self._retry)
+                    await asyncio.sleep(self._retry)
+                    self._retry = min(self._retry * 2, RETRY_MAX)
+                    continue
+                self._retry = RETRY_MIN
+                self.exported += len(batch)
+
+    def _requeue(self, batch: list[str]) -> None:
+        """Nicht geschriebene Zyklen vor die neuen stellen; Überlauf verwirft die ältesten."""
+        pending = batch + list(self._buffer)
+        overflow = len(pending) - self._buffer.maxlen
+        if overflow > 0:
+            self.dropped += overflow
+            pending = pending[overflow:]
+        self._buffer.clear()
+        self._buffer.extend(pending)
+
+    async def _async_write(self, payload: str) -> None:
+        data = payload.encode()
+        if self._kind == "file":
+            await self._hass.async_add_executor_job(self._append_file, data)
+            return
+        if self._writer is None:
+            if self._kind == "unix":
+                _reader, self._writer = await asyncio.open_unix_connection(self._address)
+            else:
+                _reader, self._writer = await asyncio.open_connection(*self._address)
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def _append_file(self, data: bytes) -> None:
+        os.makedirs(os.path.dirname(self._address) or ".", exist_ok=True)
+        with open(self._address, "ab") as fh:
+            fh.write(data)
+
+    async def _async_close(self) -> None:
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    def as_dict(self) -> dict:
+        return {
+            "target": self.target,
+            "buffered": len(self._buffer),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
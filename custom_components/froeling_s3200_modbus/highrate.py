@@ -0,0 +1,237 @@
+"""Schnelle Abtastung ausgewählter Register direkt in die Langzeitstatistik.
+
+Die gewählten Verbrennungswerte werden im eigenen Takt (z. B. alle 5 s) gelesen,
+die Entities bleiben beim normalen update_interval. Die Abtastwerte landen nicht
+als Zustände im Recorder:
+
+- alle Rohwerte (skaliert) werden alle 5 Minuten als JSON-Zeilen an
+  <config>/froeling_s3200_modbus/highrate_<name>_<JJJJMMTT>.jsonl angehängt
+  (eine Datei je Tag, ältere als KEEP_DAYS werden gelöscht);
+- zusätzlich wird je Stunde im Speicher zu Mittel-, Minimal- und Maximalwert
+  verdichtet und beim Stundenwechsel als externe Statistik importiert
+  (froeling_s3200_modbus:<name>_<kanal>). Home Assistant speichert importierte
+  Statistiken nur stündlich – Mittel/Min/Max beruhen aber auf allen
+  Abtastwerten statt auf einem Wert pro Poll-Zyklus. Die angefangene Stunde
+  wird beim Entladen in .storage gesichert und nach dem Neustart fortgesetzt
+  (ein zweiter Import derselben Stunde würde den ersten ersetzen).
+"""
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util, slugify
+
+from .const import DOMAIN
+from .readplan import INPUT, MAX_GAP, compile_plan
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 5  # s
+FLUSH_INTERVAL = timedelta(minutes=5)  # Rohwerte gesammelt anhängen
+KEEP_DAYS = 14
+STORAGE_VERSION = 1
+
+# Kanal → (Input-Register, Einheit, Skalierung, Name der Statistik)
+CHANNELS = {
+    "kesseltemperatur": (30001, "°C", 2, "Kesseltemperatur"),
+    "abgastemperatur": (30002, "°C", 1, "Abgastemperatur"),
+    "restsauerstoffgehalt": (30004, "%", 10, "Restsauerstoffgehalt"),
+    "primaerluftklappe": (30005, "%", 1, "Position Primärluftklappe"),
+    "saugzugdrehzahl": (30007, "Upm", 1, "Saugzugdrehzahl"),
+    "luftgeschwindigkeit_ansaug": (30011, "m/s", 100, "Luftgeschwindigkeit Ansaug"),
+    "primaerluft": (30012, "%", 1, "Primärluft"),
+    "saugzug_ansteuerung": (30013, "%", 1, "Saugzug-Ansteuerung"),
+    "sekundaerluft": (30014, "%", 1, "Sekundärluft"),
+    "kesselstellgroesse": (30015, "%", 1, "Kesselstellgröße"),
+    "abgas_solltemperatur": (30016, "°C", 1, "Abgas-Solltemperatur"),
+    "sauerstoffregler": (30017, "%", 1, "Sauerstoffregler"),
+    "feuerraumtemperatur": (30089, "°C", 1, "Feuerraumtemperatur"),
+}
+
+
+def scaled(channel: str, raw: int) -> float:
+    """Rohwert (vorzeichenbehaftet) → physikalischer Wert."""
+    if raw > 32767:
+        raw -= 65536
+    return raw / CHANNELS[channel][2]
+
+
+class HighRateSampler:
+    """Liest die gewählten Kanäle im eigenen Takt und importiert Stundenwerte."""
+
+    def __init__(self, hass: HomeAssistant, transport, entry_id: str, name: str, unit_id: int,
+                 channels, interval: int = DEFAULT_INTERVAL):
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, f"froeling_s3200_modbus.{entry_id}_highrate")
+        self._transport = transport
+        self._unit_id = unit_id
+        self._interval = timedelta(seconds=max(1, interval))
+        self._prefix = f"{DOMAIN}:{slugify(name)}"
+        self._file_prefix = self._hass.config.path(DOMAIN, f"highrate_{slugify(name)}_")
+        self._channels = [c for c in channels if c in CHANNELS]
+        self._by_addr = {CHANNELS[c][0] - 30001: c for c in self._channels}
+        self._plan = compile_plan(
+            ((INPUT, a, 1) for a in self._by_addr), MAX_GAP.get(transport.framer, MAX_GAP["socket"])
+        )
+        # Stunde (UTC) → Kanal → [Anzahl, Summe, Min, Max]
+        self._hour: datetime | None = None
+        self._acc: dict[str, list] = {}
+        # Rohwerte seit dem letzten Anhängen: (Zeitpunkt, {Kanal: Wert})
+        self._rows: list[tuple[datetime, dict[str, float]]] = []
+        self._running = False
+        self._unsub = None
+        self._unsub_flush = None
+        self.samples = 0
+        self.imported_hours = 0
+
+    @property
+    def channels(self) -> list[str]:
+        return list(self._channels)
+
+    async def async_load(self) -> None:
+        """Angefangene Stunde vom letzten Lauf übernehmen; ist sie schon vorbei, jetzt importieren."""
+        stored = await self._store.async_load()
+        if not stored or not stored.get("hour"):
+            return
+        hour = dt_util.parse_datetime(stored["hour"])
+        if hour is None:
+            return
+        self._hour = hour
+        self._acc = {c: list(acc) for c, acc in stored.get("acc", {}).items() if c in CHANNELS}
+        if hour != dt_util.utcnow().replace(minute=0, second=0, microsecond=0):
+            self._async_import()
+
+    def _data_to_save(self) -> dict:
+        return {"hour": self._hour.isoformat() if self._hour else None, "acc": self._acc}
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_start(self) -> None:
+        if self._unsub is None and self._channels:
+            self._unsub = async_track_time_interval(self._hass, self._async_sample, self._interval)
+            self._unsub_flush = async_track_time_interval(self._hass, self._async_flush, FLUSH_INTERVAL)
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in (self._unsub, self._unsub_flush):
+            if unsub is not None:
+                unsub()
+        self._unsub = self._unsub_flush = None
+
+    async def async_shutdown(self) -> None:
+        """Beim Entladen: stoppen, Rohwerte anhängen, angefangene Stunde sichern (nicht importieren)."""
+        self.async_stop()
+        await self._async_flush()
+        await self.async_save()
+
+    async def _async_sample(self, _=None) -> None:
+        if self._running or not self._transport.available:
+            return
+        self._running = True
+        try:
+            values: dict[str, int] = {}
+            for block in self._plan:
+                res, err = await self._transport.async_read_input(self._unit_id, block.addr, block.count)
+                if err is not None:
+                    continue
+                for i, raw in enumerate(res.registers[: block.count]):
+                    channel = self._by_addr.get(block.addr + i)
+                    if channel is not None:
+                        values[channel] = raw
+        finally:
+            self._running = False
+        if values:
+            self.add_samples(dt_util.utcnow(), values)
+
+    @callback
+    def add_samples(self, now: datetime, values: dict[str, int]) -> None:
+        """Ein Satz Rohwerte; beim Stundenwechsel wird die fertige Stunde importiert."""
+        hour = now.replace(minute=0, second=0, microsecond=0)
+        if self._hour is not None and hour != self._hour:
+            self._async_import()
+        self._hour = hour
+        row = {channel: scaled(channel, raw) for channel, raw in values.items()}
+        self._rows.append((now, row))
+        for channel, value in row.items():
+            acc = self._acc.get(channel)
+            if acc is None:
+                self._acc[channel] = [1, value, value, value]
+            else:
+                acc[0] += 1
+                acc[1] += value
+                acc[2] = min(acc[2], value)
+                acc[3] = max(acc[3], value)
+        self.samples += 1
+
+    async def _async_flush(self, _=None) -> None:
+        """Gepufferte Rohwerte an die Tagesdateien anhängen (Executor)."""
+        rows, self._rows = self._rows, []
+        if rows:
+            await self._hass.async_add_executor_job(self._append_rows, rows)
+        # Stand der angefangenen Stunde auch ohne sauberes Entladen nicht verlieren
+        self._store.async_delay_save(self._data_to_save, 0)
+
+    def _append_rows(self, rows) -> None:
+        by_day: dict[str, list[str]] = {}
+        for ts, row in rows:
+            local = dt_util.as_local(ts)
+            by_day.setdefault(f"{local:%Y%m%d}", []).append(
+                json.dumps({"time": local.isoformat(timespec="seconds"), **row})
+            )
+        os.makedirs(os.path.dirname(self._file_prefix), exist_ok=True)
+        for day, lines in by_day.items():
+            with open(f"{self._file_prefix}{day}.jsonl", "a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+        # Aufbewahrung: Tagesdateien älter als KEEP_DAYS löschen
+        oldest = f"{dt_util.now() - timedelta(days=KEEP_DAYS):%Y%m%d}"
+        for path in glob.glob(f"{glob.escape(self._file_prefix)}*.jsonl"):
+            day = path[len(self._file_prefix):-len(".jsonl")]
+            if day.isdigit() and day < oldest:
+                try:
+                    os.remove(path)
+                except OSError:
+                    _LOGGER.debug("Alte Abtastdatei %s nicht löschbar", path)
+
+    @callback
+    def _async_import(self) -> None:
+        """Gepufferte Stunde als externe Statistik übergeben und Puffer leeren."""
+        hour, acc = self._hour, self._acc
+        self._hour, self._acc = None, {}
+        if hour is None or not acc:
+            return
+        if "recorder" not in self._hass.config.components:
+            _LOGGER.debug("Recorder nicht geladen, %d Kanäle der Stunde %s verworfen", len(acc), hour)
+            return
+        from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+        try:
+            # ab HA 2025.x: mean_type statt des veralteten has_mean
+            from homeassistant.components.recorder.models import StatisticMeanType
+        except ImportError:
+            mean = {"has_mean": True}
+        else:
+            mean = {"mean_type": StatisticMeanType.ARITHMETIC}
+
+        for channel, (count, total, vmin, vmax) in acc.items():
+            _reg, unit, _scale, name = CHANNELS[channel]
+            metadata = {
+                **mean,
+                "has_sum": False,
+                "name": name,
+                "source": DOMAIN,
+                "statistic_id": f"{self._prefix}_{channel}",
+                "unit_of_measurement": unit,
+            }
+            stat = {"start": hour, "mean": total / count, "min": vmin, "max": vmax}
+            async_add_external_statistics(self._hass, metadata, [stat])
+        self.imported_hours += 1
+        _LOGGER.debug("Schnellabtastung: %d Kanäle für %s importiert", len(acc), hour)
@@ -0,0 +1,132 @@
+"""Zustandswechsel von Anlagen- (34001) und Kesselzustand (34002) als Events + Störungshistorie.
+
+Die Werte kommen über transport.add_value_listener aus dem normalen Poll-Zyklus.
+Jeder Wechsel löst ein Event froeling_s3200_modbus_state_change aus (vorheriger
+und neuer Zustand, Verweildauer im vorherigen). Wechsel in einen Störungs- oder
+Fehlerzustand werden je Code gezählt (Anzahl, letztes Auftreten) und mit den
+letzten Auftritten in .storage gesichert – abfragbar über den Service
+get_fault_history, ohne Recorder-Abfragen.
+"""
+from __future__ import annotations
+
+import logging
+from collections import deque
+from time import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import ANLAGENZUSTAND_MAPPING, DOMAIN, KESSELZUSTAND_MAPPING
+from .readplan import INPUT
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_STATE_CHANGE = f"{DOMAIN}_state_change"
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 60  # s; zusätzlich beim Entladen
+RECENT_FAULTS = 50
+
+# Art → (Input-Register, Texte)
+WATCHED = {
+    "anlagenzustand": (34001, ANLAGENZUSTAND_MAPPING),
+    "kesselzustand": (34002, KESSELZUSTAND_MAPPING),
+}
+
+# Kesselzustände, die als Störung zählen
+FAULT_CODES = frozenset(
+    code for code, text in KESSELZUSTAND_MAPPING.items()
+    if text.startswith(("STÖRUNG", "FEHLER")) or code in (18, 81)  # Fehlzündung, SH Störung
+)
+
+
+def _iso(ts: float) -> str:
+    return dt_util.utc_from_timestamp(ts).isoformat()
+
+
+class StateHistory:
+    """Letzter Zustand je Art, Störungszähler je Code und die letzten Störungen."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._hass = hass
+        self._entry_id = entry_id
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}_history")
+        # Art → [Code, seit (Unix-Zeit)]
+        self._states: dict[str, list] = {}
+        # Code → [Anzahl, zuletzt (Unix-Zeit)]
+        self._faults: dict[int, list] = {}
+        self._recent: deque = deque(maxlen=RECENT_FAULTS)
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._states = {k: list(v) for k, v in stored.get("states", {}).items()}
+        self._faults = {int(k): list(v) for k, v in stored.get("faults", {}).items()}
+        self._recent.extend(tuple(r) for r in stored.get("recent", ()))
+
+    def _data_to_save(self) -> dict:
+        return {
+            "states": self._states,
+            "faults": {str(k): v for k, v in self._faults.items()},
+            "recent": list(self._recent),
+        }
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._data_to_save())
+
+    def attach(self, transport) -> None:
+        for kind, (reg, _texts) in WATCHED.items():
+            transport.add_value_listener(INPUT, reg - 30001, self._make_listener(kind))
+
+    def _make_listener(self, kind: str):
+        def _on_value(_addr: int, value: int) -> None:
+            self.update(kind, value)
+        return _on_value
+
+    def update(self, kind: str, code: int, now: float | None = None) -> None:
+        now = time() if now is None else now
+        last = self._states.get(kind)
+        if last is not None and last[0] == code:
+            return
+        self._states[kind] = [code, now]
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        if last is None:
+            return  # erster Wert überhaupt: kein Wechsel bekannt
+        texts = WATCHED[kind][1]
+        prev, since = last
+        self._hass.bus.async_fire(EVENT_STATE_CHANGE, {
+            "config_entry_id": self._entry_id,
+            "kind": kind,
+            "previous": texts.get(prev, str(prev)),
+            "previous_code": prev,
+            "new": texts.get(code, str(code)),
+            "new_code": code,
+            "seconds_in_previous": round(now - since, 1),
+        })
+        if kind == "kesselzustand" and code in FAULT_CODES:
+            fault = self._faults.setdefault(code, [0, now])
+            fault[0] += 1
+            fault[1] = now
+            self._recent.append((now, code, prev))
+            _LOGGER.info("Kesselstörung: %s (vorher %s)", texts.get(code, code), texts.get(prev, prev))
+
+    def as_dict(self) -> dict:
+        """Service-Antwort: aktuelle Zustände, Zähler je Störungscode, letzte Störungen."""
+        kessel = KESSELZUSTAND_MAPPING
+        return {
+            "states": {
+                kind: {"state": WATCHED[kind][1].get(code, str(code)), "code": code, "since": _iso(since)}
+                for kind, (code, since) in self._states.items()
+            },
+            "faults": [
+                {"code": code, "text": kessel.get(code, str(code)), "count": count, "last": _iso(last)}
+                for code, (count, last) in sorted(self._faults.items(), key=lambda f: f[1][1], reverse=True)
+            ],
+            "recent": [
+                {"time": _iso(ts), "code": code, "text": kessel.get(code, str(code)),
+                 "previous": kessel.get(prev, str(prev))}
+                for ts, code, prev in reversed(self._recent)
+            ],
+        }
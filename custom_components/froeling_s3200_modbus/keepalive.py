@@ -0,0 +1,162 @@
+"""Keepalive für Modbus-Overrides: aktive Sollwerte vor Ablauf erneut senden.
+
+Die Steuerung verwirft einen per Modbus gesetzten Sollwert (Vorlauf Soll Modbus
+48001–48018, Solltemperatur Modbus Boiler 48019–48026), wenn er nicht innerhalb
+von OVERRIDE_TIMEOUT erneut geschrieben wird. Ein gesetzter Wert ≠ 0 wird hier
+gemerkt und REFRESH_BEFORE vor Ablauf noch einmal geschrieben. Was innerhalb von
+BATCH_WINDOW fällig wird, geht in einem Durchgang raus (aufeinanderfolgende
+Register als ein FC16). Wert 0 beendet den Override; danach wird nichts mehr
+gesendet. Auffrischungen gehen am Schreib-Budget vorbei (budget=False), neue
+Werte zählen wie jeder Write dagegen.
+
+Die aktiven Overrides liegen nur im Speicher: nach einem Neustart muss der
+Sollwert neu gesetzt werden.
+"""
+from __future__ import annotations
+
+import logging
+from time import monotonic, time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .readplan import contiguous_runs
+
+_LOGGER = logging.getLogger(__name__)
+
+# Holding-Register (4xxxx) mit Timeout in der Steuerung
+OVERRIDE_REGISTERS = range(48001, 48027)
+
+OVERRIDE_TIMEOUT = 120.0   # s, danach verwirft die Steuerung den Modbus-Sollwert
+REFRESH_BEFORE = 20.0      # s vor Ablauf auffrischen
+BATCH_WINDOW = 15.0        # s; was bis dahin ebenfalls fällig wird, kommt mit
+RETRY_DELAY = 5.0          # s nach einem fehlgeschlagenen Write
+
+
+def _iso(ts: float) -> str:
+    return dt_util.utc_from_timestamp(ts).isoformat()
+
+
+class OverrideKeepalive:
+    """Aktive Overrides je Adresse (0-basiert) und ein Timer für die nächste Auffrischung."""
+
+    def __init__(self, hass: HomeAssistant, transport, unit_id: int, timeout: float = OVERRIDE_TIMEOUT):
+        self._hass = hass
+        self._transport = transport
+        self._unit_id = unit_id
+        self._timeout = timeout
+        # Adresse → {"raw", "written" (monotonic), "written_utc", "since_utc", "refreshes", "retry_at"}
+        self._overrides: dict[int, dict] = {}
+        self._unsub = None
+        self._stopped = False
+        self.refreshes = 0
+        self.batches = 0
+        self.errors = 0
+
+    async def async_set(self, addr: int, raw: int):
+        """Override setzen bzw. mit 0 beenden; liefert den Fehler des Writes oder None."""
+        current = self._overrides.get(addr)
+        if raw != 0 and current is not None and current["raw"] == raw:
+            return None  # läuft bereits, der Keepalive hält ihn
+        _, err = await self._transport.async_write_register(self._unit_id, addr, raw)
+        if err is not None:
+            return err
+        if raw == 0:
+            if self._overrides.pop(addr, None) is not None:
+                _LOGGER.debug("Override %s beendet", 40001 + addr)
+        else:
+            now = time()
+            self._overrides[addr] = {
+                "raw": raw, "written": monotonic(), "written_utc": now, "since_utc": now,
+                "refreshes": 0, "retry_at": 0.0,
+            }
+        self._schedule()
+        return None
+
+    def is_active(self, addr: int, raw: int) -> bool:
+        """Override mit diesem Wert läuft bereits (wird aufgefrischt)."""
+        override = self._overrides.get(addr)
+        return override is not None and override["raw"] == raw
+
+    def state(self, addr: int) -> dict | None:
+        """Override-Zustand einer Adresse für die Entity-Attribute (None = nicht aktiv)."""
+        override = self._overrides.get(addr)
+        if override is None:
+            return None
+        return {
+            "since_utc": _iso(override["since_utc"]),
+            "last_write_utc": _iso(override["written_utc"]),
+            "expires_utc": _iso(override["written_utc"] + self._timeout),
+            "refreshes": override["refreshes"],
+        }
+
+    @property
+    def active_count(self) -> int:
+        return len(self._overrides)
+
+    def _due_at(self, override: dict) -> float:
+        return max(override["written"] + self._timeout - REFRESH_BEFORE, override["retry_at"])
+
+    @callback
+    def _schedule(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._stopped or not self._overrides:
+            return
+        delay = min(self._due_at(o) for o in self._overrides.values()) - monotonic()
+        self._unsub = async_call_later(self._hass, max(delay, 0.0), self._async_fire)
+
+    async def _async_fire(self, _now) -> None:
+        self._unsub = None
+        await self.async_refresh_due()
+
+    async def async_refresh_due(self) -> None:
+        """Alle innerhalb von BATCH_WINDOW fälligen Overrides in einem Durchgang schreiben."""
+        now = monotonic()
+        due = sorted(
+            addr for addr, o in self._overrides.items()
+            if o["retry_at"] <= now and self._due_at(o) <= now + BATCH_WINDOW
+        )
+        if due:
+            self.batches += 1
+        for run in contiguous_runs(due):
+            raws = [self._overrides[a]["raw"] for a in run]
+            if len(run) == 1:
+                _, err = await self._transport.async_write_register(self._unit_id, run[0], raws[0], budget=False)
+            else:
+                _, err = await self._transport.async_write_registers(self._unit_id, run[0], raws, budget=False)
+            if err is not None:
+                self.errors += 1
+                _LOGGER.warning("Auffrischen von Override %s fehlgeschlagen: %s", 40001 + run[0], err)
+            for a, raw in zip(run, raws):
+                override = self._overrides.get(a)
+                if override is None or override["raw"] != raw:
+                    continue  # während des Writes geändert oder beendet
+                if err is not None:
+                    override["retry_at"] = monotonic() + RETRY_DELAY
+                    continue
+                override.update(written=monotonic(), written_utc=time(), retry_at=0.0)
+                override["refreshes"] += 1
+                self.refreshes += 1
+        self._schedule()
+
+    @callback
+    def async_stop(self) -> None:
+        """Timer beenden; die Steuerung verwirft die Overrides danach nach Ablauf selbst."""
+        self._stopped = True
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def as_dict(self) -> dict:
+        """Diagnose-Attribute: aktive Overrides (4xxxx) und Zähler."""
+        return {
+            "active": {40001 + addr: {"raw": o["raw"], **self.state(addr)} for addr, o in sorted(self._overrides.items())},
+            "refreshes": self.refreshes,
+            "batches": self.batches,
+            "errors": self.errors,
+            "timeout_s": self._timeout,
+            "refresh_before_s": REFRESH_BEFORE,
+        }
@@ -1,127 +1,24 @@
 from homeassistant.components.number import NumberEntity, NumberDeviceClass
-from pymodbus.client import ModbusTcpClient
 import logging
 from datetime import datetime, timezone, timedelta
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.translation import async_get_translations
 from .const import DOMAIN
+from .device import device_info_for
+from . import templates
+from .keepalive import OVERRIDE_REGISTERS
+from .transport import write_suppressed
 
 _LOGGER = logging.getLogger(__name__)
 
-# ------------------- Geräte-Gruppierung -------------------
-DEVICE_NAME = {
-    "controller": "SP Dual Compact",
-    "kessel": "Kessel",
-    "boiler01": "Boiler 01",
-    "hk01": "Heizkreis 01",
-    "hk02": "Heizkreis 02",
-    "puffer01": "Puffer 01",
-    "austragung": "Austragung",
-}
-
-def device_info_for(device_key: str, device_name_from_config: str, domain: str):
-    dev_name = DEVICE_NAME.get(device_key, device_key)
-
-    if device_key == "controller":
-        return {
-            "identifiers": {(domain, f"{device_name_from_config}:controller")},
-            "name": "SP Dual Compact",
-            "manufacturer": "Fröling",
-            "model": "SP Dual Compact",
-            "sw_version": "0.3.0",
-        }
-
-    return {
-        "identifiers": {(domain, f"{device_name_from_config}:{device_key}")},
-        "name": dev_name,
-        "manufacturer": "Fröling",
-        "model": dev_name,
-        "via_device": (domain, f"{device_name_from_config}:controller"),
-        "sw_version": "0.3.0",
-    }
-# ----------------------------------------------------------
-
-# ---------- Verbindungs-Helfer ----------
-def _ensure_connected(client: ModbusTcpClient):
-    try:
-        if not getattr(client, "connected", False):
-            client.connect()
-    except Exception:
-        pass
-# ---------------------------------------
-
-# --- HELPER: Modbus Calls (Input/Holding + Write) ---
-def _read_input_sync(client, unit_id: int, addr: int, count: int):
-    if not client.connect():
-        return None, "connect"
-    try:
-        res = client.read_input_registers(addr, count=count, device_id=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(device_id)"
-        return res, None
-    except TypeError:
-        pass
-    try:
-        res = client.read_input_registers(addr, count=count, unit=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(unit)"
-        return res, None
-    except Exception as e:
-        return None, f"exc:{e}"
-
-def _read_holding_sync(client, unit_id: int, addr: int, count: int):
-    if not client.connect():
-        return None, "connect"
-    try:
-        res = client.read_holding_registers(addr, count=count, device_id=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(device_id)"
-        return res, None
-    except TypeError:
-        pass
-    try:
-        res = client.read_holding_registers(addr, count=count, unit=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(unit)"
-        return res, None
-    except Exception as e:
-        return None, f"exc:{e}"
-
-def _write_register_sync(client, unit_id: int, addr: int, value: int):
-    if not client.connect():
-        return None, "connect"
-    try:
-        res = client.write_register(addr, value, device_id=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(device_id)"
-        return res, None
-    except TypeError:
-        pass
-    try:
-        res = client.write_register(addr, value, unit=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(unit)"
-        return res, None
-    except TypeError:
-        pass
-    try:
-        client.unit_id = unit_id
-        res = client.write_register(addr, value)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(client.unit_id)"
-        return res, None
-    except Exception as e:
-        return None, f"exc:{e}"
-# --- ENDE HELPER ---
-
 def _tr_key(s: str) -> str:
     return "".join(ch.lower() if ch.isalnum() else "_" for ch in s)
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
     data = hass.data[DOMAIN][config_entry.entry_id]
-    translations = await async_get_translations(hass, hass.config.language, "entity")
-    client: ModbusTcpClient = hass.data[DOMAIN][f"{config_entry.entry_id}_client"]
-    lock = hass.data[DOMAIN][f"{config_entry.entry_id}_lock"]
+    base_translations = await async_get_translations(hass, hass.config.language, "entity")
+    generated = translations = None  # setzt build()
+    transport = hass.data[DOMAIN][f"{config_entry.entry_id}_transport"]
+    poller = hass.data[DOMAIN][f"{config_entry.entry_id}_poller"]
 
     def create_numbers():
         nums: list[NumberEntity] = []
@@ -129,80 +26,100 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         # --- Kessel ---
         if data.get("kessel", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "kessel_solltemperatur", 40001, "°C", 2, 0, 70, 90, device_key="kessel"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "bei_welcher_rl_temperatur_an_der_zirkulationsleitung_soll_die_pumpe_ausschalten", 40601, "°C", 2, 0, 20, 120, device_key="boiler01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "kessel_solltemperatur", 40001, "°C", 2, 0, 70, 90, device_key="kessel"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "bei_welcher_rl_temperatur_an_der_zirkulationsleitung_soll_die_pumpe_ausschalten", 40601, "°C", 2, 0, 20, 120, device_key="boiler01"),
             ])
 
         # --- Heizkreis 01 ---
         if data.get("hk01", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_vorlauf_temperatur_10c_aussentemperatur", 41032, "°C", 2, 0, 10, 110, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_vorlauf_temperatur_minus_10c_aussentemperatur", 41033, "°C", 2, 0, 10, 110, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_heizkreispumpe_ausschalten_wenn_vorlauf_soll_kleiner_ist_als", 41040, "°C", 2, 0, 10, 30, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_absenkung_der_vorlauftemperatur_im_absenkbetrieb", 41034, "°C", 2, 0, 0, 70, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_aussentemperatur_unter_der_die_heizkreispumpe_im_heizbetrieb_einschaltet", 41037, "°C", 2, 0, -20, 50, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_aussentemperatur_unter_der_die_heizkreispumpe_im_absenkbetrieb_einschaltet", 41038, "°C", 2, 0, -20, 50, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_frostschutztemperatur", 41039, "°C", 2, 0, -30, 20, device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_temp_am_puffer_oben_ab_der_der_ueberhitzungsschutz_aktiv_wird", 41048, "°C", 1, 0, 60, 120, device_class="temperature", device_key="hk01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk1_vorlauf_soll_modbus", 48001, "°C", 2, 0, 0, 75, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_vorlauf_temperatur_10c_aussentemperatur", 41032, "°C", 2, 0, 10, 110, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_vorlauf_temperatur_minus_10c_aussentemperatur", 41033, "°C", 2, 0, 10, 110, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_heizkreispumpe_ausschalten_wenn_vorlauf_soll_kleiner_ist_als", 41040, "°C", 2, 0, 10, 30, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_absenkung_der_vorlauftemperatur_im_absenkbetrieb", 41034, "°C", 2, 0, 0, 70, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_aussentemperatur_unter_der_die_heizkreispumpe_im_heizbetrieb_einschaltet", 41037, "°C", 2, 0, -20, 50, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_aussentemperatur_unter_der_die_heizkreispumpe_im_absenkbetrieb_einschaltet", 41038, "°C", 2, 0, -20, 50, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_frostschutztemperatur", 41039, "°C", 2, 0, -30, 20, device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_temp_am_puffer_oben_ab_der_der_ueberhitzungsschutz_aktiv_wird", 41048, "°C", 1, 0, 60, 120, device_class="temperature", device_key="hk01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk1_vorlauf_soll_modbus", 48001, "°C", 2, 0, 0, 75, device_key="hk01"),
             ])
 
         # --- Heizkreis 02 ---
         if data.get("hk02", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_vorlauf_temperatur_10c_aussentemperatur", 41062, "°C", 2, 0, 10, 110, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_vorlauf_temperatur_minus_10c_aussentemperatur", 41063, "°C", 2, 0, 10, 110, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_heizkreispumpe_ausschalten_wenn_vorlauf_soll_kleiner_ist_als", 41070, "°C", 2, 0, 10, 30, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_absenkung_der_vorlauftemperatur_im_absenkbetrieb", 41064, "°C", 2, 0, 0, 70, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_aussentemperatur_unter_der_die_heizkreispumpe_im_heizbetrieb_einschaltet", 41067, "°C", 2, 0, -20, 50, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_aussentemperatur_unter_der_die_heizkreispumpe_im_absenkbetrieb_einschaltet", 41068, "°C", 2, 0, -20, 50, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_frostschutztemperatur", 41069, "°C", 2, 0, -10, 20, device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_temp_am_puffer_oben_ab_der_der_ueberhitzungsschutz_aktiv_wird", 41079, "°C", 1, 0, 60, 120, device_class="temperature", device_key="hk02"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "hk2_vorlauf_soll_modbus", 48002, "°C", 2, 0, 0, 75, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_vorlauf_temperatur_10c_aussentemperatur", 41062, "°C", 2, 0, 10, 110, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_vorlauf_temperatur_minus_10c_aussentemperatur", 41063, "°C", 2, 0, 10, 110, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_heizkreispumpe_ausschalten_wenn_vorlauf_soll_kleiner_ist_als", 41070, "°C", 2, 0, 10, 30, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_absenkung_der_vorlauftemperatur_im_absenkbetrieb", 41064, "°C", 2, 0, 0, 70, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_aussentemperatur_unter_der_die_heizkreispumpe_im_heizbetrieb_einschaltet", 41067, "°C", 2, 0, -20, 50, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_aussentemperatur_unter_der_die_heizkreispumpe_im_absenkbetrieb_einschaltet", 41068, "°C", 2, 0, -20, 50, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_frostschutztemperatur", 41069, "°C", 2, 0, -10, 20, device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_temp_am_puffer_oben_ab_der_der_ueberhitzungsschutz_aktiv_wird", 41079, "°C", 1, 0, 60, 120, device_class="temperature", device_key="hk02"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "hk2_vorlauf_soll_modbus", 48002, "°C", 2, 0, 0, 75, device_key="hk02"),
             ])
 
         # --- Boiler 01 ---
         if data.get("boiler01", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "boiler_1_gewuenschte_boilertemperatur", 41632, "°C", 2, 0, 10, 100, device_key="boiler01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "boiler_1_nachladen_wenn_boilertemperatur_unter", 41633, "°C", 2, 0, 1, 90, device_key="boiler01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "boiler_1_solltemperatur_modbus", 48019, "°C", 2, 0, 0, 65, device_key="boiler01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "boiler_1_gewuenschte_boilertemperatur", 41632, "°C", 2, 0, 10, 100, device_key="boiler01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "boiler_1_nachladen_wenn_boilertemperatur_unter", 41633, "°C", 2, 0, 1, 90, device_key="boiler01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "boiler_1_solltemperatur_modbus", 48019, "°C", 2, 0, 0, 65, device_key="boiler01"),
             ])
 
         # --- Puffer 01 ---
         if data.get("puffer01", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "puffer_1_delta_t_kessel_vs_grenzschicht", 42003, "°C", 2, 0, 0, 120, device_key="puffer01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "puffer_1_start_pufferladung_ab_ladezustand", 42022, "%", 1, 0, 0, 100, device_key="puffer01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "puffer_1_100_prozent_kesselleistung_bis_ladezustand", 42027, "%", 1, 0, 0, 100, device_key="puffer01"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "puffer_1_0_prozent_kesselleistung_ab_ladezustand", 42028, "%", 1, 0, 0, 100, device_key="puffer01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "puffer_1_delta_t_kessel_vs_grenzschicht", 42003, "°C", 2, 0, 0, 120, device_key="puffer01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "puffer_1_start_pufferladung_ab_ladezustand", 42022, "%", 1, 0, 0, 100, device_key="puffer01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "puffer_1_100_prozent_kesselleistung_bis_ladezustand", 42027, "%", 1, 0, 0, 100, device_key="puffer01"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "puffer_1_0_prozent_kesselleistung_ab_ladezustand", 42028, "%", 1, 0, 0, 100, device_key="puffer01"),
             ])
 
         # --- Austragung ---
         if data.get("austragung", False):
             nums.extend([
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "gefoerderte_pellets_100_prozent_einschub", 40319, "g", 1, 0, 0, 10000, device_key="austragung"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "pelletlager_restbestand", 40320, "t", 10, 1, 0, 100, device_key="austragung"),
-                FroelingNumberHolding(hass, config_entry, client, lock, translations, data, "pelletlager_mindestbestand", 40336, "t", 10, 1, 0, 100, device_key="austragung"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "gefoerderte_pellets_100_prozent_einschub", 40319, "g", 1, 0, 0, 10000, device_key="austragung"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "pelletlager_restbestand", 40320, "t", 10, 1, 0, 100, device_key="austragung"),
+                FroelingNumberHolding(hass, config_entry, transport, translations, data, "pelletlager_mindestbestand", 40336, "t", 10, 1, 0, 100, device_key="austragung"),
             ])
 
-        return nums
+        # --- Heizkreise 03–18 (Vorlagen) ---
+        nums.extend(
+            FroelingNumberHolding(hass, config_entry, transport, translations, data, g.entity_id, g.register, device_key=g.device_key, **g.options)
+            for g in generated
+        )
 
-    numbers = create_numbers()
-    async_add_entities(numbers)
+        return nums
 
-    update_interval = timedelta(seconds=data.get("update_interval", 60))
-    for n in numbers:
-        async_track_time_interval(hass, n.async_update, update_interval)
+    # Options-Änderungen (Gruppen) ohne Reload: build() für jede Konfiguration
+    def build(new_data):
+        nonlocal data, generated, translations
+        data = new_data
+        generated = templates.expand(data, "number")
+        translations = templates.with_translations(base_translations, "number", generated)
+        numbers = create_numbers()
+        # Modbus-Sollwerte (480xx) über den Override-Keepalive schreiben, falls aktiviert
+        keepalive = hass.data[DOMAIN].get(f"{config_entry.entry_id}_keepalive")
+        if keepalive is not None:
+            for n in numbers:
+                if isinstance(n, FroelingNumberHolding) and n._register in OVERRIDE_REGISTERS:
+                    n._keepalive = keepalive
+        return numbers
+
+    def add(numbers):
+        async_add_entities(numbers)
+        for n in numbers:
+            poller.async_add(n.async_update, n)
+
+    hass.data[DOMAIN][f"{config_entry.entry_id}_entities"].async_register("number", data, build, add)
 
 class _BaseNumber(NumberEntity):
     _attr_should_poll = False
-    def __init__(self, hass, config_entry, client, lock, translations, data, entity_id, register, unit,
+    def __init__(self, hass, config_entry, transport, translations, data, entity_id, register, unit,
                  scaling_factor, decimal_places=0, min_value=0, max_value=0,
                  device_key="controller", device_class: str | NumberDeviceClass | None = None):
         self._hass = hass
-        self._client = client
-        self._lock = lock
+        self._transport = transport
         self._translations = translations
         self._device_name = data["name"]
         self._unit_id = data.get("unit_id", 2)
@@ -256,6 +173,10 @@ class _BaseNumber(NumberEntity):
         except Exception:
             return None
 
+    @property
+    def available(self) -> bool:
+        return self._transport.available
+
     @property
     def device_info(self):
         return device_info_for(self._device_key, self._device_name, DOMAIN)
@@ -266,10 +187,7 @@ class FroelingNumberInput(_BaseNumber):
 
     async def async_update(self, _=None):
         addr = self._register - 30001
-        async with self._lock:
-            res, err = await self._hass.async_add_executor_job(
-                _read_input_sync, self._client, self._unit_id, addr, 1
-            )
+        res, err = await self._transport.async_read_input(self._unit_id, addr, 1)
         if err or not res or not hasattr(res, "registers"):
             _LOGGER.debug("read_input addr=%s unit=%s failed: %s", addr, self._unit_id, err)
             self._value = None
@@ -280,7 +198,7 @@ class FroelingNumberInput(_BaseNumber):
 
 class FroelingNumberHolding(_BaseNumber):
     _override_timeout = timedelta(minutes=2)
-    _min_switch_interval = timedelta(minutes=10)
+    _keepalive = None
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -293,13 +211,24 @@ class FroelingNumberHolding(_BaseNumber):
             self._last_write_utc is not None
             and now - self._last_write_utc <= self._override_timeout
         )
-        return {
+        attrs = {
             "register": self._register,
             "last_write_utc": self._last_write_utc.isoformat() if self._last_write_utc else None,
             "modbus_override_active": override_active,
-            "min_switch_interval_min": int(self._min_switch_interval.total_seconds() // 60),
             "override_timeout_min": int(self._override_timeout.total_seconds() // 60),
         }
+        if self._keepalive is not None:
+            override = self._keepalive.state(self._register - 40001)
+            attrs["override_keepalive"] = True
+            attrs["modbus_override_active"] = override is not None
+            if override is not None:
+                attrs["last_write_utc"] = override["last_write_utc"]
+                attrs["override_expires_utc"] = override["expires_utc"]
+                attrs["override_refreshes"] = override["refreshes"]
+        budget = self._transport.write_budget
+        if budget is not None:
+            attrs["write_budget"] = budget.counters.get(self._register - 40001, {})
+        return attrs
 
     async def async_set_native_value(self, value):
         v = float(min(max(value, self._min_value), self._max_value))
@@ -307,28 +236,25 @@ class FroelingNumberHolding(_BaseNumber):
         v_quant = raw / float(self._scaling_factor)
 
         now = datetime.now(timezone.utc)
-        if self._last_write_utc and (now - self._last_write_utc) < self._min_switch_interval:
-            _LOGGER.warning("Write to %s (reg %s) innerhalb Mindestschaltdauer", self._entity_id, self._register)
-
+        # Schreib-Budget (Rate-Limit, gleiche Werte) prüft der Transport
         addr = self._register - 40001
-        async with self._lock:
-            _, err = await self._hass.async_add_executor_job(
-                _write_register_sync, self._client, self._unit_id, addr, raw
-            )
-        if err:
+        if self._keepalive is not None:
+            err = await self._keepalive.async_set(addr, raw)
+        else:
+            _, err = await self._transport.async_write_register(self._unit_id, addr, raw)
+        if err and not write_suppressed(err):
             _LOGGER.error("write_holding addr=%s unit=%s failed: %s", addr, self._unit_id, err)
             return
 
-        self._last_write_utc = now
+        # unverändert (vom Budget zurückgehalten): Gerät hat den Wert bereits, kein Write
+        if err is None:
+            self._last_write_utc = now
         self._value = round(v_quant, self._decimal_places)
         self.async_write_ha_state()
 
     async def async_update(self, _=None):
         addr = self._register - 40001
-        async with self._lock:
-            res, err = await self._hass.async_add_executor_job(
-                _read_holding_sync, self._client, self._unit_id, addr, 1
-            )
+        res, err = await self._transport.async_read_holding(self._unit_id, addr, 1)
         if err or not res or not hasattr(res, "registers"):
             _LOGGER.debug("read_holding addr=%s unit=%s failed: %s", addr, self._unit_id, err)
             self._value = None
@@ -0,0 +1,122 @@
+"""Ein gemeinsamer Poll-Zyklus pro Config-Entry statt eines Timers je Entity."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import timedelta
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .transport import FroelingTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+# Anteil des Intervalls, den die Block-Reads zu Zyklusbeginn höchstens belegen
+PREFETCH_BUDGET_SHARE = 0.5
+
+
+class FroelingPoller:
+    """Ruft alle registrierten Update-Callbacks einmal pro Intervall auf."""
+
+    def __init__(self, hass: HomeAssistant, transport: FroelingTransport, interval: timedelta, unit_id: int = 2):
+        self._hass = hass
+        self._transport = transport
+        self._interval = interval
+        self._unit_id = unit_id
+        self._updates: list = []
+        self._entities: list = []
+        self._cycle_listeners: list = []
+        self._unsub = None
+        self._running = False
+
+    @callback
+    def async_add(self, update, entity=None) -> None:
+        """Update-Coroutine (z. B. entity.async_update) in den Zyklus aufnehmen."""
+        self._updates.append(update)
+        if entity is not None:
+            self._entities.append(entity)
+
+    @callback
+    def async_remove(self, entity) -> None:
+        """Entity samt ihrer Update- und Zyklus-Callbacks aus dem Zyklus nehmen."""
+        self._updates = [u for u in self._updates if getattr(u, "__self__", None) is not entity]
+        self._cycle_listeners = [c for c in self._cycle_listeners if getattr(c, "__self__", None) is not entity]
+        self._entities = [e for e in self._entities if e is not entity]
+
+    @property
+    def entities(self) -> list:
+        """Alle im Zyklus registrierten Entities (z. B. für den Export)."""
+        return self._entities
+
+    @callback
+    def async_add_cycle_listener(self, listener) -> None:
+        """Callback, der nach jedem abgeschlossenen Zyklus aufgerufen wird."""
+        self._cycle_listeners.append(listener)
+
+    @callback
+    def _async_availability_changed(self) -> None:
+        """Alle Entities in einem Schritt (un)available schreiben."""
+        for entity in self._entities:
+            if getattr(entity, "hass", None) is not None and getattr(entity, "entity_id", None):
+                entity.async_write_ha_state()
+
+    @callback
+    def async_start(self) -> None:
+        if self._unsub is None:
+            self._transport.add_availability_listener(self._async_availability_changed)
+            self._unsub = async_track_time_interval(self._hass, self._async_tick, self._interval)
+
+    @callback
+    def async_set_interval(self, interval: timedelta) -> None:
+        """Intervall ändern; ein laufender Timer wird mit dem neuen Intervall neu gestartet."""
+        if interval == self._interval:
+            return
+        self._interval = interval
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = async_track_time_interval(self._hass, self._async_tick, self._interval)
+
+    @callback
+    def async_stop(self) -> None:
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    async def async_refresh(self) -> None:
+        """Einen Zyklus sofort ausführen (unabhängig vom Timer, z. B. für Replay)."""
+        await self._async_tick()
+
+    async def _async_probe(self) -> bool:
+        """Bei offenem Circuit-Breaker höchstens eine Probe pro Backoff-Periode."""
+        if not self._transport.breaker.probe_due():
+            return False
+        return await self._transport.async_probe(self._unit_id)
+
+    async def _async_tick(self, _=None) -> None:
+        if self._running:
+            # voriger Zyklus läuft noch → nicht stapeln
+            _LOGGER.debug("Poll-Zyklus übersprungen, vorheriger Zyklus läuft noch")
+            return
+        self._running = True
+        try:
+            if self._transport.breaker.is_open and not await self._async_probe():
+                return
+            self._transport.start_cycle()
+            try:
+                await self._transport.async_prefetch(
+                    self._unit_id, self._interval.total_seconds() * PREFETCH_BUDGET_SHARE
+                )
+                results = await asyncio.gather(*(u() for u in list(self._updates)), return_exceptions=True)
+                for r in results:
+                    if isinstance(r, Exception):
+                        _LOGGER.debug("Update im Poll-Zyklus fehlgeschlagen: %s", r)
+            finally:
+                self._transport.end_cycle()
+        finally:
+            self._running = False
+        tracer = self._transport.tracer
+        if tracer is not None and tracer.has_pending:
+            await self._hass.async_add_executor_job(tracer.flush)
+        for listener in list(self._cycle_listeners):
+            listener()
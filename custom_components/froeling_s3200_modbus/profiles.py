@@ -0,0 +1,183 @@
+"""Parameter-Profile: benannte Sätze von Holding-Werten, gespeichert und per Service angewendet.
+
+Ein Profil ist {Register: Wert} in physikalischen Einheiten (z. B. 41032: 55.0).
+Skalierung und Grenzen kommen von den Number-Entities der Register; Register
+ohne Entity (Gruppe nicht aktiv) werden nicht geschrieben. Beim Anwenden werden
+die aktuellen Werte als Block-Reads gelesen, nur abweichende Register
+geschrieben und zusammenhängende Abweichungen zu einem FC16-Write gebündelt.
+Modbus-Sollwerte (480xx) werden immer geschrieben – der Wert kann noch im
+Register stehen, obwohl der Override abgelaufen ist – und bei aktivem
+Keepalive wie von der Number-Entity über ihn gesetzt.
+"""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .keepalive import OVERRIDE_REGISTERS
+from .readplan import HOLDING, MAX_GAP, compile_plan, contiguous_runs
+from .transport import write_suppressed
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Vorgabe für "aktuelle Werte als Profil speichern": Heizkurven HK1/HK2,
+# Pumpen-Schaltschwellen HK1, Ladeschwellen Puffer 1
+DEFAULT_REGISTERS = (41032, 41033, 41037, 41038, 41062, 41063, 42022, 42027, 42028)
+
+# Ergebnis je Register
+RESULT_UNCHANGED = "unchanged"
+RESULT_WRITTEN = "written"
+RESULT_WOULD_WRITE = "would_write"
+RESULT_FAILED = "failed"
+RESULT_READ_FAILED = "read_failed"
+RESULT_UNKNOWN = "unknown_register"
+
+
+def _signed(raw: int) -> int:
+    return raw - 65536 if raw > 32767 else raw
+
+
+class ParameterProfiles:
+    """Profile einer Entry in .storage; Anwenden über den gemeinsamen Transport."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, transport, poller, unit_id: int):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}_profiles")
+        self._transport = transport
+        self._poller = poller
+        self._unit_id = unit_id
+        self.profiles: dict[str, dict[int, float]] = {}
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load() or {}
+        self.profiles = {
+            name: {int(reg): value for reg, value in values.items()} for name, values in stored.items()
+        }
+
+    async def _async_save(self) -> None:
+        await self._store.async_save(
+            {name: {str(reg): value for reg, value in values.items()} for name, values in self.profiles.items()}
+        )
+
+    def _numbers(self) -> dict:
+        """Register → beschreibbare Number-Entity (Holding, 4xxxx)."""
+        return {
+            e._register: e for e in self._poller.entities
+            if hasattr(e, "async_set_native_value") and hasattr(e, "_scaling_factor")
+            and 40001 <= getattr(e, "_register", 0) < 50000
+        }
+
+    async def _async_read(self, registers) -> dict[int, int]:
+        """Aktuelle Rohwerte (Register → raw); nicht lesbare Register fehlen."""
+        addrs = sorted(reg - 40001 for reg in registers)
+        values: dict[int, int] = {}
+        plan = compile_plan(((HOLDING, a, 1) for a in addrs), MAX_GAP.get(self._transport.framer, MAX_GAP["socket"]))
+        for block in plan:
+            res, err = await self._transport.async_read_holding(self._unit_id, block.addr, block.count)
+            if err is None:
+                values.update(zip(range(block.addr, block.addr + block.count), res.registers))
+                continue
+            # Block über eine Lücke → nur die gewünschten Register einzeln
+            for a in (a for a in addrs if block.addr <= a < block.addr + block.count):
+                res, err = await self._transport.async_read_holding(self._unit_id, a, 1)
+                if err is None:
+                    values[a] = res.registers[0]
+        return {a + 40001: values[a] for a in addrs if a in values}
+
+    async def async_save_profile(self, name: str, values: dict[int, float] | None = None) -> dict:
+        """Profil speichern; ohne values werden die aktuellen Werte der Vorgabe-Register übernommen."""
+        numbers = self._numbers()
+        if values is None:
+            registers = [reg for reg in DEFAULT_REGISTERS if reg in numbers]
+            current = await self._async_read(registers)
+            values = {
+                reg: round(_signed(raw) / float(numbers[reg]._scaling_factor), numbers[reg]._decimal_places)
+                for reg, raw in current.items()
+            }
+        unknown = sorted(reg for reg in values if reg not in numbers)
+        if unknown:
+            raise HomeAssistantError(f"Register ohne Number-Entity: {', '.join(map(str, unknown))}")
+        if not values:
+            raise HomeAssistantError("Profil ist leer")
+        self.profiles[name] = dict(sorted(values.items()))
+        await self._async_save()
+        return {"name": name, "values": {str(reg): value for reg, value in self.profiles[name].items()}}
+
+    async def async_delete_profile(self, name: str) -> None:
+        if self.profiles.pop(name, None) is None:
+            raise HomeAssistantError(f"Profil {name} unbekannt")
+        await self._async_save()
+
+    async def async_apply_profile(self, name: str, dry_run: bool = False) -> dict:
+        """Profil anwenden: Bulk-Read, Diff, FC06/FC16 nur für abweichende Register."""
+        profile = self.profiles.get(name)
+        if profile is None:
+            raise HomeAssistantError(f"Profil {name} unbekannt")
+        numbers = self._numbers()
+        results: dict[int, dict] = {}
+        targets: dict[int, int] = {}
+        for reg, value in profile.items():
+            entity = numbers.get(reg)
+            if entity is None:
+                results[reg] = {"value": value, "result": RESULT_UNKNOWN}
+                continue
+            v = float(min(max(value, entity._min_value), entity._max_value))
+            targets[reg] = int(round(v * float(entity._scaling_factor)))
+
+        current = await self._async_read(targets)
+        to_write = []
+        for reg, raw in targets.items():
+            entity = numbers[reg]
+            value = round(raw / float(entity._scaling_factor), entity._decimal_places)
+            if reg not in current:
+                results[reg] = {"value": value, "result": RESULT_READ_FAILED}
+                continue
+            previous = round(_signed(current[reg]) / float(entity._scaling_factor), entity._decimal_places)
+            results[reg] = {"value": value, "previous": previous}
+            keepalive = getattr(entity, "_keepalive", None)
+            if current[reg] == raw & 0xFFFF and (
+                reg not in OVERRIDE_REGISTERS or (keepalive is not None and keepalive.is_active(reg - 40001, raw))
+            ):
+                results[reg]["result"] = RESULT_UNCHANGED
+            elif dry_run:
+                results[reg]["result"] = RESULT_WOULD_WRITE
+            else:
+                to_write.append(reg)
+
+        # Overrides mit Keepalive einzeln über ihn (wird dort gemerkt und aufgefrischt)
+        runs = []
+        for reg in [r for r in to_write if getattr(numbers[r], "_keepalive", None) is not None]:
+            to_write.remove(reg)
+            err = await numbers[reg]._keepalive.async_set(reg - 40001, targets[reg])
+            runs.append(([reg], err))
+        # zusammenhängende Register in einem FC16, einzelne per FC06
+        for run in contiguous_runs(sorted(to_write)):
+            addr = run[0] - 40001
+            raws = [targets[reg] & 0xFFFF for reg in run]
+            if len(run) == 1:
+                _, err = await self._transport.async_write_register(self._unit_id, addr, raws[0])
+            else:
+                _, err = await self._transport.async_write_registers(self._unit_id, addr, raws)
+            runs.append((run, err))
+        for run, err in runs:
+            for reg in run:
+                if write_suppressed(err):
+                    results[reg]["result"] = RESULT_UNCHANGED  # vom Schreib-Budget zurückgehalten
+                    continue
+                if err is not None:
+                    results[reg].update(result=RESULT_FAILED, error=str(err))
+                    continue
+                results[reg]["result"] = RESULT_WRITTEN
+                entity = numbers[reg]
+                entity._value = results[reg]["value"]
+                if entity.hass is not None:
+                    entity.async_write_ha_state()
+
+        written = sum(1 for r in results.values() if r["result"] == RESULT_WRITTEN)
+        _LOGGER.info("Profil %s angewendet: %d von %d Registern geschrieben", name, written, len(results))
+        return {"profile": name, "dry_run": dry_run, "registers": {str(reg): results[reg] for reg in sorted(results)}}
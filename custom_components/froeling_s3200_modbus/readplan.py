@@ -0,0 +1,87 @@
+"""Block-Reads: Einzel-Reads eines Zyklus zu wenigen zusammenhängenden Anfragen bündeln."""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+# Tabellen (Funktionscodes FC04/FC03/FC01/FC02)
+INPUT = "input"
+HOLDING = "holding"
+COIL = "coil"
+DISCRETE = "discrete"
+
+# Modbus-Grenzen je Anfrage
+MAX_REGISTERS = 125
+MAX_BITS = 2000
+
+# Lücken bis zu so vielen ungenutzten Adressen werden mitgelesen: eine zusätzliche
+# Anfrage kostet mehr als ein paar Bytes mehr Antwort (bei RTU über langsame
+# serielle Strecken noch deutlich mehr → größere Lücke). 32 überbrückt den
+# 30er-Abstand der Heizkreis-/Boiler-Instanzen, sodass weitere Instanzen kaum
+# zusätzliche Anfragen kosten.
+MAX_GAP = {"socket": 32, "rtu": 48}
+
+# Bits (Coils/Discrete Inputs) sind 16-mal billiger als Register
+_BITS_PER_REGISTER = 16
+
+
+class ReadBlock(NamedTuple):
+    table: str
+    addr: int
+    count: int
+
+
+def _limit(table: str) -> int:
+    return MAX_BITS if table in (COIL, DISCRETE) else MAX_REGISTERS
+
+
+def compile_plan(reads, max_gap: int = MAX_GAP["socket"], bad_blocks=frozenset()) -> list[ReadBlock]:
+    """(table, addr, count)-Tupel → sortierte Liste von ReadBlocks.
+
+    Blöcke, die früher mit Illegal Data Address scheiterten (bad_blocks), werden
+    halbiert, bis sie lesbar sind oder nur noch Einzel-Reads übrig bleiben.
+    """
+    by_table: dict[str, set[int]] = {}
+    for table, addr, count in reads:
+        by_table.setdefault(table, set()).update(range(addr, addr + count))
+
+    plan: list[ReadBlock] = []
+    for table in sorted(by_table):
+        addrs = sorted(by_table[table])
+        limit = _limit(table)
+        gap = max_gap * _BITS_PER_REGISTER if table in (COIL, DISCRETE) else max_gap
+        group = [addrs[0]]
+        for a in addrs[1:]:
+            if a - group[-1] - 1 <= gap and a - group[0] < limit:
+                group.append(a)
+            else:
+                plan.extend(_split(table, group, bad_blocks))
+                group = [a]
+        plan.extend(_split(table, group, bad_blocks))
+    return plan
+
+
+def _split(table: str, group: list[int], bad_blocks) -> list[ReadBlock]:
+    block = ReadBlock(table, group[0], group[-1] - group[0] + 1)
+    if block not in bad_blocks or len(group) == 1:
+        return [block]
+    mid = len(group) // 2
+    return _split(table, group[:mid], bad_blocks) + _split(table, group[mid:], bad_blocks)
+
+
+def halve(block: ReadBlock, addrs) -> list[ReadBlock]:
+    """Block an der Mitte der darin benötigten Adressen teilen (ungenutzte Ränder entfallen)."""
+    group = sorted(a for a in addrs if block.addr <= a < block.addr + block.count)
+    if not group:
+        return []
+    return _split(block.table, group, {ReadBlock(block.table, group[0], group[-1] - group[0] + 1)})
+
+
+def contiguous_runs(addrs) -> list[list[int]]:
+    """Sortierte Adressen → Läufe aufeinanderfolgender Adressen (je Lauf ein FC16-Write)."""
+    runs: list[list[int]] = []
+    for a in addrs:
+        if runs and a == runs[-1][-1] + 1:
+            runs[-1].append(a)
+        else:
+            runs.append([a])
+    return runs
@@ -1,91 +1,18 @@
 from __future__ import annotations
 import logging
-from datetime import timedelta
 from homeassistant.components.select import SelectEntity
-from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.helpers.translation import async_get_translations
-from pymodbus.client import ModbusTcpClient
 from .const import DOMAIN
+from .device import device_info_for
+from . import templates
+from .transport import write_suppressed
 
 _LOGGER = logging.getLogger(__name__)
 
-# ------------------- Geräte-Gruppierung -------------------
-DEVICE_NAME = {
-    "controller": "SP Dual Compact",
-    "kessel": "Kessel",
-    "boiler01": "Boiler 01",
-    "hk01": "Heizkreis 01",
-    "hk02": "Heizkreis 02",
-    "puffer01": "Puffer 01",
-    "austragung": "Austragung",
-    "zirkulationspumpe": "Zirkulationspumpe",
-}
-
-def device_info_for(device_key: str, device_name_from_config: str, domain: str):
-    dev_name = DEVICE_NAME.get(device_key, device_key)
-    if device_key == "controller":
-        return {
-            "identifiers": {(domain, f"{device_name_from_config}:controller")},
-            "name": "SP Dual Compact",
-            "manufacturer": "Fröling",
-            "model": "SP Dual Compact",
-            "sw_version": "0.3.0",
-        }
-    return {
-        "identifiers": {(domain, f"{device_name_from_config}:{device_key}")},
-        "name": dev_name,
-        "manufacturer": "Fröling",
-        "model": dev_name,
-        "via_device": (domain, f"{device_name_from_config}:controller"),
-        "sw_version": "0.3.0",
-    }
-
 # ------------------- Helpers -------------------
 def _tr_key(s: str) -> str:
     return "".join(ch.lower() if ch.isalnum() else "_" for ch in s)
 
-# ---------------- Modbus Helpers (Holding lesen/schreiben) ----------------
-def _read_holding_sync(client, unit_id: int, addr: int, count: int):
-    if not client.connect():
-        return None, "connect"
-    try:
-        res = client.read_holding_registers(addr, count=count, device_id=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(device_id)"
-        return res, None
-    except TypeError:
-        pass
-    try:
-        res = client.read_holding_registers(addr, count=count, unit=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(unit)"
-        return res, None
-    except Exception as e:
-        return None, f"exc:{e}"
-
-def _write_register_sync(client: ModbusTcpClient, unit_id: int, addr: int, value: int):
-    """FC=06: Write Single Holding Register (4xxxx)."""
-    if not client.connect():
-        return None, "connect"
-    # 1) bevorzugt: device_id
-    try:
-        res = client.write_register(addr, value, device_id=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(device_id)"
-        return res, None
-    except TypeError:
-        pass
-    # 2) fallback: unit
-    try:
-        res = client.write_register(addr, value, unit=unit_id)
-        if hasattr(res, "isError") and res.isError():
-            return None, "error(unit)"
-        return res, None
-    except Exception as e:
-        return None, f"exc:{e}"
-
-# -------------------------------------------------------------------------
-
 # ------------------------ Option-Definitionen (Codes → Keys) ----------------
 # HK-Betriebsarten (Register 48047/48048)
 HK_MODE_CODE_TO_KEY = {
@@ -130,10 +57,11 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
     data = hass.data[DOMAIN][config_entry.entry_id]
 
     # Übersetzungen: nur der erlaubte "entity"-Namespace
-    translations = await async_get_translations(hass, hass.config.language, "entity")
+    base_translations = await async_get_translations(hass, hass.config.language, "entity")
+    generated = translations = None  # setzt build()
 
-    client: ModbusTcpClient = hass.data[DOMAIN][f"{config_entry.entry_id}_client"]
-    lock = hass.data[DOMAIN][f"{config_entry.entry_id}_lock"]
+    transport = hass.data[DOMAIN][f"{config_entry.entry_id}_transport"]
+    poller = hass.data[DOMAIN][f"{config_entry.entry_id}_poller"]
 
     def create_selects():
         entities: list[SelectEntity] = []
@@ -144,8 +72,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 FroelingSelect(
                     hass=hass,
                     config_entry=config_entry,
-                    client=client,
-                    lock=lock,
+                    transport=transport,
                     translations=translations,
                     data=data,
                     entity_id="betriebsart_heizkreis_01",
@@ -164,8 +91,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 FroelingSelect(
                     hass=hass,
                     config_entry=config_entry,
-                    client=client,
-                    lock=lock,
+                    transport=transport,
                     translations=translations,
                     data=data,
                     entity_id="betriebsart_heizkreis_02",
@@ -184,8 +110,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 FroelingSelect(
                     hass=hass,
                     config_entry=config_entry,
-                    client=client,
-                    lock=lock,
+                    transport=transport,
                     translations=translations,
                     data=data,
                     entity_id="brennstoffauswahl",
@@ -198,14 +123,41 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
                 )
             )
 
+        # 48049… – Betriebsart Heizkreis 03–18 (Vorlagen)
+        for g in generated:
+            entities.append(
+                FroelingSelect(
+                    hass=hass,
+                    config_entry=config_entry,
+                    transport=transport,
+                    translations=translations,
+                    data=data,
+                    entity_id=g.entity_id,
+                    register=g.register,
+                    device_key=g.device_key,
+                    group_key="hk_mode",
+                    code_to_key=HK_MODE_CODE_TO_KEY,
+                    key_to_code=HK_MODE_KEY_TO_CODE,
+                    name_fallback=f"Betriebsart Heizkreis {g.nn}",
+                )
+            )
+
         return entities
 
-    entities = create_selects()
-    async_add_entities(entities)
+    # Options-Änderungen (Gruppen) ohne Reload: build() für jede Konfiguration
+    def build(new_data):
+        nonlocal data, generated, translations
+        data = new_data
+        generated = templates.expand(data, "select")
+        translations = templates.with_translations(base_translations, "select", generated)
+        return create_selects()
 
-    interval = timedelta(seconds=data.get("update_interval", 60))
-    for e in entities:
-        async_track_time_interval(hass, e.async_update, interval)
+    def add(entities):
+        async_add_entities(entities)
+        for e in entities:
+            poller.async_add(e.async_update, e)
+
+    hass.data[DOMAIN][f"{config_entry.entry_id}_entities"].async_register("select", data, build, add)
 
 # --------------------------- Entity ---------------------------
 class FroelingSelect(SelectEntity):
@@ -215,8 +167,7 @@ class FroelingSelect(SelectEntity):
         self,
         hass,
         config_entry,
-        client,
-        lock,
+        transport,
         translations,
         data,
         entity_id: str,
@@ -228,8 +179,7 @@ class FroelingSelect(SelectEntity):
         name_fallback: str,
     ):
         self._hass = hass
-        self._client = client
-        self._lock = lock
+        self._transport = transport
         self._translations = translations
         self._device_name = data["name"]
         self._unit_id = int(data.get("unit_id", 2))
@@ -277,6 +227,10 @@ class FroelingSelect(SelectEntity):
             return None
         return self._label_for_key(self._current_key)
 
+    @property
+    def available(self) -> bool:
+        return self._transport.available
+
     @property
     def device_info(self):
         return device_info_for(self._device_key, self._device_name, DOMAIN)
@@ -284,10 +238,7 @@ class FroelingSelect(SelectEntity):
     async def async_update(self, *_):
         """Holding lesen und Option setzen."""
         addr = self._register - 40001
-        async with self._lock:
-            res, err = await self._hass.async_add_executor_job(
-                _read_holding_sync, self._client, self._unit_id, addr, 1
-            )
+        res, err = await self._transport.async_read_holding(self._unit_id, addr, 1)
         if err or not res or not hasattr(res, "registers"):
             _LOGGER.debug("read_holding addr=%s unit=%s failed: %s", addr, self._unit_id, err)
             return
@@ -335,11 +286,8 @@ class FroelingSelect(SelectEntity):
             code = int(self._key_to_code[key])
 
         addr = self._register - 40001
-        async with self._lock:
-            _, err = await self._hass.async_add_executor_job(
-                _write_register_sync, self._client, self._unit_id, addr, code
-            )
-        if err:
+        _, err = await self._transport.async_write_register(self._unit_id, addr, code)
+        if err and not write_suppressed(err):
             _LOGGER.error("write_holding addr=%s unit=%s failed: %s", addr, self._unit_id, err)
             return
 
@@ -0,0 +1,143 @@
+"""Services der Integration (domänenweit, wirken auf alle oder eine Config-Entry)."""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+import homeassistant.helpers.config_validation as cv
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_SET_FRAME_TRACE = "set_frame_trace"
+SERVICE_GET_FAULT_HISTORY = "get_fault_history"
+SERVICE_SAVE_PROFILE = "save_parameter_profile"
+SERVICE_APPLY_PROFILE = "apply_parameter_profile"
+SERVICE_DELETE_PROFILE = "delete_parameter_profile"
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ENABLED = "enabled"
+ATTR_NAME = "name"
+ATTR_VALUES = "values"
+ATTR_DRY_RUN = "dry_run"
+
+SET_FRAME_TRACE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENABLED): cv.boolean,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+GET_FAULT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+SAVE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        # {Register: Wert}; ohne values werden die aktuellen Werte übernommen
+        vol.Optional(ATTR_VALUES): vol.Schema({vol.Coerce(int): vol.Coerce(float)}),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+APPLY_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_DRY_RUN, default=False): cv.boolean,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+DELETE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_NAME): cv.string,
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+
+def _entry_objects(hass: HomeAssistant, call: ServiceCall, suffix: str):
+    """(entry_id, Objekt) aller geladenen Entries für hass.data-Keys "<entry_id><suffix>"."""
+    wanted = call.data.get(ATTR_CONFIG_ENTRY_ID)
+    # Kopie: Aufrufer warten zwischen den Einträgen, derweil kann eine Entry laden/entladen
+    for key, value in list(hass.data.get(DOMAIN, {}).items()):
+        if not key.endswith(suffix):
+            continue
+        entry_id = key[: -len(suffix)]
+        if wanted and entry_id != wanted:
+            continue
+        yield entry_id, value
+
+
+def _transports(hass: HomeAssistant, call: ServiceCall):
+    """(entry_id, transport) aller geladenen Entries, optional gefiltert."""
+    return _entry_objects(hass, call, "_transport")
+
+
+async def async_register_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_SET_FRAME_TRACE):
+        return
+
+    async def _async_set_frame_trace(call: ServiceCall) -> None:
+        enabled = call.data[ATTR_ENABLED]
+        for entry_id, transport in _transports(hass, call):
+            tracer = transport.tracer
+            tracer.set_enabled(enabled)
+            if not enabled:
+                await hass.async_add_executor_job(tracer.flush)
+            _LOGGER.warning(
+                "Modbus frame trace %s for %s (%s)",
+                "enabled" if enabled else "disabled", entry_id, tracer.path,
+            )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_FRAME_TRACE, _async_set_frame_trace, schema=SET_FRAME_TRACE_SCHEMA
+    )
+
+    async def _async_get_fault_history(call: ServiceCall) -> ServiceResponse:
+        return {
+            "entries": {entry_id: history.as_dict() for entry_id, history in _entry_objects(hass, call, "_history")}
+        }
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_GET_FAULT_HISTORY, _async_get_fault_history,
+        schema=GET_FAULT_HISTORY_SCHEMA, supports_response=SupportsResponse.ONLY,
+    )
+
+    async def _async_save_profile(call: ServiceCall) -> ServiceResponse:
+        return {
+            "entries": {
+                entry_id: await profiles.async_save_profile(call.data[ATTR_NAME], call.data.get(ATTR_VALUES))
+                for entry_id, profiles in _entry_objects(hass, call, "_profiles")
+            }
+        }
+
+    async def _async_apply_profile(call: ServiceCall) -> ServiceResponse:
+        return {
+            "entries": {
+                entry_id: await profiles.async_apply_profile(call.data[ATTR_NAME], call.data[ATTR_DRY_RUN])
+                for entry_id, profiles in _entry_objects(hass, call, "_profiles")
+            }
+        }
+
+    async def _async_delete_profile(call: ServiceCall) -> None:
+        for _entry_id, profiles in _entry_objects(hass, call, "_profiles"):
+            await profiles.async_delete_profile(call.data[ATTR_NAME])
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SAVE_PROFILE, _async_save_profile,
+        schema=SAVE_PROFILE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_APPLY_PROFILE, _async_apply_profile,
+        schema=APPLY_PROFILE_SCHEMA, supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DELETE_PROFILE, _async_delete_profile, schema=DELETE_PROFILE_SCHEMA
+    )
@@ -0,0 +1,165 @@
+"""Instanz-Vorlagen: weitere Heizkreise aus Basisadresse + Stride.
+
+Die S3200 legt die Register mehrfach vorhandener Module in festen Abständen
+ab; belegt ist das nur für die Heizkreise (HK1 31031/41032…, HK2 31061/41062…
+→ 30 Register, Modbus-Vorgaben 48001/48002, 48029/48030, 48047/48048 →
+fortlaufend). hk01 und hk02 bleiben handgeschrieben (stabile unique_ids),
+HK03–HK18 werden hier aus HK2 erzeugt. Für Puffer und Boiler ist jeweils nur
+eine Instanz dokumentiert, daher gibt es für sie keine Vorlagen.
+
+Das Modul importiert bewusst nichts aus Home Assistant, damit die Werkzeuge
+unter tools/ dieselbe Registerliste verwenden können.
+"""
+from __future__ import annotations
+
+from typing import NamedTuple
+
+_TR_PREFIX = "component.froeling_s3200_modbus.entity"
+
+# Abstände je Registerbank
+STRIDE_MODULE = 30      # 31xxx/41xxx und Coils: ein 30er-Block pro Instanz
+STRIDE_OVERRIDE = 1     # 480xx (Modbus-Sollwerte, Freigabe, Betriebsart): fortlaufend
+
+PUFFERVERSORGUNG_MAPPING = {0: "Kessel", 1: "Puffer01", 2: "Puffer02", 3: "Puffer03", 4: "Puffer04"}
+
+
+class TemplateEntity(NamedTuple):
+    platform: str       # "sensor", "number", "binary_sensor", "switch", "select"
+    kind: str           # Klasse innerhalb der Plattform ("input", "holding", "text_holding", "coil")
+    key: str            # Entity-Suffix: <gruppe>_<key>
+    register: int       # Adresse in der Referenz-Instanz (Coils ohne Offset)
+    stride: int
+    options: dict = {}  # Konstruktor-Argumente der Plattform-Klasse
+
+
+class GroupTemplate(NamedTuple):
+    prefix: str         # Gruppen-Key ohne Nummer ("hk" → hk03)
+    device_name: str    # "Heizkreis" → "Heizkreis 03"
+    ref: int            # Instanz, auf die sich die Registeradressen beziehen
+    first: int          # erste erzeugte Instanz
+    last: int
+    entities: tuple
+
+
+class InstanceEntity(NamedTuple):
+    device_key: str     # z. B. "hk03"
+    entity_id: str      # z. B. "hk03_vorlauf_isttemperatur"
+    tr_key: str         # Übersetzungs-Key der Vorlage, z. B. "hk_nn_vorlauf_isttemperatur"
+    nn: str             # zweistellige Instanznummer
+    kind: str
+    register: int
+    options: dict
+
+
+def _t(platform, kind, key, register, stride=STRIDE_MODULE, **options) -> TemplateEntity:
+    return TemplateEntity(platform, kind, key, register, stride, options)
+
+
+_TEMP = {"unit": "°C", "scaling_factor": 2, "decimal_places": 0, "device_class": "temperature"}
+
+# Heizkreise: Referenz ist HK2, weil HK1 bei 41047/41048 einen Versatz von einem
+# Register gegenüber HK2 (41078/41079) hat
+HEIZKREIS = GroupTemplate("hk", "Heizkreis", 2, 3, 18, (
+    _t("sensor", "input", "vorlauf_isttemperatur", 31061, **_TEMP),
+    _t("sensor", "input", "vorlauf_solltemperatur", 31062, **_TEMP),
+    _t("sensor", "holding", "maximale_vorlauftemperatur", 41065, **_TEMP),
+    _t("sensor", "holding", "laufzeit_mischer", 41073, unit="s", scaling_factor=1),
+    _t("sensor", "holding", "maximale_boiler_vorlauftemperatur", 41078, **_TEMP),
+    _t("sensor", "text_holding", "pufferversorgung", 41075, mapping=PUFFERVERSORGUNG_MAPPING),
+    _t("number", "holding", "vorlauf_temperatur_10c_aussentemperatur", 41062,
+       unit="°C", scaling_factor=2, min_value=10, max_value=110),
+    _t("number", "holding", "vorlauf_temperatur_minus_10c_aussentemperatur", 41063,
+       unit="°C", scaling_factor=2, min_value=10, max_value=110),
+    _t("number", "holding", "absenkung_der_vorlauftemperatur_im_absenkbetrieb", 41064,
+       unit="°C", scaling_factor=2, min_value=0, max_value=70),
+    _t("number", "holding", "aussentemperatur_unter_der_die_heizkreispumpe_im_heizbetrieb_einschaltet", 41067,
+       unit="°C", scaling_factor=2, min_value=-20, max_value=50),
+    _t("number", "holding", "aussentemperatur_unter_der_die_heizkreispumpe_im_absenkbetrieb_einschaltet", 41068,
+       unit="°C", scaling_factor=2, min_value=-20, max_value=50),
+    _t("number", "holding", "frostschutztemperatur", 41069,
+       unit="°C", scaling_factor=2, min_value=-10, max_value=20),
+    _t("number", "holding", "heizkreispumpe_ausschalten_wenn_vorlauf_soll_kleiner_ist_als", 41070,
+       unit="°C", scaling_factor=2, min_value=10, max_value=30),
+    _t("number", "holding", "temp_am_puffer_oben_ab_der_der_ueberhitzungsschutz_aktiv_wird", 41079,
+       unit="°C", scaling_factor=1, min_value=60, max_value=120, device_class="temperature"),
+    _t("number", "holding", "vorlauf_soll_modbus", 48002, STRIDE_OVERRIDE,
+       unit="°C", scaling_factor=2, min_value=0, max_value=75),
+    _t("binary_sensor", "coil", "pumpe_an_aus", 1060),
+    _t("binary_sensor", "holding", "boilervorrang_heizen_erlaubt", 41074),
+    _t("binary_sensor", "holding", "hochtemperatur_anforderung_boilerladung", 41076),
+    _t("switch", "holding", "freigabe", 48030, STRIDE_OVERRIDE),
+    _t("select", "holding", "betriebsart", 48048, STRIDE_OVERRIDE),
+))
+
+# Puffer und Boiler: documentation/Modbus_Register.txt führt nur Puffer 1
+# (32001…, 42001–42030) und Boiler 1 (31631…, 41632–41646); der Abstand weiterer
+# Instanzen ist nicht belegt → keine Vorlagen, keine Entities auf geratenen Adressen
+
+TEMPLATES = (HEIZKREIS,)
+
+
+def group_key(template: GroupTemplate, n: int) -> str:
+    return f"{template.prefix}{n:02d}"
+
+
+# Alle erzeugbaren Gruppen in Anzeige-Reihenfolge (für Config-Flow und Aufräumen)
+TEMPLATE_GROUPS = [group_key(t, n) for t in TEMPLATES for n in range(t.first, t.last + 1)]
+
+DEVICE_NAME = {
+    group_key(t, n): f"{t.device_name} {n:02d}" for t in TEMPLATES for n in range(t.first, t.last + 1)
+}
+
+
+def enabled_instances(data) -> list[tuple[GroupTemplate, int]]:
+    """(Vorlage, Instanznummer) für alle in "extra_groups" gewählten Gruppen."""
+    chosen = set(data.get("extra_groups") or ())
+    return [
+        (t, n) for t in TEMPLATES for n in range(t.first, t.last + 1) if group_key(t, n) in chosen
+    ]
+
+
+def expand(data, platform: str) -> list[InstanceEntity]:
+    """Entities einer Plattform für alle gewählten Instanzen."""
+    items = []
+    for template, n in enabled_instances(data):
+        device_key = group_key(template, n)
+        for e in template.entities:
+            if e.platform != platform:
+                continue
+            items.append(InstanceEntity(
+                device_key=device_key,
+                entity_id=f"{device_key}_{e.key}",
+                tr_key=f"{template.prefix}_nn_{e.key}",
+                nn=f"{n:02d}",
+                kind=e.kind,
+                register=e.register + (n - template.ref) * e.stride,
+                options=e.options,
+            ))
+    return items
+
+
+def with_translations(translations: dict, platform: str, items) -> dict:
+    """Übersetzungen der Vorlagen-Keys (…_nn_…) auf die erzeugten Entity-IDs übertragen.
+
+    "{nn}" im Text wird durch die Instanznummer ersetzt; Unterschlüssel wie
+    state.* (Select-Optionen) werden mitkopiert.
+    """
+    if not items:
+        return translations
+    prefix = f"{_TR_PREFIX}.{platform}."
+    by_key: dict[str, list[tuple[str, str]]] = {}
+    for path, text in translations.items():
+        if path.startswith(prefix):
+            key, _, rest = path[len(prefix):].partition(".")
+            if "_nn_" in key:
+                by_key.setdefault(key, []).append((rest, text))
+    out = dict(translations)
+    for item in items:
+        for rest, text in by_key.get(item.tr_key, ()):
+            out[f"{prefix}{item.entity_id}.{rest}"] = text.replace("{nn}", item.nn)
+    return out
+
+
+def registers(template: GroupTemplate, n: int) -> list[tuple[str, int]]:
+    """(kind, Register) einer Instanz – für Simulator und Werkzeuge."""
+    return [(e.kind, e.register + (n - template.ref) * e.stride) for e in template.entities]
@@ -0,0 +1,153 @@
+"""Opt-in Frame-Tracer: Modbus-Anfragen/-Antworten als JSONL-Mitschnitt."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import threading
+from collections import deque
+from time import perf_counter, time
+
+_LOGGER = logging.getLogger(__name__)
+
+TRACE_RING_SIZE = 2000           # Frames im Speicher bis zum nächsten Flush
+TRACE_MAX_BYTES = 5 * 1024 * 1024  # Rotation ab 5 MB
+TRACE_BACKUPS = 2                 # trace.jsonl.1, trace.jsonl.2
+
+_MBAP = struct.Struct(">HHHB")  # Transaction-ID, Protokoll-ID, Länge, Unit-ID
+
+
+def decode_frame(data: bytes, framer: str = "socket") -> dict:
+    """MBAP-Header (bzw. RTU-Adresse/CRC) und PDU eines Frames in ein kompaktes Dict zerlegen."""
+    if framer == "rtu":
+        if len(data) < 4:
+            return {"raw": data.hex()}
+        return {"unit": data[0], "fc": data[1], "pdu": data[2:-2].hex(), "crc": data[-2:].hex()}
+    if len(data) < 8:
+        return {"raw": data.hex()}
+    tid, pid, length, unit = _MBAP.unpack_from(data)
+    pdu = data[7:]
+    return {"mbap": data[:7].hex(), "tid": tid, "pid": pid, "len": length, "unit": unit,
+            "fc": pdu[0], "pdu": pdu[1:].hex()}
+
+
+def _request_fields(fc: int, body: bytes) -> dict:
+    # FC01–04, FC06, FC16: Adresse + Anzahl/Wert stehen immer in den ersten 4 Bytes
+    if fc in (1, 2, 3, 4, 6, 16) and len(body) >= 4:
+        addr, second = struct.unpack_from(">HH", body)
+        if fc == 6:
+            return {"addr": addr, "count": 1, "payload": body[2:4].hex()}
+        fields = {"addr": addr, "count": second}
+        if fc == 16:
+            fields["payload"] = body[5:].hex()
+        return fields
+    return {}
+
+
+class FrameTracer:
+    """Sammelt Frame-Paare in einem Ringpuffer und schreibt sie rotierend auf Disk.
+
+    trace_packet() wird von pymodbus im Executor-Thread aufgerufen; flush() ebenfalls
+    im Executor. Ist der Tracer aus, kostet ein Frame nur eine Attribut-Abfrage.
+    """
+
+    def __init__(self, path: str, ring_size: int = TRACE_RING_SIZE,
+                 max_bytes: int = TRACE_MAX_BYTES, backups: int = TRACE_BACKUPS, framer: str = "socket"):
+        self.path = path
+        self.framer = framer
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.enabled = False
+        self.dropped = 0
+        self.written = 0
+        self._ring: deque = deque(maxlen=ring_size)
+        self._pending: dict[int, tuple[float, float, bytes]] = {}
+        self._io_lock = threading.Lock()
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._ring)
+
+    def trace_packet(self, sending: bool, data: bytes) -> bytes:
+        """Callback für ModbusTcpClient(trace_packet=...); gibt den Frame unverändert zurück."""
+        if not self.enabled:
+            return data
+        try:
+            if sending:
+                tid = self._tid(data)
+                self._pending[tid] = (time(), perf_counter(), bytes(data))
+            else:
+                self._record(bytes(data))
+        except Exception as e:  # Tracing darf nie den Modbus-Verkehr stören
+            _LOGGER.debug("frame trace failed: %s", e)
+        return data
+
+    def _tid(self, data: bytes) -> int:
+        # RTU kennt keine Transaction-ID → immer nur eine offene Anfrage
+        if self.framer == "rtu" or len(data) < 2:
+            return -1
+        return struct.unpack_from(">H", data)[0]
+
+    def _record(self, rx: bytes) -> None:
+        tid = self._tid(rx)
+        sent = self._pending.pop(tid, None)
+        if sent is None and len(self._pending) == 1:
+            # Antwort ohne passende Transaction-ID: letzte offene Anfrage
+            sent = self._pending.popitem()[1]
+        self._pending.clear()
+        ts, t0, tx = sent if sent else (time(), None, b"")
+        req = decode_frame(tx, self.framer) if tx else {}
+        rsp = decode_frame(rx, self.framer)
+        rec = {
+            "ts": round(ts, 4),
+            "lat_ms": round((perf_counter() - t0) * 1000.0, 2) if t0 is not None else None,
+            "tid": req.get("tid", rsp.get("tid")),
+            "unit": req.get("unit", rsp.get("unit")),
+            "fc": req.get("fc", rsp.get("fc")),
+            "req_mbap": req.get("mbap"),
+            "rsp_mbap": rsp.get("mbap"),
+            "req": req.get("pdu"),
+            "rsp": rsp.get("pdu", rsp.get("raw")),
+        }
+        if tx and "fc" in req:
+            rec.update(_request_fields(req["fc"], tx[2:-2] if self.framer == "rtu" else tx[8:]))
+        if rsp.get("fc", 0) & 0x80 and rsp.get("pdu"):
+            rec["exc"] = int(rsp["pdu"][:2], 16)
+        if len(self._ring) == self._ring.maxlen:
+            self.dropped += 1
+        self._ring.append(rec)
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self._pending.clear()
+
+    def flush(self) -> int:
+        """Gepufferte Frames anhängen (blockierend → im Executor aufrufen)."""
+        with self._io_lock:
+            lines = []
+            while self._ring:
+                lines.append(json.dumps(self._ring.popleft(), separators=(",", ":")))
+            if not lines:
+                return 0
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._rotate_if_needed()
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write("\n".join(lines) + "\n")
+            self.written += len(lines)
+            return len(lines)
+
+    def _rotate_if_needed(self) -> None:
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except OSError:
+            return
+        for i in range(self.backups, 0, -1):
+            src = self.path if i == 1 else f"{self.path}.{i - 1}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{i}")
+
+    def as_dict(self) -> dict:
+        return {"enabled": self.enabled, "path": self.path, "written": self.written,
+                "dropped": self.dropped, "buffered": len(self._ring)}
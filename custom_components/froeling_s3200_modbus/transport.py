@@ -0,0 +1,815 @@
+"""Gemeinsamer Modbus-Zugriff pro Config-Entry (Client, Lock, Messwerte)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import struct
+from collections import Counter, deque
+from time import monotonic, perf_counter
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException
+
+from .readplan import COIL, DISCRETE, HOLDING, INPUT, MAX_GAP, ReadBlock, compile_plan, halve
+from .writebudget import SUPPRESS_EQUAL
+
+_LOGGER = logging.getLogger(__name__)
+
+# Frame-Overhead je Framer: (Anfrage, Antwort-Kopf)
+# Modbus-TCP: MBAP (7) + FC (1) + Adresse (2) + Anzahl/Wert (2) / MBAP + FC + Byte-Count
+# RTU über TCP: Unit (1) + FC (1) + 4 + CRC (2) / Unit + FC + Byte-Count + CRC
+_FRAME_BYTES = {"socket": (12, 9), "rtu": (8, 5)}
+
+# RTU: Mindestpause zwischen zwei Frames. 3,5 Zeichen wären bei 9600 Baud ~4 ms;
+# günstige RS485-Wandler brauchen nach der Antwort spürbar länger
+RTU_INTER_FRAME_DELAY = 0.02
+
+# Sammel-Warnung für Fehler höchstens alle 5 Minuten je Fehlerklasse
+ERROR_LOG_INTERVAL = 300.0
+
+# Circuit-Breaker: nach N Verbindungsfehlern in Folge nur noch ein Probe-Read
+BREAKER_THRESHOLD = 5
+BREAKER_BACKOFF_MIN = 30.0
+BREAKER_BACKOFF_MAX = 600.0
+PROBE_REGISTER = 34001  # Anlagenzustand (Input)
+
+# Adaptive Timeouts: Vielfaches des p99 der erfolgreichen Antwortzeiten, begrenzt
+# nach unten/oben. Bis genug Messwerte vorliegen, gilt der bisherige feste Wert.
+TIMEOUT_DEFAULT = 3.0
+TIMEOUT_FLOOR = 0.5
+TIMEOUT_CEILING = 10.0
+TIMEOUT_P99_FACTOR = 4.0
+TIMEOUT_MIN_SAMPLES = 20
+TIMEOUT_WINDOW = 512
+TIMEOUT_UPDATE_EVERY = 16
+# nach einem Timeout: Timeout vergrößern (langsame Strecke, p99 noch unbekannt)
+TIMEOUT_BACKOFF = 1.5
+
+# Wiederholungen (der pymodbus-Client selbst wiederholt nicht, retries=0):
+# Reads bis zu 2×, Pause 50 ms · 2^Versuch ±50 %, damit mehrere Entries am
+# selben Gateway nicht im Gleichtakt wiederholen
+READ_RETRIES = 2
+RETRY_BACKOFF = 0.05
+RETRY_BACKOFF_MAX = 1.0
+RETRY_JITTER = 0.5
+# Writes nur, wenn die Anfrage das Gerät nachweislich nicht erreicht hat; sonst
+# wird zurückgelesen und nur bei abweichendem Wert erneut geschrieben
+WRITE_RETRIES = 1
+# gescheiterter Block-Read: statt den ganzen Block zu wiederholen, Hälften lesen
+# (höchstens so viele Teilungsstufen)
+BLOCK_SPLIT_DEPTH = 2
+
+
+# ---------- Fehlerklassen ----------
+ERR_TIMEOUT = "timeout"
+ERR_CONNECTION = "connection_refused"
+ERR_MODBUS_EXCEPTION = "modbus_exception"
+ERR_ILLEGAL_ADDRESS = "illegal_address"
+ERR_DECODE = "decode"
+ERROR_CLASSES = (ERR_TIMEOUT, ERR_CONNECTION, ERR_MODBUS_EXCEPTION, ERR_ILLEGAL_ADDRESS, ERR_DECODE)
+# kein Fehler des Geräts: Aufruf wurde wegen offenem Circuit-Breaker gar nicht gesendet
+ERR_CIRCUIT_OPEN = "circuit_open"
+# Write vom Schreib-Budget abgelehnt (kein Modbus-Fehler, kein Request)
+ERR_WRITE_BUDGET = "write_budget"
+# Fehlerklassen, die auf ein nicht erreichbares Gerät hindeuten
+_UNREACHABLE = (ERR_TIMEOUT, ERR_CONNECTION)
+
+# Modbus-Exception-Codes 0x02 (Illegal Data Address) → eigene Klasse
+_EXC_ILLEGAL_ADDRESS = 2
+_EXC_ILLEGAL_VALUE = 3
+# 0x06 (Slave Device Busy): Anfrage nicht ausgeführt, Wiederholung unbedenklich
+_EXC_DEVICE_BUSY = 6
+# detail für „keine Verbindung, nichts gesendet“
+_NOT_SENT = "not_sent"
+_RETRY_KINDS = (ERR_TIMEOUT, ERR_CONNECTION, ERR_DECODE)
+
+
+class ModbusFailure(str):
+    """Fehlerergebnis eines Modbus-Aufrufs; als String z. B. "modbus_exception(4)"."""
+
+    def __new__(cls, kind: str, code: int | None = None, detail: str | None = None):
+        text = kind if code is None else f"{kind}({code})"
+        obj = super().__new__(cls, text)
+        obj.kind = kind
+        obj.code = code
+        obj.detail = detail
+        return obj
+
+
+def _check_response(res):
+    if hasattr(res, "isError") and res.isError():
+        code = getattr(res, "exception_code", None)
+        if code == _EXC_ILLEGAL_ADDRESS:
+            return None, ModbusFailure(ERR_ILLEGAL_ADDRESS, code)
+        if code is None:
+            # pymodbus liefert bei fehlender Antwort teils ein Fehlerobjekt statt Exception
+            return None, ModbusFailure(ERR_TIMEOUT, detail=str(res))
+        return None, ModbusFailure(ERR_MODBUS_EXCEPTION, code)
+    return res, None
+
+
+def _classify_exception(e: Exception) -> ModbusFailure:
+    if isinstance(e, (ConnectionException, ConnectionError)):
+        return ModbusFailure(ERR_CONNECTION, detail=str(e))
+    if isinstance(e, (ModbusIOException, TimeoutError)):
+        return ModbusFailure(ERR_TIMEOUT, detail=str(e))
+    if isinstance(e, (ValueError, IndexError, struct.error)):
+        return ModbusFailure(ERR_DECODE, detail=str(e))
+    return ModbusFailure(ERR_TIMEOUT, detail=f"{type(e).__name__}: {e}")
+
+
+# --- HELPER: Modbus Calls (FC04/FC03/FC01/FC02 lesen, FC06/FC16 schreiben) ---
+def _call_sync(client, method: str, unit_id: int, *args, **kwargs):
+    """Aufruf mit device_id (pymodbus >= 3.10), Fallback auf unit bzw. client.unit_id."""
+    if not client.connect():
+        return None, ModbusFailure(ERR_CONNECTION, detail=_NOT_SENT)
+    func = getattr(client, method)
+    # 1) Bevorzugt: device_id
+    try:
+        return _check_response(func(*args, device_id=unit_id, **kwargs))
+    except TypeError:
+        pass
+    except Exception as e:
+        return None, _classify_exception(e)
+    # 2) Fallback: unit
+    try:
+        return _check_response(func(*args, unit=unit_id, **kwargs))
+    except TypeError:
+        pass
+    except Exception as e:
+        return None, _classify_exception(e)
+    # 3) Fallback: unit_id am Client
+    try:
+        client.unit_id = unit_id
+        return _check_response(func(*args, **kwargs))
+    except Exception as e:
+        return None, _classify_exception(e)
+
+def read_input_sync(client, unit_id: int, addr: int, count: int):
+    """FC=04: Input Registers (3xxxx); auch für die Erkennung im Config-Flow."""
+    return _call_sync(client, "read_input_registers", unit_id, addr, count=count)
+
+def _read_holding_sync(client, unit_id: int, addr: int, count: int):
+    return _call_sync(client, "read_holding_registers", unit_id, addr, count=count)
+
+def _read_coils_sync(client, unit_id: int, addr: int, count: int):
+    """FC=01: Coils. addr wird so verwendet, wie übergeben (kein Offset-Abzug!)."""
+    return _call_sync(client, "read_coils", unit_id, addr, count=count)
+
+def _read_discrete_sync(client, unit_id: int, addr: int, count: int):
+    """FC=02: Discrete Inputs (1xxxx). addr ist 0-basiert (10001 -> 0)."""
+    return _call_sync(client, "read_discrete_inputs", unit_id, addr, count=count)
+
+def _write_register_sync(client, unit_id: int, addr: int, value: int):
+    """FC=06: Write Single Holding Register (4xxxx)."""
+    return _call_sync(client, "write_register", unit_id, addr, value)
+
+def _write_registers_sync(client, unit_id: int, addr: int, values: list[int]):
+    """FC=16: Write Multiple Holding Registers (zusammenhängender Bereich ab addr)."""
+    return _call_sync(client, "write_registers", unit_id, addr, values)
+# --- ENDE HELPER ---
+
+
+def _retryable(err) -> bool:
+    return err.kind in _RETRY_KINDS or err.code == _EXC_DEVICE_BUSY
+
+
+def _not_delivered(err) -> bool:
+    """Write hat das Gerät nachweislich nicht erreicht bzw. wurde nicht ausgeführt."""
+    return err.detail == _NOT_SENT or err.code == _EXC_DEVICE_BUSY
+
+
+def write_suppressed(err) -> bool:
+    """Write nicht gesendet, weil das Gerät den Wert schon hat (Schreib-Budget) – kein Fehler."""
+    return err is not None and err.kind == ERR_WRITE_BUDGET and err.detail == SUPPRESS_EQUAL
+
+
+def _short_circuited(err) -> bool:
+    """Vom offenen Breaker abgewiesen, nichts gesendet: kein Fehler und kein Signal für den Breaker."""
+    return err is not None and err.kind == ERR_CIRCUIT_OPEN
+
+
+def _backoff(attempt: int) -> float:
+    delay = min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** attempt)
+    return delay * random.uniform(1.0 - RETRY_JITTER, 1.0 + RETRY_JITTER)
+
+# Tabelle → (Sync-Read, Basis der Registernummer, Antwortfeld)
+_READERS = {
+    INPUT: (read_input_sync, 30001, "registers"),
+    HOLDING: (_read_holding_sync, 40001, "registers"),
+    COIL: (_read_coils_sync, 0, "bits"),
+    DISCRETE: (_read_discrete_sync, 10001, "bits"),
+}
+
+
+def _payload_bytes(table: str, count: int) -> int:
+    return (count + 7) // 8 if table in (COIL, DISCRETE) else 2 * count
+
+
+class _CachedResult:
+    """Antwort aus dem Zyklus-Cache; verhält sich wie eine pymodbus-Antwort."""
+
+    def __init__(self, table: str, values: list):
+        self.registers = [] if table in (COIL, DISCRETE) else values
+        self.bits = values if table in (COIL, DISCRETE) else []
+
+    def isError(self) -> bool:
+        return False
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Perzentil (pct in %) einer sortierten Liste, nächster Rang; None bei leerer Liste."""
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class TransportStats:
+    """Laufzeit-Messwerte eines Transports (Zyklus, Lock-Wartezeit, RTT, Bytes)."""
+
+    def __init__(self, window: int = 256):
+        self._rtt = deque(maxlen=window)
+        self.requests_total = 0
+        self.bytes_total = 0
+        self._cycle_start: float | None = None
+        self._cycle_requests = 0
+        self._cycle_bytes = 0
+        self._cycle_wait_sum = 0.0
+        self._cycle_wait_max = 0.0
+        self._cycle_cache_hits = 0
+        # Werte des letzten abgeschlossenen Zyklus
+        self.cycle_duration_ms: float | None = None
+        self.cycle_requests: int | None = None
+        self.cycle_bytes: int | None = None
+        self.lock_wait_avg_ms: float | None = None
+        self.lock_wait_max_ms: float | None = None
+        self.rtt_p50_ms: float | None = None
+        self.rtt_p95_ms: float | None = None
+        self.cycle_cache_hits: int | None = None
+        # Fehlerzähler (gesamt je Klasse / je Register) und Zyklus-Fehler
+        self.errors_by_class: Counter = Counter()
+        self.errors_by_register: dict[int, Counter] = {}
+        self._cycle_errors: Counter = Counter()
+        self._cycle_error_registers: dict[str, list[int]] = {}
+        self.cycle_errors: int | None = None
+        self.cycle_errors_by_class: Counter = Counter()
+        self.cycle_error_registers: dict[str, list[int]] = {}
+        # Wiederholungen: read, write, write_confirmed (per Read-back bestätigt), block_split
+        self.retries: Counter = Counter()
+
+    def record(self, wait: float, rtt: float, nbytes: int) -> None:
+        """Jeder gesendete Request (auch Wiederholungen): Zeiten und Bytes."""
+        self._rtt.append(rtt)
+        self.requests_total += 1
+        self.bytes_total += nbytes
+        self._cycle_requests += 1
+        self._cycle_bytes += nbytes
+        self._cycle_wait_sum += wait
+        if wait > self._cycle_wait_max:
+            self._cycle_wait_max = wait
+
+    def record_error(self, err, register: int | None = None) -> None:
+        """Fehlgeschlagene Anfrage – nur das Endergebnis, Wiederholungen zählt record_retry."""
+        kind = getattr(err, "kind", ERR_MODBUS_EXCEPTION)
+        self.errors_by_class[kind] += 1
+        self._cycle_errors[kind] += 1
+        if register is not None:
+            self.errors_by_register.setdefault(register, Counter())[kind] += 1
+            self._cycle_error_registers.setdefault(kind, []).append(register)
+
+    def record_retry(self, kind: str) -> None:
+        self.retries[kind] += 1
+
+    def record_cache_hit(self) -> None:
+        self._cycle_cache_hits += 1
+
+    def start_cycle(self) -> None:
+        self._cycle_start = perf_counter()
+        self._cycle_cache_hits = 0
+        self._cycle_requests = 0
+        self._cycle_bytes = 0
+        self._cycle_wait_sum = 0.0
+        self._cycle_wait_max = 0.0
+        self._cycle_errors = Counter()
+        self._cycle_error_registers = {}
+
+    def end_cycle(self) -> None:
+        if self._cycle_start is None:
+            return
+        self.cycle_duration_ms = round((perf_counter() - self._cycle_start) * 1000.0, 1)
+        self._cycle_start = None
+        self.cycle_requests = self._cycle_requests
+        self.cycle_bytes = self._cycle_bytes
+        self.cycle_cache_hits = self._cycle_cache_hits
+        self.cycle_errors = sum(self._cycle_errors.values())
+        self.cycle_errors_by_class = self._cycle_errors
+        self.cycle_error_registers = self._cycle_error_registers
+        if self._cycle_requests:
+            self.lock_wait_avg_ms = round(self._cycle_wait_sum / self._cycle_requests * 1000.0, 1)
+        else:
+            self.lock_wait_avg_ms = 0.0
+        self.lock_wait_max_ms = round(self._cycle_wait_max * 1000.0, 1)
+        rtts = sorted(self._rtt)
+        p50 = percentile(rtts, 50)
+        p95 = percentile(rtts, 95)
+        self.rtt_p50_ms = round(p50 * 1000.0, 1) if p50 is not None else None
+        self.rtt_p95_ms = round(p95 * 1000.0, 1) if p95 is not None else None
+
+    def as_dict(self) -> dict:
+        return {
+            "cycle_duration_ms": self.cycle_duration_ms,
+            "cycle_requests": self.cycle_requests,
+            "cycle_bytes": self.cycle_bytes,
+            "cycle_cache_hits": self.cycle_cache_hits,
+            "lock_wait_avg_ms": self.lock_wait_avg_ms,
+            "lock_wait_max_ms": self.lock_wait_max_ms,
+            "rtt_p50_ms": self.rtt_p50_ms,
+            "rtt_p95_ms": self.rtt_p95_ms,
+            "requests_total": self.requests_total,
+            "bytes_total": self.bytes_total,
+            "cycle_errors": self.cycle_errors,
+        }
+
+    def error_attributes(self, top: int = 20) -> dict:
+        """Fehlerzähler für extra_state_attributes (gesamt, letzter Zyklus, Top-Register)."""
+        worst = sorted(
+            self.errors_by_register.items(), key=lambda kv: sum(kv[1].values()), reverse=True
+        )[:top]
+        return {
+            "errors_total": {k: self.errors_by_class.get(k, 0) for k in ERROR_CLASSES},
+            "errors_last_cycle": {k: self.cycle_errors_by_class.get(k, 0) for k in ERROR_CLASSES},
+            "errors_by_register": {str(reg): dict(c) for reg, c in worst},
+            "retries_total": dict(self.retries),
+        }
+
+
+class AdaptiveTimeout:
+    """Request-Timeout aus einem rollierenden Fenster erfolgreicher Antwortzeiten."""
+
+    def __init__(self, default: float = TIMEOUT_DEFAULT, floor: float = TIMEOUT_FLOOR,
+                 ceiling: float = TIMEOUT_CEILING, factor: float = TIMEOUT_P99_FACTOR,
+                 window: int = TIMEOUT_WINDOW):
+        self.floor = floor
+        self.ceiling = ceiling
+        self.factor = factor
+        self.timeout = default
+        self.rtt_p99: float | None = None
+        self.timeouts = 0
+        self._rtts = deque(maxlen=window)
+        self._pending = 0
+        self._escalated = False
+
+    def record(self, rtt: float) -> None:
+        self._escalated = False
+        self._rtts.append(rtt)
+        self._pending += 1
+        if len(self._rtts) >= TIMEOUT_MIN_SAMPLES and self._pending >= TIMEOUT_UPDATE_EVERY:
+            self._pending = 0
+            self.rtt_p99 = percentile(sorted(self._rtts), 99)
+            self.timeout = min(self.ceiling, max(self.floor, self.rtt_p99 * self.factor))
+
+    def record_timeout(self) -> None:
+        """Timeout ohne Antwort: Strecke womöglich langsamer als gemessen → großzügiger.
+
+        Nur einmal je Serie: weitere Timeouts ohne Antwort dazwischen deuten auf ein
+        unerreichbares Gerät, ein längeres Warten würde jeden Versuch nur verlängern.
+        """
+        self.timeouts += 1
+        if self._escalated:
+            return
+        self._escalated = True
+        self.timeout = min(self.ceiling, self.timeout * TIMEOUT_BACKOFF)
+
+    @property
+    def timeout_ms(self) -> float:
+        return round(self.timeout * 1000.0, 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "rtt_p99_ms": round(self.rtt_p99 * 1000.0, 1) if self.rtt_p99 is not None else None,
+            "samples": len(self._rtts),
+            "timeouts": self.timeouts,
+            "floor_ms": self.floor * 1000.0,
+            "ceiling_ms": self.ceiling * 1000.0,
+            "p99_factor": self.factor,
+        }
+
+
+def _set_client_timeout(client, timeout: float) -> None:
+    """Antwort-Timeout des pymodbus-Clients setzen (comm_params von Client und Transaktion)."""
+    for holder in (client, getattr(client, "transaction", None)):
+        params = getattr(holder, "comm_params", None)
+        if params is not None and hasattr(params, "timeout_connect"):
+            params.timeout_connect = timeout
+
+
+class CircuitBreaker:
+    """Zählt Verbindungsfehler in Folge und gibt im offenen Zustand nur Probes frei."""
+
+    def __init__(self, threshold: int = BREAKER_THRESHOLD,
+                 backoff_min: float = BREAKER_BACKOFF_MIN, backoff_max: float = BREAKER_BACKOFF_MAX):
+        self.threshold = threshold
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self.failures = 0
+        self.is_open = False
+        self.opened_at: float | None = None
+        self._backoff = backoff_min
+        self._next_probe = 0.0
+
+    def record_success(self) -> bool:
+        """True, wenn der Breaker dadurch geschlossen wurde."""
+        self.failures = 0
+        if not self.is_open:
+            return False
+        self.is_open = False
+        self.opened_at = None
+        self._backoff = self.backoff_min
+        return True
+
+    def record_failure(self) -> bool:
+        """True, wenn der Breaker dadurch geöffnet wurde."""
+        self.failures += 1
+        now = monotonic()
+        if self.is_open:
+            # fehlgeschlagene Probe → Wartezeit verdoppeln
+            self._backoff = min(self._backoff * 2, self.backoff_max)
+            self._next_probe = now + self._backoff
+            return False
+        if self.failures < self.threshold:
+            return False
+        self.is_open = True
+        self.opened_at = now
+        self._next_probe = now + self._backoff
+        return True
+
+    def probe_due(self) -> bool:
+        return self.is_open and monotonic() >= self._next_probe
+
+    def as_dict(self) -> dict:
+        return {
+            "state": "open" if self.is_open else "closed",
+            "consecutive_failures": self.failures,
+            "backoff_s": self._backoff if self.is_open else None,
+        }
+
+
+class FroelingTransport:
+    """Serialisiert alle Modbus-Aufrufe einer Entry über einen Lock und misst sie."""
+
+    def __init__(self, hass, client, tracer=None, framer: str = "socket"):
+        self._hass = hass
+        self.client = client
+        self.framer = framer
+        self.lock = asyncio.Lock()
+        self.stats = TransportStats()
+        self._last_error_log: dict[str, float] = {}
+        self._suppressed_errors: Counter = Counter()
+        self._suppressed_registers: dict[str, list[int]] = {}
+        self.breaker = CircuitBreaker()
+        self.timeouts = AdaptiveTimeout()
+        self._client_timeout: float | None = None
+        # nach close(): keine Anfragen und kein erneuter Verbindungsaufbau mehr
+        self._closed = False
+        self.tracer = tracer  # FrameTracer, optional
+        self._availability_listeners: list = []
+        self._req_bytes, self._resp_header_bytes = _FRAME_BYTES.get(framer, _FRAME_BYTES["socket"])
+        self._inter_frame_delay = RTU_INTER_FRAME_DELAY if framer == "rtu" else 0.0
+        self._last_frame_end = 0.0
+        # Block-Reads: Reads des letzten Zyklus lernen, im nächsten gebündelt vorab lesen
+        self._max_gap = MAX_GAP.get(framer, MAX_GAP["socket"])
+        self._cycle_cache: dict | None = None
+        self._cycle_reads: set = set()
+        self._learned: frozenset = frozenset()
+        self._bad_blocks: set[ReadBlock] = set()
+        self._plan: list[ReadBlock] | None = None
+        # (Tabelle, Adresse) → Callbacks für gelesene Werte (abgeleitete Größen, Trigger)
+        self._value_listeners: dict[tuple[str, int], list] = {}
+        # WriteBudget, optional: alle Holding-Writes werden davor geprüft
+        self.write_budget = None
+
+    @property
+    def available(self) -> bool:
+        return not self.breaker.is_open
+
+    def add_availability_listener(self, listener) -> None:
+        """Callback bei Wechsel erreichbar/nicht erreichbar (nur im Event-Loop aufrufen)."""
+        self._availability_listeners.append(listener)
+
+    def add_value_listener(self, table: str, addr: int, listener) -> None:
+        """listener(addr, value) für jeden erfolgreich gelesenen Wert dieser Adresse.
+
+        Greift auch bei Treffern aus dem Zyklus-Cache – Beobachter brauchen also keine
+        eigenen Reads, solange eine Entity das Register liest.
+        """
+        self._value_listeners.setdefault((table, addr), []).append(listener)
+
+    def _notify_values(self, table: str, addr: int, values) -> None:
+        for offset, value in enumerate(values):
+            for listener in self._value_listeners.get((table, addr + offset), ()):
+                listener(addr + offset, value)
+
+    def _notify_availability(self) -> None:
+        for listener in list(self._availability_listeners):
+            listener()
+
+    def _update_breaker(self, err) -> None:
+        if err is not None and getattr(err, "kind", None) in _UNREACHABLE:
+            if self.breaker.record_failure():
+                _LOGGER.warning(
+                    "Froeling controller unreachable after %d failures in a row; pausing requests, probing register %s",
+                    self.breaker.failures, PROBE_REGISTER,
+                )
+                self._notify_availability()
+        elif self.breaker.record_success():
+            _LOGGER.warning("Froeling controller reachable again, resuming requests")
+            self._notify_availability()
+
+    def _apply_timeout(self, limit: float | None) -> None:
+        """Adaptiven Timeout (ggf. durch ein Restbudget begrenzt) am Client setzen; nur unter dem Lock."""
+        timeout = self.timeouts.timeout
+        if limit is not None:
+            timeout = max(TIMEOUT_FLOOR, min(timeout, limit))
+        if timeout != self._client_timeout:
+            _set_client_timeout(self.client, timeout)
+            self._client_timeout = timeout
+
+    async def _async_call(self, func, unit_id: int, addr: int, count: int, resp_payload: int,
+                          reg_base: int, expect: str | None = None, probe: bool = False,
+                          timeout: float | None = None, final: bool = True):
+        t_queued = perf_counter()
+        async with self.lock:
+            if self._closed:
+                return None, ModbusFailure(ERR_CONNECTION, detail=_NOT_SENT)
+            if self.breaker.is_open and not probe:
+                return None, ModbusFailure(ERR_CIRCUIT_OPEN)
+            if self._inter_frame_delay:
+                pause = self._last_frame_end + self._inter_frame_delay - perf_counter()
+                if pause > 0:
+                    await asyncio.sleep(pause)
+            self._apply_timeout(timeout)
+            t_locked = perf_counter()
+            res, err = await self._hass.async_add_executor_job(func, self.client, unit_id, addr, count)
+            t_done = self._last_frame_end = perf_counter()
+        if err is None:
+            self.timeouts.record(t_done - t_locked)
+        elif err.kind == ERR_TIMEOUT and timeout is None:
+            self.timeouts.record_timeout()
+        if err is None and expect is not None and len(getattr(res, expect, None) or ()) < count:
+            res, err = None, ModbusFailure(ERR_DECODE, detail=f"{expect} fehlen")
+        nbytes = self._req_bytes + (self._resp_header_bytes + resp_payload if err is None else 0)
+        self.stats.record(t_locked - t_queued, t_done - t_locked, nbytes)
+        if final:
+            self._finish(err, reg_base + addr)
+        return res, err
+
+    def _finish(self, err, register: int) -> None:
+        """Endergebnis einer gesendeten Anfrage (nach allen Wiederholungen): Fehlerzähler und Breaker."""
+        if err is not None:
+            self.stats.record_error(err, register)
+        self._update_breaker(err)
+
+    async def _async_call_retrying(self, func, unit_id: int, addr: int, count: int, resp_payload: int,
+                                   reg_base: int, expect: str | None = None, retries: int = READ_RETRIES):
+        """Read mit Wiederholung bei Timeout/Verbindungs-/Dekodierfehler (gejitterter Backoff).
+
+        Fehlerzähler und Breaker sehen das Endergebnis, nicht jeden Versuch.
+        """
+        attempt = 0
+        while True:
+            res, err = await self._async_call(
+                func, unit_id, addr, count, resp_payload, reg_base, expect, final=False
+            )
+            if err is None or attempt >= retries or not _retryable(err):
+                break
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+            self.stats.record_retry("read")
+        if _short_circuited(err):
+            return res, err
+        self._finish(err, reg_base + addr)
+        return res, err
+
+    async def async_connect(self) -> bool:
+        """TCP-Verbindung im Executor aufbauen (blockiert den Event-Loop nicht); True bei Erfolg."""
+        async with self.lock:
+            if self._closed:
+                return False
+            try:
+                return bool(await self._hass.async_add_executor_job(self.client.connect))
+            except Exception as e:
+                _LOGGER.debug("Verbindungsaufbau fehlgeschlagen: %s", e)
+                return False
+
+    async def async_probe(self, unit_id: int) -> bool:
+        """Ein günstiger Read (34001) bei offenem Breaker; True, wenn das Gerät antwortet."""
+        res, err = await self._async_call(
+            read_input_sync, unit_id, PROBE_REGISTER - 30001, 1, 2, 30001, "registers", probe=True
+        )
+        return err is None
+
+    async def _async_read(self, table: str, unit_id: int, addr: int, count: int):
+        cache = self._cycle_cache
+        if cache is not None:
+            self._cycle_reads.add((table, addr, count))
+            values = [cache.get((table, a)) for a in range(addr, addr + count)]
+            if None not in values:
+                self.stats.record_cache_hit()
+                if table == HOLDING and self.write_budget is not None:
+                    self.write_budget.note_read(addr, values)
+                if self._value_listeners:
+                    self._notify_values(table, addr, values)
+                return _CachedResult(table, values), None
+        func, base, expect = _READERS[table]
+        res, err = await self._async_call_retrying(
+            func, unit_id, addr, count, _payload_bytes(table, count), base, expect
+        )
+        if err is None and table == HOLDING and self.write_budget is not None:
+            self.write_budget.note_read(addr, res.registers[:count])
+        if err is None and self._value_listeners:
+            self._notify_values(table, addr, getattr(res, expect)[:count])
+        return res, err
+
+    async def async_read_input(self, unit_id: int, addr: int, count: int = 1):
+        return await self._async_read(INPUT, unit_id, addr, count)
+
+    async def async_read_holding(self, unit_id: int, addr: int, count: int = 1):
+        return await self._async_read(HOLDING, unit_id, addr, count)
+
+    async def async_read_coils(self, unit_id: int, addr: int, count: int = 1):
+        return await self._async_read(COIL, unit_id, addr, count)
+
+    async def async_read_discrete(self, unit_id: int, addr: int, count: int = 1):
+        return await self._async_read(DISCRETE, unit_id, addr, count)
+
+    async def async_write_register(self, unit_id: int, addr: int, value: int, budget: bool = True):
+        return await self._async_write(unit_id, addr, [value], budget)
+
+    async def async_write_registers(self, unit_id: int, addr: int, values: list[int], budget: bool = True):
+        """FC16 für einen zusammenhängenden Bereich (ein Request statt len(values) FC06)."""
+        return await self._async_write(unit_id, addr, list(values), budget)
+
+    async def _async_write(self, unit_id: int, addr: int, values: list[int], budget: bool):
+        """FC06 (ein Wert) bzw. FC16; vorher Schreib-Budget prüfen, danach verbuchen."""
+        if budget and self.write_budget is not None:
+            decision = self.write_budget.check(addr, values)
+            if decision == SUPPRESS_EQUAL:
+                _LOGGER.debug("Write auf %s unterdrückt, Wert unverändert", 40001 + addr)
+                return None, ModbusFailure(ERR_WRITE_BUDGET, detail=SUPPRESS_EQUAL)
+            if decision is not None:
+                _LOGGER.warning(
+                    "Write auf %s abgelehnt: Schreib-Budget erschöpft (%s)", 40001 + addr, decision
+                )
+                return None, ModbusFailure(ERR_WRITE_BUDGET, detail=decision)
+        if self._cycle_cache is not None:
+            for a in range(addr, addr + len(values)):
+                self._cycle_cache.pop((HOLDING, a), None)
+        # FC06-Antwort ist ein Echo der Anfrage, FC16-Antwort Startadresse + Anzahl (kein Byte-Count)
+        if len(values) == 1:
+            func, arg = _write_register_sync, values[0]
+        else:
+            func, arg = _write_registers_sync, values
+        attempt = 0
+        while True:
+            res, err = await self._async_call(func, unit_id, addr, arg, 3, 40001, final=False)
+            if err is None:
+                break
+            if _not_delivered(err):
+                retry = attempt < WRITE_RETRIES
+            elif err.kind in _RETRY_KINDS:
+                # Antwort fehlt: Write evtl. ausgeführt → zurücklesen statt blind wiederholen
+                readback, rb_err = await self._async_read_back(unit_id, addr, values)
+                if rb_err is None and readback.registers[:len(values)] == values:
+                    _LOGGER.debug("Write auf %s per Read-back bestätigt (%s)", 40001 + addr, err)
+                    self.stats.record_retry("write_confirmed")
+                    res, err = readback, None
+                    break
+                # abweichender Wert → nicht angekommen; Read-back gescheitert → ungewiss
+                retry = rb_err is None and attempt < WRITE_RETRIES
+            else:
+                retry = False
+            if not retry:
+                break
+            await asyncio.sleep(_backoff(attempt))
+            attempt += 1
+            self.stats.record_retry("write")
+        if _short_circuited(err):
+            return res, err
+        self._finish(err, 40001 + addr)
+        if err is None and budget and self.write_budget is not None:
+            self.write_budget.record_write(addr, values)
+        return res, err
+
+    async def _async_read_back(self, unit_id: int, addr: int, values: list[int]):
+        """Holding-Register nach einem Write ohne Antwort lesen (ohne Wiederholung)."""
+        return await self._async_call(
+            _read_holding_sync, unit_id, addr, len(values), _payload_bytes(HOLDING, len(values)), 40001,
+            "registers", final=False,
+        )
+
+    async def async_prefetch(self, unit_id: int, budget: float | None = None) -> None:
+        """Zu Zyklusbeginn die im letzten Zyklus gelesenen Register als Block-Reads laden.
+
+        Entities lesen danach aus dem Zyklus-Cache; was nicht im Cache liegt (neue
+        Register, gescheiterter Block), lesen sie wie bisher einzeln. Mit budget (s)
+        wartet jeder Block höchstens auf das Restbudget; ist es aufgebraucht, werden
+        die übrigen Blöcke nicht mehr gesendet.
+        """
+        cache = self._cycle_cache
+        if cache is None or not self._learned:
+            return
+        if self._plan is None:
+            self._plan = compile_plan(self._learned, self._max_gap, self._bad_blocks)
+        deadline = monotonic() + budget if budget is not None else None
+        # (Block, Teilungsstufe); gescheiterte Blöcke werden halbiert wieder vorn eingereiht
+        pending = [(block, 0) for block in self._plan]
+        while pending:
+            block, depth = pending.pop(0)
+            if block.count == 1:
+                continue  # Einzel-Read erledigt die Entity selbst
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    _LOGGER.debug("Block-Reads: Budget von %.1f s aufgebraucht, Rest einzeln", budget)
+                    return
+            func, base, expect = _READERS[block.table]
+            res, err = await self._async_call(
+                func, unit_id, block.addr, block.count, _payload_bytes(block.table, block.count), base, expect,
+                timeout=remaining, final=False,
+            )
+            if err is not None:
+                if err.kind == ERR_CIRCUIT_OPEN:
+                    return
+                illegal = err.kind == ERR_ILLEGAL_ADDRESS or err.code == _EXC_ILLEGAL_VALUE
+                if illegal:
+                    # Lücke im Registerbereich → Block ab dem nächsten Zyklus geteilt planen
+                    self._bad_blocks.add(block)
+                    self._plan = None
+                if (illegal or _retryable(err)) and depth < BLOCK_SPLIT_DEPTH:
+                    # Hälften gleich nachlesen statt den ganzen Block zu wiederholen – ein
+                    # einzelnes problematisches Register blockiert so nur noch seine Hälfte.
+                    # Als Wiederholung gezählt, nicht als Fehler; der Breaker sieht ihn trotzdem
+                    _LOGGER.debug("Block-Read %s fehlgeschlagen (%s), wird geteilt", block, err)
+                    self.stats.record_retry("block_split")
+                    self._update_breaker(err)
+                    addrs = {a for t, a0, n in self._learned if t == block.table for a in range(a0, a0 + n)}
+                    pending[:0] = [(half, depth + 1) for half in halve(block, addrs)]
+                    if not illegal:
+                        await asyncio.sleep(_backoff(depth))
+                else:
+                    self._finish(err, base + block.addr)
+                continue
+            self._finish(None, base + block.addr)
+            values = getattr(res, expect)
+            for i in range(block.count):
+                cache[(block.table, block.addr + i)] = values[i]
+
+    def start_cycle(self) -> None:
+        self.stats.start_cycle()
+        self._cycle_cache = {}
+        self._cycle_reads = set()
+
+    def end_cycle(self) -> None:
+        self.stats.end_cycle()
+        self._cycle_cache = None
+        if self._cycle_reads:
+            learned = frozenset(self._cycle_reads)
+            if learned != self._learned:
+                self._learned = learned
+                self._plan = None
+        self._log_cycle_errors()
+
+    def _log_cycle_errors(self) -> None:
+        """Eine Sammel-Warnung je Fehlerklasse statt einer Logzeile pro Entity."""
+        now = monotonic()
+        self._suppressed_errors.update(self.stats.cycle_errors_by_class)
+        for kind, regs in self.stats.cycle_error_registers.items():
+            seen = self._suppressed_registers.setdefault(kind, [])
+            seen.extend(r for r in dict.fromkeys(regs) if r not in seen)
+            del seen[11:]  # für die Meldung reichen 10 (+ „…“)
+        for kind, pending in list(self._suppressed_errors.items()):
+            last = self._last_error_log.get(kind)
+            if last is not None and now - last < ERROR_LOG_INTERVAL:
+                continue
+            regs = self._suppressed_registers.pop(kind, [])
+            _LOGGER.warning(
+                "%d Modbus requests failed with %s since last report, registers: %s",
+                pending, kind, ", ".join(str(r) for r in regs[:10]) + (" …" if len(regs) > 10 else ""),
+            )
+            self._last_error_log[kind] = now
+            del self._suppressed_errors[kind]
+
+    def close(self) -> None:
+        """Verbindung schließen; danach baut _call_sync keine neue Verbindung mehr auf."""
+        self._closed = True
+        try:
+            self.client.close()
+        except Exception:
+            pass
+
+    async def async_close(self) -> None:
+        """Wie close(), wartet aber eine laufende Anfrage ab (Lock), damit sie nicht neu verbindet."""
+        async with self.lock:
+            self.close()
@@ -0,0 +1,163 @@
+"""Schreib-Budget: schützt den Parameterspeicher der Steuerung vor zu vielen Writes.
+
+Alle Holding-Writes (FC06/FC16) laufen im Transport durch check():
+- Ist der quantisierte Rohwert gleich dem zuletzt bekannten Gerätewert (letzter
+  Write oder letzter Read, je nachdem was neuer ist), wird nicht geschrieben.
+- Je Register höchstens limit_hour Writes pro Stunde, je Entry höchstens
+  limit_day Writes pro 24 h (0 = unbegrenzt); darüber wird der Write abgelehnt.
+
+Sonderfall Modbus-Vorgaben 480xx (Sollwerte, Freigabe, Betriebsart): die
+Steuerung verwirft sie, wenn sie nicht regelmäßig mit demselben Wert neu
+geschrieben werden. Ein Neuschreiben des unveränderten Werts wird daher weder
+unterdrückt noch gegen die Budgets gezählt (der Keepalive schreibt ohnehin mit
+budget=False). Wertänderungen unterliegen wie alle anderen Writes den Grenzen.
+
+Zeitstempel und Zähler liegen in .storage und überleben Neustarts.
+"""
+from __future__ import annotations
+
+from collections import deque
+from time import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # s; zusätzlich beim Entladen
+
+DEFAULT_LIMIT_HOUR = 6    # je Register
+DEFAULT_LIMIT_DAY = 200   # je Entry
+
+# Ergebnis von check()
+ALLOW = None
+SUPPRESS_EQUAL = "unchanged"
+REJECT_REGISTER = "register_budget"
+REJECT_ENTRY = "entry_budget"
+
+_COUNTERS = ("writes", SUPPRESS_EQUAL, REJECT_REGISTER, REJECT_ENTRY)
+
+# Modbus-Vorgaben (4xxxx): Vorlauf-/Boiler-Sollwert 48001–48026, Freigabe
+# 48029–48046, Betriebsart 48047–48064 (HK01–HK18)
+OVERRIDE_RANGE = range(48001, 48065)
+
+
+def is_override(addr: int) -> bool:
+    """0-basierte Holding-Adresse liegt im Bereich der Modbus-Vorgaben."""
+    return addr + 40001 in OVERRIDE_RANGE
+
+
+class WriteBudget:
+    """Zuletzt bekannte Werte, Write-Zeitstempel und Zähler je Register (0-basierte Holding-Adresse)."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str,
+                 limit_hour: int = DEFAULT_LIMIT_HOUR, limit_day: int = DEFAULT_LIMIT_DAY):
+        self._store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}_writes")
+        self.limit_hour = limit_hour
+        self.limit_day = limit_day
+        # Adresse → (Rohwert, Zeitpunkt) des letzten Writes bzw. Reads
+        self._written: dict[int, tuple[int, float]] = {}
+        self._read: dict[int, tuple[int, float]] = {}
+        self._recent: dict[int, deque] = {}       # Write-Zeitpunkte der letzten Stunde je Register
+        self._recent_entry: deque = deque()       # Write-Zeitpunkte der letzten 24 h
+        self.counters: dict[int, dict[str, int]] = {}
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load()
+        if not stored:
+            return
+        self._written = {int(a): tuple(v) for a, v in stored.get("written", {}).items()}
+        self._recent = {int(a): deque(v) for a, v in stored.get("recent", {}).items()}
+        self._recent_entry = deque(stored.get("recent_entry", ()))
+        self.counters = {int(a): dict(v) for a, v in stored.get("counters", {}).items()}
+
+    def _data_to_save(self) -> dict:
+        return {
+            "written": {str(a): list(v) for a, v in self._written.items()},
+            "recent": {str(a): list(v) for a, v in self._recent.items() if v},
+            "recent_entry": list(self._recent_entry),
+            "counters": {str(a): v for a, v in self.counters.items()},
+        }
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._data_to_save())
+
+    def note_read(self, addr: int, values) -> None:
+        """Gelesene Holding-Werte (auch aus dem Zyklus-Cache) als bekannten Gerätewert merken."""
+        now = time()
+        for offset, raw in enumerate(values):
+            self._read[addr + offset] = (raw, now)
+
+    def _known(self, addr: int) -> int | None:
+        written, read = self._written.get(addr), self._read.get(addr)
+        if written is None or (read is not None and read[1] >= written[1]):
+            return read[0] if read is not None else None
+        return written[0]
+
+    def _count(self, addr: int, what: str) -> None:
+        counters = self.counters.setdefault(addr, dict.fromkeys(_COUNTERS, 0))
+        counters[what] = counters.get(what, 0) + 1
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def check(self, addr: int, values: list[int]):
+        """ALLOW, SUPPRESS_EQUAL oder ein REJECT_* für einen Write ab addr (vor dem Request)."""
+        now = time()
+        addrs = range(addr, addr + len(values))
+        if all(self._known(a) == v & 0xFFFF for a, v in zip(addrs, values)):
+            if all(is_override(a) for a in addrs):
+                return ALLOW  # Vorgabe auffrischen: nötig, zählt nicht gegen die Budgets
+            for a in addrs:
+                self._count(a, SUPPRESS_EQUAL)
+            return SUPPRESS_EQUAL
+        while self._recent_entry and now - self._recent_entry[0] >= 86400:
+            self._recent_entry.popleft()
+        if self.limit_day and len(self._recent_entry) + len(values) > self.limit_day:
+            for a in addrs:
+                self._count(a, REJECT_ENTRY)
+            return REJECT_ENTRY
+        for a in addrs:
+            recent = self._recent.get(a)
+            while recent and now - recent[0] >= 3600:
+                recent.popleft()
+            if self.limit_hour and recent is not None and len(recent) >= self.limit_hour:
+                for b in addrs:
+                    self._count(b, REJECT_REGISTER)
+                return REJECT_REGISTER
+        return ALLOW
+
+    def record_write(self, addr: int, values: list[int]) -> None:
+        """Erfolgreichen Write verbuchen (zählt gegen beide Budgets) und verzögert sichern."""
+        now = time()
+        for a, v in zip(range(addr, addr + len(values)), values):
+            refresh = is_override(a) and self._known(a) == v & 0xFFFF
+            self._written[a] = (v & 0xFFFF, now)
+            self._count(a, "writes")
+            if refresh:
+                continue  # unveränderte Vorgabe: nur gezählt
+            self._recent.setdefault(a, deque()).append(now)
+            self._recent_entry.append(now)
+
+    @property
+    def total(self) -> dict[str, int]:
+        """Summen über alle Register."""
+        return {what: sum(c.get(what, 0) for c in self.counters.values()) for what in _COUNTERS}
+
+    @property
+    def rejected_total(self) -> int:
+        total = self.total
+        return total[REJECT_REGISTER] + total[REJECT_ENTRY]
+
+    @property
+    def writes_24h(self) -> int:
+        now = time()
+        return sum(1 for t in self._recent_entry if now - t < 86400)
+
+    def as_dict(self) -> dict:
+        """Diagnose-Attribute: Grenzen, Summen und Zähler je Register (4xxxx)."""
+        return {
+            "limit_per_register_hour": self.limit_hour,
+            "limit_per_entry_day": self.limit_day,
+            **{f"total_{what}": n for what, n in self.total.items()},
+            "registers": {a + 40001: dict(c) for a, c in sorted(self.counters.items())},
+        }
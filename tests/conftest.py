@@ -0,0 +1,33 @@
+"""Tests ohne laufenden HA-Kern: das Paket wird direkt aus dem Repo importiert."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+class FakeStore:
+    """Ersatz für homeassistant.helpers.storage.Store (ohne hass, im Speicher)."""
+
+    def __init__(self, hass, version, key):
+        self.key = key
+        self.data = None
+        self.delayed = None
+
+    async def async_load(self):
+        return self.data
+
+    async def async_save(self, data):
+        self.data = data
+
+    def async_delay_save(self, data_func, delay=0):
+        self.delayed = data_func
+
+
+@pytest.fixture
+def fake_store(monkeypatch):
+    """Store im übergebenen Modul durch FakeStore ersetzen."""
+    def _patch(module):
+        monkeypatch.setattr(module, "Store", FakeStore)
+    return _patch
@@ -0,0 +1,73 @@
+import asyncio
+
+from custom_components.froeling_s3200_modbus import derived
+from custom_components.froeling_s3200_modbus.derived import REG_BRENNERSTARTS, DerivedCounters
+
+
+def _counters(fake_store) -> DerivedCounters:
+    fake_store(derived)
+    return DerivedCounters(None, "entry")
+
+
+def test_counter_increase_and_reset(fake_store):
+    counters = _counters(fake_store)
+    on_kg = counters._make_listener("kg")
+    for raw in (100, 100, 130, 5, 20):
+        on_kg(30081, raw)
+    # 100 → 130 (+30), Rücksetzen auf 5 (+5), 5 → 20 (+15)
+    assert counters._totals["kg"] == 50
+    assert counters.resets["kg"] == 1
+    assert counters.resets["starts"] == 0
+
+
+def test_first_value_only_sets_baseline(fake_store):
+    counters = _counters(fake_store)
+    counters.update("starts", 12345)
+    assert counters._totals["starts"] == 0
+    assert counters.resets["starts"] == 0
+
+
+def test_metrics_across_reset(fake_store, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(derived.time, "time", lambda: now[0])
+    counters = _counters(fake_store)
+    counters.update("starts", 500)
+    counters.async_cycle_done()
+    assert counters.values["brennerstarts_pro_tag"] is None  # weniger als 1 h Historie
+    now[0] += 7200
+    counters.update("starts", 510)
+    counters.update("starts", 2)  # Zähler ersetzt
+    counters.async_cycle_done()
+    # 10 + 2 Starts in 2 h → 144 pro Tag
+    assert counters.values["brennerstarts_pro_tag"] == 144.0
+    assert counters.attributes("brennerstarts_pro_tag")["counter_resets"] == {"starts": 1}
+
+
+def test_state_survives_reload(fake_store):
+    counters = _counters(fake_store)
+    counters.update("kwh", 10)
+    counters.update("kwh", 4)
+    asyncio.run(counters.async_save())
+    reloaded = DerivedCounters(None, "entry")
+    reloaded._store.data = counters._store.data
+    asyncio.run(reloaded.async_load())
+    reloaded.update("kwh", 1)
+    assert reloaded.resets["kwh"] == 2
+    assert reloaded._totals["kwh"] == 5
+
+
+def test_attach_registers_counter_listeners(fake_store):
+    counters = _counters(fake_store)
+    registered, cycle = {}, []
+
+    class _Transport:
+        def add_value_listener(self, table, addr, listener):
+            registered[(table, addr)] = listener
+
+    class _Poller:
+        def async_add_cycle_listener(self, listener):
+            cycle.append(listener)
+
+    counters.attach(_Transport(), _Poller())
+    assert ("input", REG_BRENNERSTARTS - 30001) in registered
+    assert cycle == [counters.async_cycle_done]
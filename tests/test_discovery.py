@@ -0,0 +1,61 @@
+from custom_components.froeling_s3200_modbus.discovery import (
+    INTERVAL_STEPS,
+    absent_groups,
+    recommend,
+    skip_absent,
+)
+
+
+def test_no_samples():
+    assert recommend([], {"kessel": True}) is None
+
+
+def test_fast_link_minimum_interval():
+    result = recommend([0.005] * 10, None)
+    assert result["requests_per_cycle"] == 6
+    assert result["update_interval"] == INTERVAL_STEPS[0]
+    assert result["highrate_interval"] == 1
+
+
+def test_requests_grow_with_modules():
+    caps = {"kessel": True, "austragung": True, "zirkulationspumpe": False, "hk03": True, "hk04": False}
+    result = recommend([0.2] * 10, caps)
+    # 6 + 2 × 2 feste Module + 1 Vorlagen-Instanz
+    assert result["requests_per_cycle"] == 11
+    assert result["cycle_s"] == 2.2
+    # 2,2 s Zyklus darf höchstens 20 % des Intervalls belegen → 15 s
+    assert result["update_interval"] == 15
+
+
+def test_p90_ignores_single_outlier():
+    result = recommend([0.01] * 19 + [2.0], None)
+    assert result["rtt_ms_p90"] == 10.0
+    assert result["rtt_ms_p50"] == 10.0
+
+
+def test_slow_link_capped():
+    result = recommend([2.0] * 5, None)
+    assert result["update_interval"] == 60
+    assert result["highrate_interval"] == 8
+    result = recommend([30.0] * 5, None)
+    assert result["update_interval"] == INTERVAL_STEPS[-1]
+    assert result["highrate_interval"] == 60
+
+
+def test_absent_groups_skipped():
+    cfg = {
+        "kessel": True, "hk01": True, "puffer01": False, "extra_groups": ["hk03", "hk04"],
+        "capabilities": {"kessel": False, "hk01": True, "puffer01": False, "hk03": False, "hk04": True},
+    }
+    # nur gewählte und ausdrücklich nicht gefundene Gruppen
+    assert absent_groups(cfg) == ["kessel", "hk03"]
+    skipped = skip_absent(cfg)
+    assert skipped["kessel"] is False and skipped["hk01"] is True
+    assert skipped["extra_groups"] == ["hk04"]
+    assert cfg["kessel"] is True  # Eingabe unverändert
+
+
+def test_no_capabilities_no_skip():
+    cfg = {"kessel": True, "extra_groups": ["hk03"]}
+    assert absent_groups(cfg) == []
+    assert skip_absent(cfg) is cfg
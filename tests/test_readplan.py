@@ -0,0 +1,58 @@
+from custom_components.froeling_s3200_modbus.readplan import (
+    COIL,
+    HOLDING,
+    INPUT,
+    MAX_REGISTERS,
+    ReadBlock,
+    compile_plan,
+    contiguous_runs,
+    halve,
+)
+
+
+def test_gap_bridged_up_to_max_gap():
+    reads = [(INPUT, 0, 2), (INPUT, 10, 1), (INPUT, 100, 1)]
+    assert compile_plan(reads, max_gap=8) == [ReadBlock(INPUT, 0, 11), ReadBlock(INPUT, 100, 1)]
+
+
+def test_tables_planned_separately():
+    reads = [(INPUT, 5, 1), (HOLDING, 5, 1), (COIL, 0, 1), (COIL, 200, 1)]
+    # Bits: Lücke wird mit 16 multipliziert
+    assert compile_plan(reads, max_gap=32) == [
+        ReadBlock(COIL, 0, 201), ReadBlock(HOLDING, 5, 1), ReadBlock(INPUT, 5, 1),
+    ]
+
+
+def test_block_limited_to_max_registers():
+    reads = [(INPUT, a, 1) for a in range(0, 200, 10)]
+    plan = compile_plan(reads, max_gap=32)
+    assert all(block.count <= MAX_REGISTERS for block in plan)
+    assert [b.addr for b in plan] == [0, 130]
+
+
+def test_bad_block_split_until_readable():
+    reads = [(INPUT, a, 1) for a in (0, 1, 10, 11)]
+    assert compile_plan(reads, max_gap=32) == [ReadBlock(INPUT, 0, 12)]
+    # Illegal Data Address für den ganzen Block → Hälften
+    bad = {ReadBlock(INPUT, 0, 12)}
+    assert compile_plan(reads, 32, bad) == [ReadBlock(INPUT, 0, 2), ReadBlock(INPUT, 10, 2)]
+    # auch eine Hälfte scheitert → Einzel-Reads
+    bad.add(ReadBlock(INPUT, 10, 2))
+    assert compile_plan(reads, 32, bad) == [
+        ReadBlock(INPUT, 0, 2), ReadBlock(INPUT, 10, 1), ReadBlock(INPUT, 11, 1),
+    ]
+
+
+def test_single_register_never_split():
+    bad = {ReadBlock(INPUT, 7, 1)}
+    assert compile_plan([(INPUT, 7, 1)], 32, bad) == [ReadBlock(INPUT, 7, 1)]
+
+
+def test_halve_drops_unused_edges():
+    block = ReadBlock(HOLDING, 0, 40)
+    assert halve(block, {2, 3, 20, 30, 99}) == [ReadBlock(HOLDING, 2, 2), ReadBlock(HOLDING, 20, 11)]
+    assert halve(block, {99}) == []
+
+
+def test_contiguous_runs():
+    assert contiguous_runs([1, 2, 3, 7, 9, 10]) == [[1, 2, 3], [7], [9, 10]]
@@ -0,0 +1,346 @@
+import asyncio
+
+import pytest
+from pymodbus.exceptions import ModbusIOException
+
+from custom_components.froeling_s3200_modbus import transport, writebudget
+from custom_components.froeling_s3200_modbus.transport import (
+    ERR_CIRCUIT_OPEN,
+    ERR_CONNECTION,
+    ERR_MODBUS_EXCEPTION,
+    ERR_TIMEOUT,
+    ERR_WRITE_BUDGET,
+    AdaptiveTimeout,
+    CircuitBreaker,
+    FroelingTransport,
+    write_suppressed,
+)
+from custom_components.froeling_s3200_modbus.writebudget import WriteBudget
+
+
+# ---------- CircuitBreaker ----------
+def test_breaker_opens_after_threshold(monkeypatch):
+    monkeypatch.setattr(transport, "monotonic", lambda: 100.0)
+    breaker = CircuitBreaker(threshold=3, backoff_min=30, backoff_max=600)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+    assert breaker.opened_at == 100.0
+    assert breaker.as_dict() == {"state": "open", "consecutive_failures": 3, "backoff_s": 30}
+
+
+def test_breaker_success_resets_count():
+    breaker = CircuitBreaker(threshold=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_breaker_probe_backoff_doubles_up_to_max(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(transport, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(threshold=1, backoff_min=30, backoff_max=100)
+    assert breaker.record_failure()
+    assert not breaker.probe_due()
+    now[0] = 30.0
+    assert breaker.probe_due()
+    # fehlgeschlagene Probes: 60 s, dann auf 100 s begrenzt
+    assert not breaker.record_failure()
+    assert not breaker.probe_due()
+    now[0] = 90.0
+    assert breaker.probe_due()
+    breaker.record_failure()
+    assert breaker.as_dict()["backoff_s"] == 100
+    now[0] = 189.0
+    assert not breaker.probe_due()
+    now[0] = 190.0
+    assert breaker.probe_due()
+
+
+def test_breaker_closes_on_success_and_resets_backoff(monkeypatch):
+    monkeypatch.setattr(transport, "monotonic", lambda: 0.0)
+    breaker = CircuitBreaker(threshold=1, backoff_min=30, backoff_max=600)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.as_dict() == {"state": "closed", "consecutive_failures": 0, "backoff_s": None}
+    breaker.record_failure()
+    assert breaker.as_dict()["backoff_s"] == 30
+
+
+# ---------- AdaptiveTimeout ----------
+def test_timeout_default_until_enough_samples():
+    timeouts = AdaptiveTimeout(default=3.0, floor=0.5, ceiling=10.0, factor=4.0)
+    for _ in range(transport.TIMEOUT_MIN_SAMPLES - 1):
+        timeouts.record(0.01)
+    assert timeouts.timeout == 3.0
+    timeouts.record(0.01)
+    assert timeouts.rtt_p99 == 0.01
+    assert timeouts.timeout == 0.5  # p99 × 4 unter dem Floor
+
+
+def test_timeout_follows_p99_within_bounds():
+    timeouts = AdaptiveTimeout(default=3.0, floor=0.5, ceiling=10.0, factor=4.0)
+    for _ in range(32):
+        timeouts.record(0.3)
+    assert timeouts.timeout == 1.2
+    for _ in range(transport.TIMEOUT_WINDOW):
+        timeouts.record(5.0)
+    assert timeouts.timeout == 10.0
+
+
+def test_timeout_recomputed_in_batches():
+    timeouts = AdaptiveTimeout(default=3.0, floor=0.1, ceiling=10.0, factor=4.0)
+    for _ in range(transport.TIMEOUT_MIN_SAMPLES):
+        timeouts.record(0.1)
+    assert timeouts.timeout == 0.4
+    for _ in range(transport.TIMEOUT_UPDATE_EVERY - 1):
+        timeouts.record(1.0)
+    assert timeouts.timeout == 0.4
+    timeouts.record(1.0)
+    assert timeouts.timeout == 4.0
+
+
+def test_timeout_backs_off_once_per_run_of_timeouts():
+    timeouts = AdaptiveTimeout(default=4.0, floor=0.5, ceiling=10.0, factor=4.0)
+    timeouts.record_timeout()
+    assert timeouts.timeout == 4.0 * transport.TIMEOUT_BACKOFF
+    for _ in range(5):
+        timeouts.record_timeout()  # Gerät weg: nicht weiter eskalieren
+    assert timeouts.timeout == 4.0 * transport.TIMEOUT_BACKOFF
+    assert timeouts.as_dict()["timeouts"] == 6
+    timeouts.record(0.05)  # Antwort beendet die Serie
+    timeouts.record_timeout()
+    assert timeouts.timeout == 4.0 * transport.TIMEOUT_BACKOFF ** 2
+    timeouts.record(0.05)
+    timeouts.record_timeout()
+    assert timeouts.timeout == 10.0
+
+
+# ---------- Write: Read-back und Wiederholung ----------
+class _Response:
+    def __init__(self, registers=None, exception_code=None):
+        self.registers = registers or []
+        self.exception_code = exception_code
+
+    def isError(self):
+        return self.exception_code is not None
+
+
+class _FakeClient:
+    """Holding-Register im Speicher; writes/reads: Ablauf je Request.
+
+    Write-Schritte: "ok", "lost" (ausgeführt, Antwort fehlt), "timeout" (nicht
+    ausgeführt), "not_sent" (keine Verbindung) oder ein Exception-Code.
+    Read-Schritte: "ok" oder "timeout".
+    """
+
+    def __init__(self, writes, reads=()):
+        self.regs = {}
+        self.writes = list(writes)
+        self.reads = list(reads)
+        self.sent_writes = 0
+        self.sent_reads = 0
+
+    def connect(self):
+        if self.writes and self.writes[0] == "not_sent":
+            self.writes.pop(0)
+            return False
+        return True
+
+    def write_register(self, addr, value, device_id=None):
+        self.sent_writes += 1
+        step = self.writes.pop(0)
+        if step in ("ok", "lost"):
+            self.regs[addr] = value
+        if step in ("lost", "timeout"):
+            raise ModbusIOException("no response")
+        if isinstance(step, int):
+            return _Response(exception_code=step)
+        return _Response([addr, value])
+
+    def read_holding_registers(self, addr, count=1, device_id=None):
+        self.sent_reads += 1
+        if self.reads.pop(0) == "timeout":
+            raise ModbusIOException("no response")
+        return _Response([self.regs.get(a, 0) for a in range(addr, addr + count)])
+
+
+class _FakeHass:
+    async def async_add_executor_job(self, func, *args):
+        return func(*args)
+
+
+def _write(monkeypatch, client, value=55):
+    monkeypatch.setattr(transport, "_backoff", lambda attempt: 0)
+    tr = FroelingTransport(_FakeHass(), client)
+    res, err = asyncio.run(tr.async_write_register(2, 100, value, budget=False))
+    return tr, res, err
+
+
+def test_write_ok(monkeypatch):
+    client = _FakeClient(["ok"])
+    tr, res, err = _write(monkeypatch, client)
+    assert err is None
+    assert (client.sent_writes, client.sent_reads) == (1, 0)
+
+
+def test_write_lost_response_confirmed_by_read_back(monkeypatch):
+    client = _FakeClient(["lost"], reads=["ok"])
+    tr, res, err = _write(monkeypatch, client)
+    assert err is None
+    assert res.registers == [55]
+    # nicht erneut geschrieben
+    assert (client.sent_writes, client.sent_reads) == (1, 1)
+    assert tr.stats.retries == {"write_confirmed": 1}
+    assert not tr.stats.errors_by_class
+
+
+def test_write_not_applied_retried_after_read_back(monkeypatch):
+    client = _FakeClient(["timeout", "ok"], reads=["ok"])
+    tr, res, err = _write(monkeypatch, client)
+    assert err is None
+    assert client.regs[100] == 55
+    assert (client.sent_writes, client.sent_reads) == (2, 1)
+    assert tr.stats.retries == {"write": 1}
+    assert not tr.stats.errors_by_class
+
+
+def test_write_uncertain_when_read_back_fails(monkeypatch):
+    client = _FakeClient(["timeout", "ok"], reads=["timeout"])
+    tr, res, err = _write(monkeypatch, client)
+    assert err.kind == ERR_TIMEOUT
+    # Ausgang ungewiss → keine blinde Wiederholung
+    assert (client.sent_writes, client.sent_reads) == (1, 1)
+    assert tr.stats.errors_by_class == {ERR_TIMEOUT: 1}
+    assert tr.stats.errors_by_register[40101] == {ERR_TIMEOUT: 1}
+
+
+def test_write_not_sent_retried_without_read_back(monkeypatch):
+    client = _FakeClient(["not_sent", "ok"])
+    tr, res, err = _write(monkeypatch, client)
+    assert err is None
+    assert (client.sent_writes, client.sent_reads) == (1, 0)
+    assert tr.stats.retries == {"write": 1}
+
+
+@pytest.mark.parametrize("code, sent, ok", [(6, 2, True), (3, 1, False)])
+def test_write_exception_codes(monkeypatch, code, sent, ok):
+    # 6 = Device Busy: nicht ausgeführt → wiederholen; 3 = Illegal Data Value: endgültig
+    client = _FakeClient([code, "ok"])
+    tr, res, err = _write(monkeypatch, client)
+    assert client.sent_writes == sent
+    assert (err is None) == ok
+    if not ok:
+        assert err.kind == ERR_MODBUS_EXCEPTION and err.code == code
+
+
+def test_write_retries_limited(monkeypatch):
+    client = _FakeClient(["timeout"] * 5, reads=["ok"] * 5)
+    tr, res, err = _write(monkeypatch, client)
+    assert err.kind == ERR_TIMEOUT
+    assert client.sent_writes == transport.WRITE_RETRIES + 1
+    assert tr.stats.errors_by_class == {ERR_TIMEOUT: 1}
+
+
+# ---------- Block-Reads: Illegal Data Address ----------
+class _GapClient:
+    """Input-Register 0–19 ohne 5: Reads über die Lücke → Illegal Data Address."""
+
+    def __init__(self):
+        self.requests = []
+
+    def connect(self):
+        return True
+
+    def read_input_registers(self, addr, count=1, device_id=None):
+        self.requests.append((addr, count))
+        if addr <= 5 < addr + count:
+            return _Response(exception_code=2)
+        return _Response(list(range(addr, addr + count)))
+
+
+def test_prefetch_splits_block_on_illegal_address():
+    client = _GapClient()
+    tr = FroelingTransport(_FakeHass(), client)
+
+    async def _cycle(prefetch=True):
+        tr.start_cycle()
+        if prefetch:
+            await tr.async_prefetch(2)
+        for addr in (0, 10):
+            res, err = await tr.async_read_input(2, addr, 2)
+            assert err is None and res.registers[:2] == [addr, addr + 1]
+        tr.end_cycle()
+
+    asyncio.run(_cycle(prefetch=False))  # Reads lernen
+    client.requests.clear()
+    asyncio.run(_cycle())
+    # Block 0–11 scheitert, beide Hälften im selben Zyklus nachgelesen
+    assert client.requests == [(0, 12), (0, 2), (10, 2)]
+    assert tr.stats.retries == {"block_split": 1}
+    assert not tr.stats.errors_by_class
+    assert not tr.breaker.failures
+    client.requests.clear()
+    asyncio.run(_cycle())
+    # ab dem nächsten Zyklus gleich geteilt geplant
+    assert client.requests == [(0, 2), (10, 2)]
+
+
+# ---------- Offener Breaker: nichts senden, Breaker bleibt offen ----------
+class _DeadClient:
+    """Verbindungsaufbau schlägt immer fehl; zählt die Versuche."""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def connect(self):
+        self.attempts += 1
+        return False
+
+
+def _open_breaker(monkeypatch):
+    monkeypatch.setattr(transport, "_backoff", lambda attempt: 0)
+    client = _DeadClient()
+    tr = FroelingTransport(_FakeHass(), client)
+    for _ in range(transport.BREAKER_THRESHOLD):
+        res, err = asyncio.run(tr.async_read_input(2, 0, 1))
+        assert err.kind == ERR_CONNECTION
+    assert tr.breaker.is_open
+    return tr, client
+
+
+@pytest.mark.parametrize("kind", ["read", "write"])
+def test_open_breaker_short_circuits(monkeypatch, kind):
+    tr, client = _open_breaker(monkeypatch)
+    attempts, errors = client.attempts, dict(tr.stats.errors_by_class)
+    for _ in range(3):
+        if kind == "read":
+            res, err = asyncio.run(tr.async_read_input(2, 0, 1))
+        else:
+            res, err = asyncio.run(tr.async_write_register(2, 100, 1, budget=False))
+        assert err.kind == ERR_CIRCUIT_OPEN
+    assert client.attempts == attempts
+    assert tr.breaker.is_open
+    assert tr.breaker.failures == transport.BREAKER_THRESHOLD
+    assert dict(tr.stats.errors_by_class) == errors
+    assert 40101 not in tr.stats.errors_by_register
+
+
+def test_unchanged_write_reported_as_suppressed(fake_store):
+    fake_store(writebudget)
+    client = _DeadClient()
+    tr = FroelingTransport(_FakeHass(), client)
+    tr.write_budget = WriteBudget(None, "entry")
+    tr.write_budget.note_read(100, [5])
+    res, err = asyncio.run(tr.async_write_register(2, 100, 5))
+    assert res is None and err.kind == ERR_WRITE_BUDGET
+    assert write_suppressed(err)
+    assert client.attempts == 0
+    assert tr.stats.requests_total == 0
+
@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+
+from custom_components.froeling_s3200_modbus import writebudget
+from custom_components.froeling_s3200_modbus.writebudget import (
+    ALLOW,
+    REJECT_ENTRY,
+    REJECT_REGISTER,
+    SUPPRESS_EQUAL,
+    WriteBudget,
+)
+
+PARAM = 100               # 40101, Parameter im Speicher der Steuerung
+OVERRIDE = 48001 - 40001  # Vorlauf-Sollwert-Vorgabe HK01
+
+
+@pytest.fixture
+def budget(fake_store, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(writebudget, "time", lambda: now[0])
+    fake_store(writebudget)
+    wb = WriteBudget(None, "entry", limit_hour=3, limit_day=10)
+    wb.now = now
+    return wb
+
+
+def test_unknown_value_allowed(budget):
+    assert budget.check(PARAM, [5]) is ALLOW
+
+
+def test_equal_to_last_read_suppressed(budget):
+    budget.note_read(PARAM, [5, 6])
+    assert budget.check(PARAM, [5, 6]) == SUPPRESS_EQUAL
+    assert budget.check(PARAM, [5, 7]) is ALLOW
+    assert budget.counters[PARAM][SUPPRESS_EQUAL] == 1
+
+
+def test_newer_read_wins_over_write(budget):
+    budget.record_write(PARAM, [5])
+    assert budget.check(PARAM, [5]) == SUPPRESS_EQUAL
+    budget.now[0] += 1
+    budget.note_read(PARAM, [9])  # am Display geändert
+    assert budget.check(PARAM, [5]) is ALLOW
+
+
+def test_negative_values_compared_as_raw(budget):
+    budget.note_read(PARAM, [0xFFFF])
+    assert budget.check(PARAM, [-1]) == SUPPRESS_EQUAL
+
+
+def test_register_limit_per_hour(budget):
+    for value in range(3):
+        assert budget.check(PARAM, [value]) is ALLOW
+        budget.record_write(PARAM, [value])
+    assert budget.check(PARAM, [99]) == REJECT_REGISTER
+    assert budget.check(PARAM + 1, [99]) is ALLOW
+    budget.now[0] += 3600
+    assert budget.check(PARAM, [99]) is ALLOW
+
+
+def test_entry_limit_per_day(budget):
+    for addr in range(PARAM, PARAM + 10):
+        budget.record_write(addr, [1])
+    assert budget.check(PARAM + 20, [1]) == REJECT_ENTRY
+    assert budget.rejected_total == 1
+    budget.now[0] += 86400
+    assert budget.check(PARAM + 20, [1]) is ALLOW
+
+
+def test_fc16_counts_every_register(budget):
+    budget.record_write(PARAM, [1] * 8)
+    assert budget.writes_24h == 8
+    assert budget.check(PARAM + 20, [1, 2, 3]) == REJECT_ENTRY
+
+
+def test_override_refresh_exempt_but_counted(budget):
+    budget.record_write(OVERRIDE, [450])
+    for _ in range(20):
+        # unveränderte Vorgabe neu schreiben: nie unterdrückt, zählt nicht gegen die Budgets
+        assert budget.check(OVERRIDE, [450]) is ALLOW
+        budget.record_write(OVERRIDE, [450])
+    assert budget.counters[OVERRIDE]["writes"] == 21
+    assert budget.writes_24h == 1
+
+
+def test_override_value_changes_limited(budget):
+    for value in (450, 460, 470):
+        assert budget.check(OVERRIDE, [value]) is ALLOW
+        budget.record_write(OVERRIDE, [value])
+    assert budget.check(OVERRIDE, [480]) == REJECT_REGISTER
+    # Auffrischen des aktuellen Werts bleibt möglich
+    assert budget.check(OVERRIDE, [470]) is ALLOW
+    budget.now[0] += 3600
+    assert budget.check(OVERRIDE, [480]) is ALLOW
+
+
+def test_mixed_write_with_parameter_register_suppressed(budget):
+    budget.note_read(OVERRIDE - 1, [7, 450])
+    assert budget.check(OVERRIDE - 1, [7, 450]) == SUPPRESS_EQUAL
+
+
+def test_state_survives_reload(budget):
+    for value in range(3):
+        budget.record_write(PARAM, [value])
+    asyncio.run(budget.async_save())
+    reloaded = WriteBudget(None, "entry", limit_hour=3, limit_day=10)
+    reloaded._store.data = budget._store.data
+    asyncio.run(reloaded.async_load())
+    assert reloaded.check(PARAM, [2]) == SUPPRESS_EQUAL
+    assert reloaded.check(PARAM, [9]) == REJECT_REGISTER
@@ -0,0 +1,184 @@
+"""End-to-End-Benchmark: Setup und Poll-Zyklus gegen den S3200-Simulator.
+
+Jeder Lauf startet einen frischen HA-Kern (eigener Event-Loop + Executor),
+richtet die Integration gegen tools/s3200_sim.py ein und lässt den Poller
+über sein echtes Timer-Intervall laufen. Variiert werden Gruppen, Latenz
+pro Anfrage und Update-Intervall.
+
+    python tools/bench_poll.py --output bench.json
+    python tools/bench_poll.py --groups all --latency 0,10,50 --interval 1,5 --cycles 3
+    python tools/bench_poll.py --groups all,max --latency 10 --interval 10
+    python tools/bench_poll.py --baseline bench_0.3.1.json --tolerance 0.25
+
+Ausgabe (JSON): {"meta": {...}, "runs": [{"groups", "latency_ms", "interval_s",
+"setup_ms", "entities", "cycle_ms_p50", "cycle_ms_max", "requests_per_cycle",
+"bytes_per_cycle", "executor_threads", "loop_lag_max_ms", "loop_blocked_ms", ...}]}.
+Mit --baseline endet das Skript mit Exit-Code 1, wenn Zykluszeit oder Anfragen
+pro Zyklus eines Laufs um mehr als die Toleranz schlechter geworden sind.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+
+import ha_harness as H
+from s3200_sim import S3200Simulator
+
+
+async def run_one(groups: tuple[str, ...], latency_ms: float, interval_s: int, cycles: int,
+                  framer: str = "socket") -> dict:
+    async with H.running_hass() as hass:
+        sim = S3200Simulator(latency_ms=latency_ms, framer=framer)
+        port = await sim.start()
+        lag = H.LoopLagMonitor(hass.loop)
+
+        lag.start()
+        t0 = time.perf_counter()
+        entry = await H.add_entry(hass, H.entry_data(port, groups, interval_s, framer=framer))
+        setup_ms = (time.perf_counter() - t0) * 1000.0
+        setup_lag = await lag.stop()
+
+        transport = H.transport_of(hass, entry)
+        poller = H.poller_of(hass, entry)
+        samples: list[tuple[float, int, int]] = []
+        done = asyncio.Event()
+
+        def _on_cycle() -> None:
+            st = transport.stats
+            samples.append((st.cycle_duration_ms, st.cycle_requests, st.cycle_bytes))
+            if len(samples) >= cycles:
+                done.set()
+
+        poller.async_add_cycle_listener(_on_cycle)
+        requests_before = sim.requests
+        lag.start()
+        t0 = time.perf_counter()
+        # großzügiges Timeout: Zyklen dürfen länger als das Intervall dauern
+        timeout = cycles * interval_s + cycles * (len(groups) * 60 * (latency_ms + 5) / 1000.0) + 30
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        wall_s = time.perf_counter() - t0
+        poll_lag = await lag.stop()
+        threads = H.executor_threads(hass)
+        entities = len(hass.states.async_all())
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await sim.stop()
+
+    durations = sorted(s[0] for s in samples)
+    return {
+        "groups": ",".join(groups),
+        "framer": framer,
+        "latency_ms": latency_ms,
+        "interval_s": interval_s,
+        "entities": entities,
+        "setup_ms": round(setup_ms, 1),
+        "setup_loop_blocked_ms": setup_lag["loop_blocked_ms"],
+        "setup_loop_lag_max_ms": setup_lag["loop_lag_max_ms"],
+        "cycles": len(samples),
+        "cycle_ms_p50": round(H.percentile(durations, 50), 1),
+        "cycle_ms_max": round(durations[-1], 1) if durations else None,
+        "cycle_overruns": sum(1 for d in durations if d > interval_s * 1000.0),
+        "requests_per_cycle": samples[-1][1] if samples else None,
+        "bytes_per_cycle": samples[-1][2] if samples else None,
+        "server_requests": sim.requests - requests_before,
+        "executor_threads": threads,
+        "wall_s": round(wall_s, 2),
+        **poll_lag,
+    }
+
+
+def _group_profiles(spec: str) -> list[tuple[str, ...]]:
+    profiles: list[tuple[str, ...]] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if item == "all":
+            profiles.append(H.GROUPS)
+        elif item == "max":
+            # Vollausbau: alle festen Gruppen plus hk03–hk18
+            profiles.append(H.GROUPS + H.TEMPLATE_GROUPS)
+        elif item == "each":
+            profiles.extend((g,) for g in H.GROUPS)
+        elif item:
+            profiles.append(tuple(g for g in item.split("+") if g))
+    return profiles
+
+
+def _compare(runs: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = {(r["groups"], r.get("framer", "socket"), r["latency_ms"], r["interval_s"]): r
+                    for r in json.load(fh)["runs"]}
+    problems = []
+    for run in runs:
+        ref = baseline.get((run["groups"], run["framer"], run["latency_ms"], run["interval_s"]))
+        if ref is None:
+            continue
+        for key in ("cycle_ms_p50", "requests_per_cycle"):
+            old, new = ref.get(key), run.get(key)
+            # kleine absolute Zykluszeiten sind Messrauschen
+            if old and new and new > old * (1 + tolerance) and new - old > 5:
+                problems.append(f"{run['groups']} @ {run['latency_ms']} ms/{run['interval_s']} s: {key} {old} → {new}")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--groups", default="all,each", help="all, max, each oder z. B. kessel+hk01+hk03 (kommagetrennt)")
+    parser.add_argument("--latency", default="0,10,50", help="Latenz pro Anfrage in ms (kommagetrennt)")
+    parser.add_argument("--interval", default="1", help="Update-Intervall in s (kommagetrennt)")
+    parser.add_argument("--cycles", type=int, default=3, help="gemessene Zyklen pro Lauf")
+    parser.add_argument("--framer", default="socket", choices=("socket", "rtu"))
+    parser.add_argument("--output", help="JSON-Datei (sonst stdout)")
+    parser.add_argument("--baseline", help="früheres Ergebnis zum Vergleich")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    import homeassistant.const as ha_const
+    import pymodbus
+
+    asyncio.set_event_loop_policy(H.event_loop_policy())
+    runs = []
+    for groups in _group_profiles(args.groups):
+        for latency in (float(x) for x in args.latency.split(",")):
+            for interval in (int(x) for x in args.interval.split(",")):
+                run = asyncio.run(run_one(groups, latency, interval, args.cycles, args.framer))
+                print(f"{run['groups']:<70} {latency:>5.0f} ms {interval:>3d} s  "
+                      f"cycle {run['cycle_ms_p50']:>8} ms  req {run['requests_per_cycle']}  "
+                      f"blocked {run['loop_blocked_ms']} ms", file=sys.stderr)
+                runs.append(run)
+
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "homeassistant": ha_const.__version__,
+            "pymodbus": pymodbus.__version__,
+            "cycles": args.cycles,
+        },
+        "runs": runs,
+    }
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        problems = _compare(runs, args.baseline, args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
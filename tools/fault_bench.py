@@ -0,0 +1,192 @@
+"""Resilienz-Messung: Integration → Fault-Proxy → S3200-Simulator.
+
+Je Szenario: einige gesunde Zyklen, dann eine Fehlerphase (Dauer --fault-s),
+danach Fehler aus und warten, bis wieder ein fehlerfreier Zyklus durchläuft.
+Gemessen werden Zykluszeiten je Phase, Fehler nach Klasse, ob der
+Circuit-Breaker geöffnet hat, Erholungszeit, Speicher (tracemalloc) und die
+Dauer von async_unload_entry (Close-Pfad).
+
+    python tools/fault_bench.py                       # alle Szenarien
+    python tools/fault_bench.py --scenario stall,drop --fault-s 30 --output faults.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import ha_harness as H
+from fault_proxy import FaultConfig, FaultProxy
+from s3200_sim import S3200Simulator
+
+SCENARIOS = {
+    "latency": {"latency": "lognormal:3:0.6"},         # Median ~20 ms, lange Flanke
+    "drop": {"drop_every": 40},                        # Abbruch mitten im Zyklus
+    "truncate": {"truncate_prob": 0.05},
+    "exception": {"exceptions": {30001: 4, 34002: 4, 41032: 2}},
+    "stall": {"stall": True},                          # Gerät hängt, Socket bleibt offen
+    "outage": {"refuse": True, "drop_all": True},      # Gateway weg
+    "stall_unload": {"stall": True, "unload_during_fault": True},
+}
+
+
+def _apply(proxy: FaultProxy, spec: dict) -> None:
+    f = proxy.faults
+    for key, value in spec.items():
+        if key == "latency":
+            f.set_latency(value)
+        elif key == "exceptions":
+            f.exceptions.update(value)
+        elif key in ("drop_all", "unload_during_fault"):
+            continue
+        else:
+            setattr(f, key, value)
+    if spec.get("drop_all"):
+        proxy.drop_all()
+
+
+def _phase(samples: list[dict]) -> dict:
+    durations = sorted(s["cycle_ms"] for s in samples)
+    return {
+        "cycles": len(samples),
+        "cycle_ms_p50": round(H.percentile(durations, 50), 1) if durations else None,
+        "cycle_ms_max": durations[-1] if durations else None,
+        "errors": sum(s["errors"] for s in samples),
+    }
+
+
+async def run_scenario(name: str, spec: dict, interval_s: int, warmup: int,
+                       fault_s: float, recover_s: float, seed: int) -> dict:
+    async with H.running_hass() as hass:
+        sim = S3200Simulator(latency_ms=1)
+        await sim.start()
+        proxy = FaultProxy("127.0.0.1", sim.port, FaultConfig(seed=seed))
+        port = await proxy.start()
+        entry = await H.add_entry(hass, H.entry_data(port, update_interval=interval_s))
+        transport = H.transport_of(hass, entry)
+        poller = H.poller_of(hass, entry)
+
+        samples: list[dict] = []
+        phase = "warmup"
+        new_cycle = asyncio.Event()
+
+        def _on_cycle() -> None:
+            st = transport.stats
+            samples.append({"phase": phase, "t": time.monotonic(), "cycle_ms": st.cycle_duration_ms,
+                            "errors": st.cycle_errors, "available": transport.available})
+            new_cycle.set()
+
+        poller.async_add_cycle_listener(_on_cycle)
+        breaker_opened = False
+
+        def _on_availability() -> None:
+            nonlocal breaker_opened
+            breaker_opened = breaker_opened or not transport.available
+
+        transport.add_availability_listener(_on_availability)
+
+        while sum(1 for s in samples if s["phase"] == "warmup") < warmup:
+            new_cycle.clear()
+            await new_cycle.wait()
+        mem_baseline = H.traced_memory_kib()
+        tracemalloc.reset_peak()
+
+        phase = "fault"
+        _apply(proxy, spec)
+        t_fault = time.monotonic()
+        unload_ms = None
+        if spec.get("unload_during_fault"):
+            await asyncio.sleep(min(fault_s, interval_s * 2 + 1))
+            t0 = time.perf_counter()
+            await hass.config_entries.async_unload(entry.entry_id)
+            unload_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+            recovery_s = None
+        else:
+            await asyncio.sleep(fault_s)
+        mem_fault_peak = tracemalloc.get_traced_memory()[1] / 1024.0
+        proxy.faults.clear()
+        proxy.faults.set_latency("fixed:0")
+        t_clear = time.monotonic()
+
+        if unload_ms is None:
+            phase = "recovery"
+            recovery_s = None
+            deadline = t_clear + recover_s
+            while time.monotonic() < deadline:
+                new_cycle.clear()
+                try:
+                    await asyncio.wait_for(new_cycle.wait(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    break
+                last = samples[-1]
+                if last["phase"] == "recovery" and last["errors"] == 0 and last["available"]:
+                    recovery_s = round(last["t"] - t_clear, 2)
+                    break
+            t0 = time.perf_counter()
+            await hass.config_entries.async_unload(entry.entry_id)
+            unload_ms = round((time.perf_counter() - t0) * 1000.0, 1)
+        mem_end = H.traced_memory_kib()
+        errors_by_class = dict(transport.stats.errors_by_class)
+        await proxy.stop()
+        await sim.stop()
+
+    return {
+        "scenario": name,
+        "faults": {k: v for k, v in spec.items() if k != "exceptions"} | (
+            {"exceptions": {str(k): v for k, v in spec["exceptions"].items()}} if "exceptions" in spec else {}
+        ),
+        "interval_s": interval_s,
+        "fault_s": round(t_clear - t_fault, 1),
+        "warmup": _phase([s for s in samples if s["phase"] == "warmup"]),
+        "fault": _phase([s for s in samples if s["phase"] == "fault"]),
+        "recovery": _phase([s for s in samples if s["phase"] == "recovery"]),
+        "recovery_s": recovery_s,
+        "breaker_opened": breaker_opened,
+        "errors_by_class": errors_by_class,
+        "injected": dict(proxy.injected),
+        "proxy_requests": proxy.requests,
+        "mem_baseline_kib": round(mem_baseline),
+        # Zuwachs gegenüber dem gesunden Zustand (Spitze in der Fehlerphase / nach Unload)
+        "mem_fault_peak_delta_kib": round(mem_fault_peak - mem_baseline),
+        "mem_end_delta_kib": round(mem_end - mem_baseline),
+        "unload_ms": unload_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--scenario", default=",".join(SCENARIOS), help="kommagetrennt: " + ", ".join(SCENARIOS))
+    parser.add_argument("--interval", type=int, default=2, help="Update-Intervall in s")
+    parser.add_argument("--warmup", type=int, default=2, help="gesunde Zyklen vor dem Fehler")
+    parser.add_argument("--fault-s", type=float, default=20.0, help="Dauer der Fehlerphase")
+    parser.add_argument("--recover-s", type=float, default=180.0, help="maximale Wartezeit auf Erholung")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON-Datei (sonst stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    asyncio.set_event_loop_policy(H.event_loop_policy())
+    tracemalloc.start()
+    runs = []
+    for name in (s.strip() for s in args.scenario.split(",") if s.strip()):
+        run = asyncio.run(run_scenario(name, SCENARIOS[name], args.interval, args.warmup,
+                                       args.fault_s, args.recover_s, args.seed))
+        print(f"{name:<14} fault p50 {run['fault']['cycle_ms_p50']} ms  recovery {run['recovery_s']} s  "
+              f"breaker {run['breaker_opened']}  unload {run['unload_ms']} ms", file=sys.stderr)
+        runs.append(run)
+
+    text = json.dumps({"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}, "runs": runs}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
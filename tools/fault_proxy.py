@@ -0,0 +1,237 @@
+"""Fault-Injection-Proxy zwischen Integration und Modbus-Gerät (bzw. Simulator).
+
+Leitet Modbus-TCP-Frames 1:1 weiter und baut auf Wunsch Fehler ein:
+
+  * Latenz-Verteilungen je Antwort: fixed:MS, uniform:MIN:MAX, normal:MU:SIGMA,
+    lognormal:MU:SIGMA (Parameter des ln in ms), exp:MEAN
+  * Verbindungsabbruch mitten im Zyklus (jede N-te Anfrage bzw. Wahrscheinlichkeit)
+  * abgeschnittene Antworten (danach wird die Verbindung geschlossen)
+  * Modbus-Exception-Codes für ausgewählte Register (z. B. 30050:4)
+  * hängende Sockets (Anfrage wird geschluckt, Verbindung bleibt offen)
+  * abgewiesene Verbindungen (Gerät aus / Gateway weg)
+
+    python tools/s3200_sim.py --port 5020 &
+    python tools/fault_proxy.py --upstream 127.0.0.1:5020 --port 5021 \\
+        --latency lognormal:3:0.6 --drop-every 200 --exception 30050:4
+
+Alle Fehler lassen sich zur Laufzeit über FaultProxy.faults umschalten.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import struct
+
+from s3200_sim import _TABLE_BASE, COIL, DISCRETE, HOLDING, INPUT
+
+_LOGGER = logging.getLogger("fault_proxy")
+
+_FC_TABLE = {1: COIL, 2: DISCRETE, 3: HOLDING, 4: INPUT, 6: HOLDING, 16: HOLDING}
+
+
+def request_registers(pdu: bytes) -> range:
+    """Registernummern (30001-Schema) einer Anfrage-PDU."""
+    fc = pdu[0]
+    table = _FC_TABLE.get(fc)
+    if table is None or len(pdu) < 5:
+        return range(0)
+    addr, count = struct.unpack_from(">HH", pdu, 1)
+    if fc == 6:
+        count = 1
+    base = _TABLE_BASE[table]
+    return range(base + addr, base + addr + count)
+
+
+class LatencyDistribution:
+    """Ziehung einer Latenz in ms aus einer Spezifikation wie "uniform:5:50"."""
+
+    def __init__(self, spec: str = "fixed:0", rng: random.Random | None = None):
+        self.spec = spec
+        self._rng = rng or random.Random()
+        kind, *params = spec.split(":")
+        self._kind = kind
+        self._params = [float(p) for p in params] or [0.0]
+        if kind not in ("fixed", "uniform", "normal", "lognormal", "exp"):
+            raise ValueError(f"unbekannte Latenz-Verteilung: {spec}")
+
+    def sample(self) -> float:
+        p, rng = self._params, self._rng
+        if self._kind == "fixed":
+            return p[0]
+        if self._kind == "uniform":
+            return rng.uniform(p[0], p[1])
+        if self._kind == "normal":
+            return max(0.0, rng.gauss(p[0], p[1]))
+        if self._kind == "lognormal":
+            return math.exp(rng.gauss(p[0], p[1]))
+        return rng.expovariate(1.0 / p[0]) if p[0] > 0 else 0.0
+
+
+class FaultConfig:
+    """Aktive Fehler; alle Felder dürfen während des Betriebs geändert werden."""
+
+    def __init__(self, latency: str = "fixed:0", drop_every: int = 0, drop_prob: float = 0.0,
+                 truncate_prob: float = 0.0, stall_prob: float = 0.0, stall: bool = False,
+                 refuse: bool = False, exceptions: dict[int, int] | None = None, seed: int | None = None):
+        self.rng = random.Random(seed)
+        self.latency = LatencyDistribution(latency, self.rng)
+        self.drop_every = drop_every
+        self.drop_prob = drop_prob
+        self.truncate_prob = truncate_prob
+        self.stall_prob = stall_prob
+        self.stall = stall
+        self.refuse = refuse
+        self.exceptions = dict(exceptions or {})
+
+    def clear(self) -> None:
+        """Alle Fehler aus (Latenz bleibt)."""
+        self.drop_every = 0
+        self.drop_prob = self.truncate_prob = self.stall_prob = 0.0
+        self.stall = self.refuse = False
+        self.exceptions.clear()
+
+    def set_latency(self, spec: str) -> None:
+        self.latency = LatencyDistribution(spec, self.rng)
+
+
+class FaultProxy:
+    """asyncio-TCP-Proxy; eine Upstream-Verbindung je Client-Verbindung."""
+
+    def __init__(self, upstream_host: str, upstream_port: int, faults: FaultConfig | None = None):
+        self.upstream = (upstream_host, upstream_port)
+        self.faults = faults or FaultConfig()
+        self.requests = 0
+        self.injected: dict[str, int] = {"drop": 0, "truncate": 0, "stall": 0, "exception": 0, "refuse": 0}
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.port: int | None = None
+
+    def _inject(self, kind: str) -> None:
+        self.injected[kind] += 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        f = self.faults
+        if f.refuse:
+            self._inject("refuse")
+            writer.close()
+            return
+        self._writers.add(writer)
+        up_writer = None
+        try:
+            up_reader, up_writer = await asyncio.open_connection(*self.upstream)
+            while True:
+                header = await reader.readexactly(7)
+                tid, pid, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                self.requests += 1
+
+                if f.stall or (f.stall_prob and f.rng.random() < f.stall_prob):
+                    self._inject("stall")
+                    continue
+                if (f.drop_every and self.requests % f.drop_every == 0) or (
+                    f.drop_prob and f.rng.random() < f.drop_prob
+                ):
+                    self._inject("drop")
+                    return
+
+                code = next((f.exceptions[r] for r in request_registers(pdu) if r in f.exceptions), None)
+                if code is not None:
+                    self._inject("exception")
+                    rsp = header[:4] + struct.pack(">HB", 3, unit) + bytes([pdu[0] | 0x80, code])
+                else:
+                    up_writer.write(header + pdu)
+                    await up_writer.drain()
+                    rsp_header = await up_reader.readexactly(7)
+                    rsp_len = struct.unpack_from(">H", rsp_header, 4)[0]
+                    rsp = rsp_header + await up_reader.readexactly(rsp_len - 1)
+
+                delay = f.latency.sample()
+                if delay > 0:
+                    await asyncio.sleep(delay / 1000.0)
+                if f.truncate_prob and f.rng.random() < f.truncate_prob:
+                    self._inject("truncate")
+                    writer.write(rsp[: f.rng.randint(1, len(rsp) - 1)])
+                    await writer.drain()
+                    return
+                writer.write(rsp)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            if up_writer is not None:
+                up_writer.close()
+
+    def drop_all(self) -> None:
+        """Alle offenen Client-Verbindungen sofort trennen."""
+        for writer in list(self._writers):
+            self._inject("drop")
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def parse_exceptions(items: list[str]) -> dict[int, int]:
+    """["30050:4", "34002"] → {30050: 4, 34002: 2}"""
+    out = {}
+    for item in items:
+        reg, _, code = item.partition(":")
+        out[int(reg)] = int(code or 2)
+    return out
+
+
+async def _main(args) -> None:
+    host, _, port = args.upstream.rpartition(":")
+    faults = FaultConfig(
+        latency=args.latency, drop_every=args.drop_every, drop_prob=args.drop_prob,
+        truncate_prob=args.truncate_prob, stall_prob=args.stall_prob,
+        exceptions=parse_exceptions(args.exception), seed=args.seed,
+    )
+    proxy = FaultProxy(host or "127.0.0.1", int(port), faults)
+    await proxy.start(args.host, args.port)
+    _LOGGER.info("fault proxy %s:%s → %s", args.host, proxy.port, args.upstream)
+    try:
+        while True:
+            await asyncio.sleep(10)
+            _LOGGER.info("requests=%d injected=%s", proxy.requests, proxy.injected)
+    finally:
+        await proxy.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--upstream", required=True, help="host:port des Geräts/Simulators")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5021)
+    parser.add_argument("--latency", default="fixed:0")
+    parser.add_argument("--drop-every", type=int, default=0)
+    parser.add_argument("--drop-prob", type=float, default=0.0)
+    parser.add_argument("--truncate-prob", type=float, default=0.0)
+    parser.add_argument("--stall-prob", type=float, default=0.0)
+    parser.add_argument("--exception", action="append", default=[], help="REGISTER[:CODE], z. B. 30050:4")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
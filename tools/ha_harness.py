@@ -0,0 +1,159 @@
+"""Minimales Home-Assistant-Gerüst für Benchmarks und Lasttests.
+
+Startet einen echten HomeAssistant-Kern (ohne Frontend/Recorder) in einem
+temporären Config-Verzeichnis, in das custom_components verlinkt wird, und
+richtet die Integration über ConfigEntries ein – also exakt den Setup- und
+Poll-Pfad, den auch eine Installation durchläuft.
+
+Benötigt ein installiertes homeassistant-Paket (Entwicklungsumgebung).
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+from homeassistant import config_entries, core, loader
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity,
+    entity_registry as er,
+    issue_registry as ir,
+    translation,
+)
+
+from s3200_sim import load_templates
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DOMAIN = "froeling_s3200_modbus"
+GROUPS = ("kessel", "hk01", "hk02", "puffer01", "boiler01", "austragung", "zirkulationspumpe")
+# aus Vorlagen erzeugte Gruppen (hk03–hk18)
+TEMPLATE_GROUPS = tuple(load_templates().TEMPLATE_GROUPS)
+
+
+def event_loop_policy() -> asyncio.AbstractEventLoopPolicy:
+    """HA-Policy: Default-Executor wie im echten Betrieb (SyncWorker, 64 Threads)."""
+    from homeassistant.runner import HassEventLoopPolicy
+
+    return HassEventLoopPolicy(False)
+
+
+def entry_data(port: int, groups=GROUPS, update_interval: int = 60, name: str = "Froeling",
+               host: str = "127.0.0.1", **extra) -> dict:
+    data = {"name": name, "host": host, "port": port, "unit_id": 2, "update_interval": update_interval}
+    data.update({g: g in groups for g in GROUPS})
+    # alles andere sind Vorlagen-Gruppen (hk03 … hk18)
+    data["extra_groups"] = [g for g in groups if g not in GROUPS]
+    data.update(extra)
+    return data
+
+
+_CONFIG_DIR: str | None = None
+
+
+def _config_dir() -> str:
+    """Ein Config-Verzeichnis pro Prozess (das Paket custom_components wird nur
+    einmal importiert); Registries werden vor jedem Lauf verworfen."""
+    global _CONFIG_DIR
+    if _CONFIG_DIR is None:
+        _CONFIG_DIR = tempfile.mkdtemp(prefix="froeling_bench_")
+        os.symlink(os.path.join(REPO_DIR, "custom_components"), os.path.join(_CONFIG_DIR, "custom_components"))
+    for name in (".storage", DOMAIN):
+        shutil.rmtree(os.path.join(_CONFIG_DIR, name), ignore_errors=True)
+    return _CONFIG_DIR
+
+
+@asynccontextmanager
+async def running_hass():
+    """HomeAssistant-Kern mit geladenen Registries; räumt am Ende alles ab."""
+    hass = core.HomeAssistant(_config_dir())
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    translation.async_setup(hass)
+    entity.async_setup(hass)
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await ar.async_load(hass)
+    await dr.async_load(hass)
+    await er.async_load(hass)
+    await ir.async_load(hass)
+    await hass.async_start()
+    try:
+        yield hass
+    finally:
+        await hass.async_stop(force=True)
+
+
+async def add_entry(hass, data: dict, title: str | None = None) -> config_entries.ConfigEntry:
+    entry = config_entries.ConfigEntry(
+        version=1, minor_version=1, domain=DOMAIN, title=title or data["name"],
+        data=data, source=config_entries.SOURCE_USER, options={},
+    )
+    await hass.config_entries.async_add(entry)
+    await hass.async_block_till_done()
+    return entry
+
+
+def poller_of(hass, entry):
+    return hass.data[DOMAIN][f"{entry.entry_id}_poller"]
+
+
+def transport_of(hass, entry):
+    return hass.data[DOMAIN][f"{entry.entry_id}_transport"]
+
+
+def executor_threads(hass) -> int:
+    """Bisher gestartete Threads im Default-Executor (= maximale Parallelität)."""
+    executor = getattr(hass.loop, "_default_executor", None)
+    return len(getattr(executor, "_threads", ()))
+
+
+class LoopLagMonitor:
+    """Misst Event-Loop-Blockaden: Verspätung eines periodischen sleep()."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, interval: float = 0.005):
+        self._loop = loop
+        self._interval = interval
+        self._task: asyncio.Task | None = None
+        self.lags_ms: list[float] = []
+
+    def start(self) -> None:
+        self.lags_ms.clear()
+        self._task = self._loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            t0 = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            self.lags_ms.append(max(0.0, (time.perf_counter() - t0 - self._interval) * 1000.0))
+
+    async def stop(self) -> dict:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        lags = sorted(self.lags_ms)
+        return {
+            "loop_lag_max_ms": round(lags[-1], 2) if lags else 0.0,
+            "loop_lag_p99_ms": round(percentile(lags, 99), 2),
+            # Summe der Verspätungen über 10 ms ≈ Zeit, in der der Loop blockiert war
+            "loop_blocked_ms": round(sum(x for x in lags if x > 10.0), 1),
+        }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def traced_memory_kib() -> float:
+    return tracemalloc.get_traced_memory()[0] / 1024.0 if tracemalloc.is_tracing() else 0.0
@@ -0,0 +1,168 @@
+"""Lasttest: N simulierte Steuerungen mit N Config-Entries in einem HA-Kern.
+
+Misst pro Stufe Event-Loop-Verzögerung, Auslastung des gemeinsamen Executors
+(Threads, Warteschlange), Speicher pro Entry (tracemalloc),
+Zykluszeit-Perzentile und Modbus-Anfragen pro Zyklus über alle Entries. Eine
+Stufe gilt als "ok", wenn p95 der Zykluszeit unter 80 % des Update-Intervalls
+und p99 der Loop-Verzögerung unter 20 ms bleibt; die größte ok-Stufe wird als
+unterstützte Grenze ausgegeben.
+
+    python tools/load_test.py --entries 1,5,10,20 --latency 5 --interval 10
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import time
+import tracemalloc
+
+import ha_harness as H
+from s3200_sim import S3200Simulator
+
+MAX_CYCLE_SHARE = 0.8
+MAX_LOOP_LAG_P99_MS = 20.0
+
+
+async def _sample_executor(hass, out: dict) -> None:
+    executor = getattr(hass.loop, "_default_executor", None)
+    while True:
+        out["threads_max"] = max(out["threads_max"], H.executor_threads(hass))
+        queue = getattr(executor, "_work_queue", None)
+        if queue is not None:
+            out["queue_max"] = max(out["queue_max"], queue.qsize())
+        await asyncio.sleep(0.02)
+
+
+async def run_stage(entries: int, latency_ms: float, interval_s: int, cycles: int) -> dict:
+    async with H.running_hass() as hass:
+        sims = []
+        for _ in range(entries):
+            sim = S3200Simulator(latency_ms=latency_ms)
+            await sim.start()
+            sims.append(sim)
+
+        # Aufwärm-Entry: Modul-Importe und Caches nicht den gemessenen Entries anrechnen
+        warm = await H.add_entry(hass, H.entry_data(sims[0].port, update_interval=3600, name="Warmup"))
+        await hass.config_entries.async_remove(warm.entry_id)
+
+        lag = H.LoopLagMonitor(hass.loop)
+        gc.collect()
+        mem_before = H.traced_memory_kib()
+        t0 = time.perf_counter()
+        config_entries = []
+        for i, sim in enumerate(sims):
+            entry = await H.add_entry(
+                hass, H.entry_data(sim.port, update_interval=interval_s, name=f"Froeling{i + 1}")
+            )
+            config_entries.append(entry)
+        setup_s = time.perf_counter() - t0
+        gc.collect()
+        mem_per_entry = (H.traced_memory_kib() - mem_before) / entries
+
+        durations: list[float] = []
+        requests: list[int] = []
+        counts = [0] * entries
+        done = asyncio.Event()
+
+        def _listener(idx: int, transport, sim):
+            seen = [sim.requests]
+
+            def _on_cycle() -> None:
+                durations.append(transport.stats.cycle_duration_ms)
+                requests.append(sim.requests - seen[0])
+                seen[0] = sim.requests
+                counts[idx] += 1
+                if min(counts) >= cycles:
+                    done.set()
+            return _on_cycle
+
+        for idx, entry in enumerate(config_entries):
+            H.poller_of(hass, entry).async_add_cycle_listener(_listener(idx, H.transport_of(hass, entry), sims[idx]))
+
+        executor_stats = {"threads_max": 0, "queue_max": 0}
+        sampler = hass.loop.create_task(_sample_executor(hass, executor_stats))
+        lag.start()
+        try:
+            await asyncio.wait_for(done.wait(), cycles * interval_s * 4 + 60)
+        except asyncio.TimeoutError:
+            pass
+        loop_stats = await lag.stop()
+        loop_p99 = loop_stats["loop_lag_p99_ms"]
+        sampler.cancel()
+        entities = len(hass.states.async_all())
+
+        for entry in config_entries:
+            await hass.config_entries.async_unload(entry.entry_id)
+        for sim in sims:
+            await sim.stop()
+
+    durations.sort()
+    p95 = H.percentile(durations, 95)
+    ok = bool(durations) and min(counts) >= cycles and p95 < interval_s * 1000.0 * MAX_CYCLE_SHARE \
+        and loop_p99 < MAX_LOOP_LAG_P99_MS
+    return {
+        "entries": entries,
+        "entities": entities,
+        "latency_ms": latency_ms,
+        "interval_s": interval_s,
+        "setup_s": round(setup_s, 2),
+        "mem_per_entry_kib": round(mem_per_entry),
+        "cycles": len(durations),
+        # Median: der erste Zyklus liest noch einzeln, danach Block-Reads
+        "requests_per_cycle_p50": H.percentile(sorted(requests), 50),
+        "cycle_ms_p50": round(H.percentile(durations, 50), 1),
+        "cycle_ms_p95": round(p95, 1),
+        "cycle_ms_p99": round(H.percentile(durations, 99), 1),
+        "cycle_ms_max": durations[-1] if durations else None,
+        "executor_threads_max": executor_stats["threads_max"],
+        "executor_queue_max": executor_stats["queue_max"],
+        **loop_stats,
+        "ok": ok,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--entries", default="1,5,10,20", help="Stufen (kommagetrennt)")
+    parser.add_argument("--latency", type=float, default=5.0, help="Latenz pro Anfrage in ms")
+    parser.add_argument("--interval", type=int, default=10, help="Update-Intervall in s")
+    parser.add_argument("--cycles", type=int, default=3, help="Zyklen pro Entry und Stufe")
+    parser.add_argument("--output", help="JSON-Datei (sonst stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.CRITICAL)
+
+    asyncio.set_event_loop_policy(H.event_loop_policy())
+    tracemalloc.start()
+    stages = []
+    for n in (int(x) for x in args.entries.split(",")):
+        stage = asyncio.run(run_stage(n, args.latency, args.interval, args.cycles))
+        print(f"{n:>3} entries  cycle p95 {stage['cycle_ms_p95']:>8} ms  loop p99 {stage['loop_lag_p99_ms']:>6} ms  "
+              f"threads {stage['executor_threads_max']:>2}  queue {stage['executor_queue_max']:>3}  "
+              f"mem/entry {stage['mem_per_entry_kib']} KiB  req/cycle {stage['requests_per_cycle_p50']}  {'ok' if stage['ok'] else 'OVERLOAD'}", file=sys.stderr)
+        stages.append(stage)
+
+    supported = max((s["entries"] for s in stages if s["ok"]), default=0)
+    result = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "criteria": {"cycle_p95_share_of_interval": MAX_CYCLE_SHARE, "loop_lag_p99_ms": MAX_LOOP_LAG_P99_MS},
+        },
+        "stages": stages,
+        "supported_entries": supported,
+    }
+    print(f"supported: {supported} entries at {args.latency} ms latency, {args.interval} s interval", file=sys.stderr)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            fh.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Lokaler Empfänger für den Line-Protocol-Export (Ersatz für die Zeitreihen-DB).
+
+Nimmt Verbindungen per TCP oder UNIX-Socket an und gibt jede Zeile aus bzw.
+zählt sie. Mit --delay-ms liest er nach jedem Block absichtlich langsam, um
+Pufferung und Verwerfen im Exporter zu prüfen (nur Standardbibliothek).
+
+    python tools/lp_sink.py --port 8094
+    python tools/lp_sink.py --unix /tmp/froeling.sock --quiet
+    python tools/lp_sink.py --port 8094 --delay-ms 500
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+
+class LineSink:
+    """Zählt empfangene Zeilen und Payloads; optional mit künstlicher Verzögerung."""
+
+    def __init__(self, delay_ms: float = 0.0, quiet: bool = False):
+        self.delay = delay_ms / 1000.0
+        self.quiet = quiet
+        self.lines: list[str] = []
+        self.chunks = 0
+        self._server: asyncio.AbstractServer | None = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                self.chunks += 1
+                for line in data.decode(errors="replace").splitlines():
+                    self.lines.append(line)
+                    if not self.quiet:
+                        print(line)
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+        finally:
+            writer.close()
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start_unix(self, path: str) -> None:
+        self._server = await asyncio.start_unix_server(self._handle, path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+
+async def _main(args) -> None:
+    sink = LineSink(args.delay_ms, args.quiet)
+    if args.unix:
+        await sink.start_unix(args.unix)
+        print(f"lp_sink: {args.unix}")
+    else:
+        port = await sink.start_tcp(args.host, args.port)
+        print(f"lp_sink: tcp://{args.host}:{port}")
+    last = 0
+    while True:
+        await asyncio.sleep(10)
+        if args.quiet and len(sink.lines) != last:
+            last = len(sink.lines)
+            print(f"{time.strftime('%H:%M:%S')} {last} Zeilen in {sink.chunks} Blöcken")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8094)
+    parser.add_argument("--unix", help="UNIX-Socket statt TCP")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Pause nach jedem gelesenen Block")
+    parser.add_argument("--quiet", action="store_true", help="nur Zähler alle 10 s ausgeben")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
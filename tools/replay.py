@@ -0,0 +1,215 @@
+"""Replay: Plattformen deterministisch aus einem Modbus-Mitschnitt speisen.
+
+Liest einen Mitschnitt des Frame-Tracers (trace_<entry_id>.jsonl, siehe Service
+set_frame_trace), teilt ihn anhand der Zeitstempel in Poll-Zyklen und spielt
+ihn Zyklus für Zyklus über einen Fake-Client in den echten Transport ein –
+ohne Timer, so schnell wie möglich (oder mit --speed N-fach Echtzeit-Latenz).
+
+    python tools/replay.py trace.jsonl
+    python tools/replay.py trace.jsonl --states states.jsonl      # Zustände je Zyklus
+    python tools/replay.py trace.jsonl --profile replay.prof      # cProfile des Decode-/State-Pfads
+
+Register, die im Mitschnitt fehlen, werden mit Illegal Data Address beantwortet
+(Zähler "misses"); sonst gilt der zuletzt mitgeschnittene Wert.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import json
+import logging
+import pstats
+import struct
+import sys
+import time
+
+import ha_harness as H
+
+_EXC_ILLEGAL_ADDRESS = 2
+_READ_METHODS = {
+    "read_coils": 1,
+    "read_discrete_inputs": 2,
+    "read_holding_registers": 3,
+    "read_input_registers": 4,
+}
+
+
+class _Response:
+    """Nachbildung der pymodbus-Antwort (registers/bits/isError/exception_code)."""
+
+    def __init__(self, registers=None, bits=None, exception_code=None):
+        self.registers = registers or []
+        self.bits = bits or []
+        self.exception_code = exception_code
+
+    def isError(self) -> bool:
+        return self.exception_code is not None
+
+
+def _decode(fc: int, rsp_hex: str | None) -> _Response:
+    data = bytes.fromhex(rsp_hex or "")
+    if fc in (3, 4):
+        n = data[0] // 2 if data else 0
+        return _Response(registers=list(struct.unpack_from(f">{n}H", data, 1)))
+    if fc in (1, 2):
+        return _Response(bits=[bool(b >> i & 1) for b in data[1:] for i in range(8)])
+    return _Response()
+
+
+def load_capture(path: str, cycle_gap: float) -> list[list[dict]]:
+    """JSONL-Mitschnitt → Liste von Zyklen (Lücke > cycle_gap s trennt Zyklen)."""
+    records = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                rec = json.loads(line)
+                if rec.get("fc") is not None and rec.get("addr") is not None:
+                    records.append(rec)
+    records.sort(key=lambda r: r["ts"])
+    cycles: list[list[dict]] = []
+    last_ts = None
+    for rec in records:
+        if last_ts is None or rec["ts"] - last_ts > cycle_gap:
+            cycles.append([])
+        cycles[-1].append(rec)
+        last_ts = rec["ts"]
+    return cycles
+
+
+class ReplayClient:
+    """Synchroner Fake-Client mit der Schnittstelle von ModbusTcpClient."""
+
+    def __init__(self, cycles: list[list[dict]], speed: float = 0.0):
+        self._cycles = cycles
+        self._speed = speed
+        self._known: dict[tuple[int, int, int], dict] = {}
+        self.requests = 0
+        self.misses = 0
+        self.writes: list[tuple[int, int]] = []
+
+    def set_cycle(self, index: int) -> None:
+        for rec in self._cycles[index]:
+            self._known[(rec["fc"], rec["addr"], rec.get("count", 1))] = rec
+
+    def connect(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+    def _answer(self, fc: int, addr: int, count: int) -> _Response:
+        self.requests += 1
+        rec = self._known.get((fc, addr, count))
+        if rec is None:
+            self.misses += 1
+            return _Response(exception_code=_EXC_ILLEGAL_ADDRESS)
+        if self._speed > 0 and rec.get("lat_ms"):
+            time.sleep(rec["lat_ms"] / 1000.0 / self._speed)
+        if rec.get("exc") is not None:
+            return _Response(exception_code=rec["exc"])
+        return _decode(fc, rec.get("rsp"))
+
+    def __getattr__(self, name):
+        fc = _READ_METHODS.get(name)
+        if fc is None:
+            raise AttributeError(name)
+
+        def _read(address, count=1, **_kwargs):
+            return self._answer(fc, address, count)
+
+        return _read
+
+    def write_register(self, address, value, **_kwargs):
+        self.requests += 1
+        self.writes.append((address, value))
+        return _Response()
+
+
+async def replay(path: str, groups, cycle_gap: float, speed: float,
+                 states_path: str | None, profile_path: str | None) -> dict:
+    cycles = load_capture(path, cycle_gap)
+    if not cycles:
+        raise SystemExit(f"{path}: keine Frames im Mitschnitt")
+    client = ReplayClient(cycles, speed)
+    async with H.running_hass() as hass:
+        # Port 1 ist zu → connect() beim Setup schlägt sofort fehl; danach Fake-Client
+        entry = await H.add_entry(hass, H.entry_data(1, groups, update_interval=86400))
+        transport = H.transport_of(hass, entry)
+        poller = H.poller_of(hass, entry)
+        transport.client = client
+        transport.breaker.record_success()
+
+        state_writes = 0
+
+        def _count(_event) -> None:
+            nonlocal state_writes
+            state_writes += 1
+
+        unsub = hass.bus.async_listen("state_changed", _count)
+        states_fh = open(states_path, "w", encoding="utf-8") if states_path else None
+        profiler = cProfile.Profile() if profile_path else None
+        durations = []
+        t0 = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        for index, frames in enumerate(cycles):
+            client.set_cycle(index)
+            await poller.async_refresh()
+            await hass.async_block_till_done()
+            durations.append(transport.stats.cycle_duration_ms)
+            if states_fh:
+                snapshot = {s.entity_id: s.state for s in hass.states.async_all()}
+                states_fh.write(json.dumps({"cycle": index, "ts": frames[0]["ts"], "states": snapshot},
+                                           sort_keys=True) + "\n")
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+        wall = time.perf_counter() - t0
+        unsub()
+        if states_fh:
+            states_fh.close()
+        await hass.config_entries.async_unload(entry.entry_id)
+
+    span = cycles[-1][-1]["ts"] - cycles[0][0]["ts"]
+    durations.sort()
+    return {
+        "capture": path,
+        "cycles": len(cycles),
+        "frames": sum(len(c) for c in cycles),
+        "captured_span_s": round(span, 1),
+        "wall_s": round(wall, 3),
+        "speedup": round(span / wall, 1) if wall > 0 else None,
+        "requests": client.requests,
+        "misses": client.misses,
+        "writes": len(client.writes),
+        "state_writes": state_writes,
+        "cycle_ms_p50": H.percentile(durations, 50),
+        "cycle_ms_max": durations[-1] if durations else None,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("capture", help="JSONL-Mitschnitt des Frame-Tracers")
+    parser.add_argument("--groups", default=",".join(H.GROUPS), help="aktive Gruppen (kommagetrennt)")
+    parser.add_argument("--cycle-gap", type=float, default=5.0,
+                        help="Pause in s, ab der ein neuer Poll-Zyklus beginnt")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="Latenzen aus dem Mitschnitt N-fach beschleunigt nachbilden (0 = ohne)")
+    parser.add_argument("--states", help="Entity-Zustände je Zyklus als JSONL schreiben")
+    parser.add_argument("--profile", help="cProfile-Ausgabe (pstats) schreiben")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    asyncio.set_event_loop_policy(H.event_loop_policy())
+    groups = tuple(g for g in args.groups.split(",") if g)
+    result = asyncio.run(replay(args.capture, groups, args.cycle_gap, args.speed, args.states, args.profile))
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""Lokaler Modbus-TCP-Simulator für die Fröling Lambdatronic S3200.
+
+Baut die Registertabellen (Coils, Discrete Inputs, Input- und Holding-Register)
+aus documentation/Modbus_Register.txt und den in den Plattformen verwendeten
+Registern auf und beantwortet FC01/02/03/04/06/16 – ohne echten Kessel.
+
+    python tools/s3200_sim.py --port 5020 --latency-ms 20 --hole 30050-30060
+    python tools/s3200_sim.py --framer rtu         # RTU über TCP (RS485-Wandler)
+    python tools/s3200_sim.py --scenario my_scenario.json
+
+Szenario-Datei (JSON, alle Schlüssel optional):
+
+    {
+      "unit_id": 2,
+      "latency_ms": 5, "jitter_ms": 2,
+      "strict": false,
+      "holes": [[30050, 30060]],
+      "values": {"30001": 150},
+      "generators": [
+        {"type": "ramp", "register": 30001, "min": 120, "max": 170, "period": 900},
+        {"type": "states", "register": 34002, "states": [1, 7, 8, 9, 2, 3], "dwell": 60},
+        {"type": "counter", "register": 30021, "start": 1200, "per_hour": 1}
+      ]
+    }
+
+Nur Standardbibliothek, damit Tests und Benchmarks auf jedem Linux laufen.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import logging
+import os
+import random
+import re
+import struct
+import time
+
+_LOGGER = logging.getLogger("s3200_sim")
+
+COMPONENT_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "froeling_s3200_modbus"
+)
+
+# Tabellen: Name → (Basis der Registernummer, Funktionscodes)
+COIL, DISCRETE, INPUT, HOLDING = "coil", "discrete", "input", "holding"
+_TABLE_BASE = {DISCRETE: 10001, INPUT: 30001, HOLDING: 40001, COIL: 0}
+_READ_FC = {1: COIL, 2: DISCRETE, 3: HOLDING, 4: INPUT}
+
+# Modbus-Exception-Codes
+EXC_ILLEGAL_FUNCTION = 1
+EXC_ILLEGAL_ADDRESS = 2
+EXC_ILLEGAL_VALUE = 3
+EXC_GATEWAY_TARGET = 11
+
+MAX_REGISTERS = 125
+MAX_BITS = 2000
+
+
+def table_for_register(register: int) -> tuple[str, int]:
+    """Registernummer (z. B. 30001) → (Tabelle, 0-basierte Adresse)."""
+    if 10001 <= register <= 19999:
+        return DISCRETE, register - 10001
+    if 30001 <= register <= 39999:
+        return INPUT, register - 30001
+    if 40001 <= register <= 49999:
+        return HOLDING, register - 40001
+    return COIL, register
+
+
+# ---------------------------------------------------------------------------
+# Registerkarte
+# ---------------------------------------------------------------------------
+_DOC_LINE = re.compile(r"^([134]\d{4})\s")
+_ENTITY_REG = re.compile(r'"\w+",\s*([134]\d{4})\b')
+_CONST_REG = re.compile(r"^REG\w*\s*=\s*([134]\d{4})\b", re.M)
+_COIL_REG = re.compile(r'FroelingBinaryCoil\([^)]*?"\w+",\s*(\d+)')
+
+
+def load_templates(component_dir: str = COMPONENT_DIR):
+    """templates.py der Integration ohne Home Assistant laden (Instanz-Vorlagen)."""
+    spec = importlib.util.spec_from_file_location(
+        "froeling_templates", os.path.join(component_dir, "templates.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def known_registers(component_dir: str = COMPONENT_DIR) -> set[int]:
+    """Alle Registernummern aus Modbus_Register.txt und den Plattform-Modulen."""
+    regs: set[int] = set()
+    doc = os.path.join(component_dir, "documentation", "Modbus_Register.txt")
+    if os.path.exists(doc):
+        with open(doc, encoding="utf-8") as fh:
+            for line in fh:
+                m = _DOC_LINE.match(line)
+                if m:
+                    regs.add(int(m.group(1)))
+    for name in sorted(os.listdir(component_dir)):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(component_dir, name), encoding="utf-8") as fh:
+            src = fh.read()
+        regs.update(int(x) for x in _ENTITY_REG.findall(src))
+        regs.update(int(x) for x in _CONST_REG.findall(src))
+        # Coils werden ohne Offset adressiert (z. B. 1030)
+        regs.update(-int(x) - 1 for x in _COIL_REG.findall(src))
+    # aus Vorlagen erzeugte Instanzen (hk03–hk18)
+    if os.path.exists(os.path.join(component_dir, "templates.py")):
+        tpl = load_templates(component_dir)
+        for template in tpl.TEMPLATES:
+            for n in range(template.first, template.last + 1):
+                regs.update(-reg - 1 if kind == "coil" else reg for kind, reg in tpl.registers(template, n))
+    return regs
+
+
+class RegisterMap:
+    """Werte je Tabelle; nicht belegte Adressen sind 0 oder (strict) Löcher."""
+
+    def __init__(self, registers: set[int] | None = None, strict: bool = False):
+        self.strict = strict
+        self.values: dict[str, dict[int, int]] = {COIL: {}, DISCRETE: {}, INPUT: {}, HOLDING: {}}
+        self.holes: dict[str, list[tuple[int, int]]] = {COIL: [], DISCRETE: [], INPUT: [], HOLDING: []}
+        self.generators: dict[tuple[str, int], object] = {}
+        for reg in registers if registers is not None else known_registers():
+            if reg < 0:
+                self.values[COIL][-reg - 1] = 0
+            else:
+                table, addr = table_for_register(reg)
+                self.values[table][addr] = 0
+
+    def add_hole(self, first: int, last: int) -> None:
+        """Registerbereich (inkl.) liefert Illegal Data Address."""
+        table, a = table_for_register(first)
+        _, b = table_for_register(last)
+        self.holes[table].append((a, b))
+
+    def set(self, register: int, value: int) -> None:
+        table, addr = table_for_register(register)
+        self.values[table][addr] = value & 0xFFFF
+
+    def add_generator(self, register: int, gen) -> None:
+        table, addr = table_for_register(register)
+        self.values[table].setdefault(addr, 0)
+        self.generators[(table, addr)] = gen
+
+    def readable(self, table: str, addr: int) -> bool:
+        for a, b in self.holes[table]:
+            if a <= addr <= b:
+                return False
+        return not self.strict or addr in self.values[table]
+
+    def read(self, table: str, addr: int, now: float) -> int:
+        gen = self.generators.get((table, addr))
+        if gen is not None:
+            return int(gen(now)) & 0xFFFF
+        return self.values[table].get(addr, 0)
+
+    def write(self, table: str, addr: int, value: int) -> None:
+        # Schreiben übersteuert einen Generator (wie ein Benutzer am Display)
+        self.generators.pop((table, addr), None)
+        self.values[table][addr] = value & 0xFFFF
+
+
+# ---------------------------------------------------------------------------
+# Wertegeneratoren (Rohwerte, Skalierung wie am Gerät)
+# ---------------------------------------------------------------------------
+class Ramp:
+    """Dreieck zwischen min und max mit Periode in Sekunden."""
+
+    def __init__(self, min: float, max: float, period: float = 600.0, t0: float = 0.0):
+        self.lo, self.hi, self.period, self.t0 = min, max, period, t0
+
+    def __call__(self, now: float) -> float:
+        phase = ((now - self.t0) % self.period) / self.period
+        frac = 2 * phase if phase < 0.5 else 2 * (1 - phase)
+        return round(self.lo + (self.hi - self.lo) * frac)
+
+
+class States:
+    """Zustandsfolge (z. B. Kesselzustand 34002), jeder Zustand 'dwell' Sekunden."""
+
+    def __init__(self, states: list[int], dwell: float = 60.0, t0: float = 0.0):
+        self.states, self.dwell, self.t0 = list(states), dwell, t0
+
+    def __call__(self, now: float) -> int:
+        return self.states[int((now - self.t0) // self.dwell) % len(self.states)]
+
+
+class Counter:
+    """Monoton steigender Zähler (Betriebsstunden, Brennerstarts, kg-Zähler)."""
+
+    def __init__(self, start: float = 0.0, per_hour: float = 1.0, t0: float = 0.0):
+        self.start, self.per_hour, self.t0 = start, per_hour, t0
+
+    def __call__(self, now: float) -> int:
+        return int(self.start + (now - self.t0) / 3600.0 * self.per_hour)
+
+
+GENERATOR_TYPES = {"ramp": Ramp, "states": States, "counter": Counter}
+
+# Standard-Szenario: Kessel im Heizbetrieb mit typischem Zustandswechsel
+DEFAULT_VALUES = {
+    30003: 70, 30018: 64,            # Boardtemperaturen (x2)
+    30055: 150, 30022: 140,          # Lambdasonde mV (x100), Füllstand (x207)
+    31001: 10,                       # Außentemperatur 5 °C (x2)
+    34001: 2,                        # Anlagenzustand: Automatik
+    40001: 150, 41032: 70, 41033: 110, 41062: 70, 41063: 110,
+    41632: 110, 41633: 90, 42022: 40, 42027: 70, 42028: 90,
+    48047: 1, 48048: 1, 41638: 1, 40062: 600, 40095: 1700,
+    10002: 1, 10003: 1, 10004: 1,
+}
+DEFAULT_GENERATORS = [
+    {"type": "ramp", "register": 30001, "min": 120, "max": 170, "period": 900},    # Kessel 60–85 °C
+    {"type": "ramp", "register": 30002, "min": 90, "max": 180, "period": 900},     # Abgas
+    {"type": "ramp", "register": 30004, "min": 60, "max": 120, "period": 300},     # Rest-O2 (x10)
+    {"type": "ramp", "register": 30089, "min": 300, "max": 850, "period": 900},    # Feuerraum
+    {"type": "ramp", "register": 32001, "min": 110, "max": 160, "period": 1800},   # Puffer oben
+    {"type": "ramp", "register": 32002, "min": 90, "max": 140, "period": 1800},
+    {"type": "ramp", "register": 32003, "min": 60, "max": 110, "period": 1800},
+    {"type": "ramp", "register": 31031, "min": 60, "max": 90, "period": 1200},     # HK1 Vorlauf
+    {"type": "ramp", "register": 31061, "min": 60, "max": 90, "period": 1200},     # HK2 Vorlauf
+    {"type": "ramp", "register": 31631, "min": 90, "max": 110, "period": 2400},    # Boiler oben
+    {"type": "states", "register": 34002, "states": [1, 7, 8, 9, 2, 3, 3, 3, 4, 3, 5, 1], "dwell": 60},
+    {"type": "counter", "register": 30021, "start": 12000, "per_hour": 1},         # Betriebsstunden
+    {"type": "counter", "register": 30023, "start": 4200, "per_hour": 0.5},        # Brennerstarts
+    {"type": "counter", "register": 30082, "start": 1500, "per_hour": 2},          # kg-Zähler
+    {"type": "counter", "register": 30086, "start": 38000, "per_hour": 12},        # Gesamtertrag
+]
+
+
+def build_map(scenario: dict | None = None, t0: float | None = None) -> RegisterMap:
+    scenario = scenario or {}
+    t0 = time.monotonic() if t0 is None else t0
+    regmap = RegisterMap(strict=bool(scenario.get("strict", False)))
+    for reg, val in DEFAULT_VALUES.items():
+        regmap.set(reg, val)
+    for reg, val in scenario.get("values", {}).items():
+        regmap.set(int(reg), int(val))
+    for spec in scenario.get("generators", DEFAULT_GENERATORS):
+        spec = dict(spec)
+        cls = GENERATOR_TYPES[spec.pop("type")]
+        reg = int(spec.pop("register"))
+        regmap.add_generator(reg, cls(t0=t0, **spec))
+    for first, last in scenario.get("holes", []):
+        regmap.add_hole(int(first), int(last))
+    return regmap
+
+
+# ---------------------------------------------------------------------------
+# Protokoll
+# ---------------------------------------------------------------------------
+def crc16(data: bytes) -> bytes:
+    """Modbus-RTU-CRC (Polynom 0xA001), Low-Byte zuerst."""
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return struct.pack("<H", crc)
+
+
+def _pack_bits(bits: list[int]) -> bytes:
+    out = bytearray((len(bits) + 7) // 8)
+    for i, b in enumerate(bits):
+        if b:
+            out[i // 8] |= 1 << (i % 8)
+    return bytes(out)
+
+
+class S3200Simulator:
+    """asyncio-Server; eine Instanz simuliert eine Steuerung (eine Unit-ID)."""
+
+    def __init__(self, regmap: RegisterMap | None = None, unit_id: int = 2,
+                 latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int | None = None,
+                 framer: str = "socket"):
+        self.regmap = regmap or build_map()
+        self.framer = framer  # "socket" (MBAP) oder "rtu" (RTU-Frames über TCP)
+        self.unit_id = unit_id
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.requests = 0
+        self.requests_by_fc: dict[int, int] = {}
+        self._rng = random.Random(seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: set[asyncio.StreamWriter] = set()
+        self.port: int | None = None
+
+    # ---- Verarbeitung einer PDU (ohne Framing) ----
+    def handle_pdu(self, unit: int, pdu: bytes) -> bytes:
+        fc = pdu[0]
+        self.requests += 1
+        self.requests_by_fc[fc] = self.requests_by_fc.get(fc, 0) + 1
+        if unit != self.unit_id:
+            return bytes([fc | 0x80, EXC_GATEWAY_TARGET])
+        try:
+            if fc in _READ_FC:
+                return self._read(fc, pdu)
+            if fc == 6:
+                return self._write_single(pdu)
+            if fc == 16:
+                return self._write_multiple(pdu)
+        except struct.error:
+            return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+        return bytes([fc | 0x80, EXC_ILLEGAL_FUNCTION])
+
+    def _read(self, fc: int, pdu: bytes) -> bytes:
+        table = _READ_FC[fc]
+        addr, count = struct.unpack_from(">HH", pdu, 1)
+        limit = MAX_BITS if table in (COIL, DISCRETE) else MAX_REGISTERS
+        if not 1 <= count <= limit:
+            return bytes([fc | 0x80, EXC_ILLEGAL_VALUE])
+        if not all(self.regmap.readable(table, a) for a in range(addr, addr + count)):
+            return bytes([fc | 0x80, EXC_ILLEGAL_ADDRESS])
+        now = time.monotonic()
+        values = [self.regmap.read(table, a, now) for a in range(addr, addr + count)]
+        if table in (COIL, DISCRETE):
+            data = _pack_bits([1 if v else 0 for v in values])
+        else:
+            data = struct.pack(f">{count}H", *values)
+        return bytes([fc, len(data)]) + data
+
+    def _write_single(self, pdu: bytes) -> bytes:
+        addr, value = struct.unpack_from(">HH", pdu, 1)
+        if not self.regmap.readable(HOLDING, addr):
+            return bytes([0x86, EXC_ILLEGAL_ADDRESS])
+        self.regmap.write(HOLDING, addr, value)
+        return pdu[:5]
+
+    def _write_multiple(self, pdu: bytes) -> bytes:
+        addr, count, nbytes = struct.unpack_from(">HHB", pdu, 1)
+        if not 1 <= count <= 123 or nbytes != 2 * count:
+            return bytes([0x90, EXC_ILLEGAL_VALUE])
+        if not all(self.regmap.readable(HOLDING, a) for a in range(addr, addr + count)):
+            return bytes([0x90, EXC_ILLEGAL_ADDRESS])
+        for i, value in enumerate(struct.unpack_from(f">{count}H", pdu, 6)):
+            self.regmap.write(HOLDING, addr + i, value)
+        return pdu[:5]
+
+    async def _delay(self) -> None:
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += self._rng.uniform(0, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+    # ---- Modbus TCP (MBAP) ----
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                header = await reader.readexactly(7)
+                tid, pid, length, unit = struct.unpack(">HHHB", header)
+                pdu = await reader.readexactly(length - 1)
+                await self._delay()
+                rsp = self.handle_pdu(unit, pdu)
+                writer.write(struct.pack(">HHHB", tid, pid, len(rsp) + 1, unit) + rsp)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    # ---- RTU über TCP (Adresse + PDU + CRC, wie hinter einem RS485-Wandler) ----
+    async def _handle_rtu(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                head = await reader.readexactly(2)
+                fc = head[1]
+                if fc in (15, 16):
+                    body = await reader.readexactly(5)
+                    body += await reader.readexactly(body[4] + 2)
+                else:
+                    body = await reader.readexactly(6)
+                frame = head + body
+                if crc16(frame[:-2]) != frame[-2:]:
+                    continue  # Gerät antwortet auf gestörte Frames nicht
+                await self._delay()
+                rsp = bytes([head[0]]) + self.handle_pdu(head[0], frame[1:-2])
+                writer.write(rsp + crc16(rsp))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        handler = self._handle_rtu if self.framer == "rtu" else self._handle_client
+        self._server = await asyncio.start_server(handler, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def _parse_hole(text: str) -> tuple[int, int]:
+    first, _, last = text.partition("-")
+    return int(first), int(last or first)
+
+
+async def _main(args) -> None:
+    scenario = {}
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as fh:
+            scenario = json.load(fh)
+    if args.strict:
+        scenario["strict"] = True
+    scenario.setdefault("holes", []).extend(_parse_hole(h) for h in args.hole)
+    sim = S3200Simulator(
+        build_map(scenario),
+        unit_id=args.unit_id if args.unit_id is not None else scenario.get("unit_id", 2),
+        latency_ms=args.latency_ms if args.latency_ms is not None else scenario.get("latency_ms", 0.0),
+        jitter_ms=args.jitter_ms if args.jitter_ms is not None else scenario.get("jitter_ms", 0.0),
+        framer=args.framer,
+    )
+    port = await sim.start(args.host, args.port)
+    _LOGGER.info("S3200 simulator listening on %s:%s (unit %s)", args.host, port, sim.unit_id)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await sim.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5020)
+    parser.add_argument("--unit-id", type=int, default=None)
+    parser.add_argument("--latency-ms", type=float, default=None)
+    parser.add_argument("--jitter-ms", type=float, default=None)
+    parser.add_argument("--framer", choices=("socket", "rtu"), default="socket",
+                        help="rtu: RTU-Frames über TCP wie hinter einem RS485-Ethernet-Wandler")
+    parser.add_argument("--hole", action="append", default=[], help="z. B. 30050-30060 (Illegal Address)")
+    parser.add_argument("--strict", action="store_true", help="nur bekannte Register sind lesbar")
+    parser.add_argument("--scenario", help="JSON-Szenario (Werte, Generatoren, Löcher, Latenz)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(message)s")
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()